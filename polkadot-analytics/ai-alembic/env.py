@@ -17,6 +17,7 @@ from src.models.block import Block
 from src.models.transaction import Transaction
 from src.models.parachain import Parachain
 from src.models.metric import Metric
+from src.models.anomaly_event import AnomalyEvent
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
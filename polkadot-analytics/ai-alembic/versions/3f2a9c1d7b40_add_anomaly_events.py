@@ -0,0 +1,47 @@
+"""add anomaly events
+
+Revision ID: 3f2a9c1d7b40
+Revises: 
+Create Date: 2026-10-19 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'anomaly_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('parachain_id', sa.String(length=32), nullable=False),
+        sa.Column('metric', sa.String(length=64), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('method', sa.String(length=32), nullable=False),
+        sa.Column('value', sa.Float(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=True),
+        sa.Column('severity', sa.String(length=16), nullable=False),
+        sa.Column('description', sa.String(length=512), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('parachain_id', 'metric', 'timestamp', 'method', name='uq_anomaly_event')
+    )
+    op.create_index(op.f('ix_anomaly_events_id'), 'anomaly_events', ['id'], unique=False)
+    op.create_index(op.f('ix_anomaly_events_timestamp'), 'anomaly_events', ['timestamp'], unique=False)
+    op.create_index('ix_anomaly_events_parachain_timestamp', 'anomaly_events', ['parachain_id', 'timestamp'], unique=False)
+    op.create_index('ix_anomaly_events_severity_timestamp', 'anomaly_events', ['severity', 'timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_anomaly_events_severity_timestamp', table_name='anomaly_events')
+    op.drop_index('ix_anomaly_events_parachain_timestamp', table_name='anomaly_events')
+    op.drop_index(op.f('ix_anomaly_events_timestamp'), table_name='anomaly_events')
+    op.drop_index(op.f('ix_anomaly_events_id'), table_name='anomaly_events')
+    op.drop_table('anomaly_events')
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Labeled synthetic benchmark for the anomaly detection methods
+Generates hourly series with injected spikes, drops, level shifts and seasonal
+breaks, runs every method of AnomalyDetector.get_detection_methods through
+detect_batch, and reports precision/recall/F1, points/sec and peak memory.
+
+Usage (from ai-analytics/):
+    python benchmarks/anomaly_benchmark.py --series 2000 --model-series 200
+    python benchmarks/anomaly_benchmark.py --methods rolling_mad cusum --compare benchmarks/results/<previous>.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+import pandas as pd
+
+# Add the ai-analytics root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.data_loader import DataLoader
+from src.models.anomaly_detector import AnomalyDetector
+from src.models.change_point import NUMBA_AVAILABLE
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+EVENT_KINDS = ("spike", "drop", "level_shift", "seasonal_break")
+
+# Points after an event start in which a detection counts as a hit; point
+# anomalies must be flagged exactly, persistent changes within a day
+EVENT_WIDTH = {"spike": 1, "drop": 1, "level_shift": 24, "seasonal_break": 24}
+
+# Methods that score against a model trained on the pre-evaluation history
+MODEL_METHODS = ("isolation_forest", "statistical", "zscore")
+
+METRIC = "tvl"
+
+
+def generate_dataset(
+    n_series: int,
+    train_days: int,
+    eval_days: int,
+    events_per_series: int = 4,
+    seed: int = 0,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Generate labeled hourly series in one vectorized pass.
+
+    Each series has its own level, noise, trend and daily/weekly cycle.
+    Events are only injected in the evaluation window (the last `eval_days`),
+    one per equal slot so their label windows never overlap.
+
+    Args:
+        n_series: Number of series
+        train_days: Clean history before the evaluation window
+        eval_days: Days of labeled evaluation data
+        events_per_series: Injected events per series
+        seed: Random seed
+        end: Timestamp of the last point (default: the current hour)
+
+    Returns:
+        Values (n_series x n_points), timestamp index, per-point event ids
+        (-1 outside label windows), event kinds and the evaluation start
+    """
+    rng = np.random.default_rng(seed)
+    n_points = (train_days + eval_days) * 24
+    eval_start = train_days * 24
+    index = pd.date_range(end=pd.Timestamp(end or datetime.now()).floor("h"), periods=n_points, freq="h")
+    t = np.arange(n_points)
+
+    level = rng.lognormal(mean=10, sigma=1.5, size=(n_series, 1))
+    noise = level * rng.uniform(0.01, 0.04, size=(n_series, 1))
+    daily = level * rng.uniform(0.05, 0.2, size=(n_series, 1))
+    weekly = level * rng.uniform(0.0, 0.1, size=(n_series, 1))
+    phase = rng.uniform(0, 2 * np.pi, size=(n_series, 1))
+    growth = level * rng.normal(0, 2e-5, size=(n_series, 1))
+
+    seasonal = (
+        daily * np.sin(2 * np.pi * index.hour.to_numpy() / 24 + phase)
+        + weekly * (index.dayofweek.to_numpy() >= 5)
+    )
+    values = level + growth * t + seasonal + noise * rng.standard_normal((n_series, n_points))
+
+    # Events: one per slot of the evaluation window, away from the slot edges
+    n_events = n_series * events_per_series
+    slot = (n_points - eval_start) // events_per_series
+    rows = np.repeat(np.arange(n_series), events_per_series)
+    kinds = rng.integers(0, len(EVENT_KINDS), size=n_events)
+    margin = max(EVENT_WIDTH.values())
+    starts = (
+        eval_start
+        + np.tile(np.arange(events_per_series), n_series) * slot
+        + rng.integers(margin, slot - margin, size=n_events)
+    )
+    magnitude = rng.uniform(6, 12, size=n_events) * noise[rows, 0]
+    sign = rng.choice([-1.0, 1.0], size=n_events)
+
+    point = kinds <= 1
+    values[rows[point], starts[point]] += np.where(kinds[point] == 0, 1.0, -1.0) * magnitude[point]
+
+    # Persistent changes apply from their start onwards: mark the start, then cumulate
+    shift = np.zeros_like(values)
+    is_shift = kinds == 2
+    np.add.at(shift, (rows[is_shift], starts[is_shift]), sign[is_shift] * magnitude[is_shift] * 0.6)
+    values += np.cumsum(shift, axis=1)
+
+    flip = np.zeros(values.shape, dtype=np.int32)
+    is_break = kinds == 3
+    np.add.at(flip, (rows[is_break], starts[is_break]), 1)
+    # A seasonal break inverts the daily cycle for the rest of the series
+    values -= 2 * seasonal * (np.cumsum(flip, axis=1) % 2)
+
+    event_id = np.full(values.shape, -1, dtype=np.int64)
+    widths = np.array([EVENT_WIDTH[k] for k in EVENT_KINDS])[kinds]
+    offsets = np.arange(margin)
+    covered = offsets[None, :] < widths[:, None]
+    event_rows = np.broadcast_to(rows[:, None], covered.shape)[covered]
+    event_cols = (starts[:, None] + offsets[None, :])[covered]
+    event_id[event_rows, event_cols] = np.broadcast_to(np.arange(n_events)[:, None], covered.shape)[covered]
+
+    return {
+        "values": values,
+        "index": index,
+        "event_id": event_id,
+        "event_kind": kinds,
+        "eval_start": eval_start,
+        "parachain_ids": [str(1000 + i) for i in range(n_series)]
+    }
+
+
+def score_detections(detected: np.ndarray, data: Dict[str, Any], rows: np.ndarray) -> Dict[str, Any]:
+    """
+    Event-level precision/recall/F1 over the evaluation window.
+
+    A detection is a true positive when it falls inside an event's label
+    window; an event is recalled when at least one of its points is detected.
+
+    Args:
+        detected: Boolean mask (len(rows) x n_points) of flagged points
+        data: Output of generate_dataset
+        rows: Series rows the mask covers
+
+    Returns:
+        Precision, recall, F1, counts and recall per event kind
+    """
+    eval_start = data["eval_start"]
+    event_id = data["event_id"][rows, eval_start:]
+    detected = detected[:, eval_start:]
+
+    n_detected = int(detected.sum())
+    hits = event_id[detected & (event_id >= 0)]
+    true_positives = int(hits.size)
+
+    events = np.unique(event_id[event_id >= 0])
+    found = np.isin(events, hits)
+    kinds = data["event_kind"][events]
+
+    precision = true_positives / n_detected if n_detected else 0.0
+    recall = float(found.mean()) if events.size else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "detections": n_detected,
+        "events": int(events.size),
+        "recall_by_kind": {
+            kind: round(float(found[kinds == i].mean()), 4) if (kinds == i).any() else None
+            for i, kind in enumerate(EVENT_KINDS)
+        }
+    }
+
+
+class SyntheticLoader(DataLoader):
+    """DataLoader serving a generated dataset from memory instead of MySQL."""
+
+    def __init__(self, data: Dict[str, Any]):
+        super().__init__(db_url="synthetic://")
+        values = data["values"]
+        n_series, n_points = values.shape
+        self._panel = pd.DataFrame({
+            "parachain_id": np.repeat(data["parachain_ids"], n_points),
+            "metric": METRIC,
+            "timestamp": np.tile(data["index"].to_numpy(), n_series),
+            "value": values.ravel()
+        })
+        self._ready = True
+
+    async def connect(self):
+        self._ready = True
+
+    async def get_available_metrics(self) -> List[str]:
+        return [METRIC]
+
+    async def get_metrics_panel(self, metrics, start_date=None, end_date=None, parachain_ids=None):
+        panel = self._panel
+        mask = panel["metric"].isin(metrics)
+        if start_date is not None:
+            mask &= panel["timestamp"] >= start_date
+        if end_date is not None:
+            mask &= panel["timestamp"] <= end_date
+        if parachain_ids:
+            mask &= panel["parachain_id"].isin([str(p) for p in parachain_ids])
+        return panel.loc[mask]
+
+    async def get_parachain_data(self, parachain_id, metric, start_date=None, end_date=None, limit=1000):
+        frame = await self.get_metrics_panel([metric], start_date, end_date, [parachain_id])
+        return frame.set_index("timestamp")[["value"]]
+
+
+async def train_models(detector: AnomalyDetector, data: Dict[str, Any], rows: np.ndarray, method: str) -> float:
+    """Train one model per series on its pre-evaluation history; returns seconds taken."""
+    history = data["index"][:data["eval_start"]]
+    started = time.perf_counter()
+    for row in rows:
+        frame = pd.DataFrame({"value": data["values"][row, :data["eval_start"]]}, index=history)
+        processed = await detector.data_loader.preprocess_time_series(frame)
+        result = await detector.train_anomaly_detector(
+            processed, data["parachain_ids"][row], METRIC, method=method
+        )
+        if "error" in result:
+            raise RuntimeError(f"Training {method} failed: {result['error']}")
+    return time.perf_counter() - started
+
+
+async def run_method(
+    detector: AnomalyDetector,
+    data: Dict[str, Any],
+    method: str,
+    rows: np.ndarray,
+    sensitivity: float,
+    eval_days: int
+) -> Dict[str, Any]:
+    """Train (if needed), detect and score one method over the given series rows."""
+    train_seconds = None
+    if method in MODEL_METHODS:
+        train_seconds = await train_models(detector, data, rows, method)
+
+    series = [(data["parachain_ids"][row], METRIC) for row in rows]
+
+    async def detect():
+        return await detector.detect_batch(
+            series=series,
+            sensitivity=sensitivity,
+            method=method,
+            lookback_days=eval_days,
+            include_anomalies=True
+        )
+
+    # Memory is traced in a first pass, which also loads the models; tracing
+    # slows allocation-heavy code, so throughput comes from a second pass
+    tracemalloc.start()
+    await detect()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    detector.score_cache.clear()
+    started = time.perf_counter()
+    result = await detect()
+    elapsed = time.perf_counter() - started
+
+    if "error" in result:
+        raise RuntimeError(f"{method} failed: {result['error']}")
+
+    # Map flagged timestamps back onto the dataset grid
+    position = {pid: i for i, pid in enumerate(data["parachain_ids"][row] for row in rows)}
+    detected = np.zeros((len(rows), data["values"].shape[1]), dtype=bool)
+    scored_points = 0
+    for item in result["results"]:
+        scored_points += item["total_points"]
+        if item["anomalies"]:
+            cols = data["index"].get_indexer(pd.to_datetime([a["timestamp"] for a in item["anomalies"]]))
+            detected[position[item["parachain_id"]], cols[cols >= 0]] = True
+
+    return {
+        "method": method,
+        "series": len(rows),
+        "skipped": len(result["skipped"]),
+        "points_scored": scored_points,
+        "seconds": round(elapsed, 4),
+        "points_per_second": round(scored_points / elapsed, 1) if elapsed > 0 else None,
+        "peak_memory_mb": round(peak / 2 ** 20, 2),
+        "train_seconds": round(train_seconds, 4) if train_seconds is not None else None,
+        **score_detections(detected, data, rows)
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Short hash of the checked-out commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_report(report: Dict[str, Any], previous: Optional[Dict[str, Any]] = None):
+    """Print one row per method, with F1 and throughput deltas against a previous run."""
+    before = {r["method"]: r for r in (previous or {}).get("methods", [])}
+    header = f"{'method':<20}{'series':>8}{'prec':>8}{'recall':>8}{'f1':>8}{'pts/s':>14}{'peak MB':>10}"
+    if before:
+        header += f"{'Δf1':>9}{'Δpts/s':>10}"
+    print(header)
+
+    for row in report["methods"]:
+        line = (
+            f"{row['method']:<20}{row['series']:>8}{row['precision']:>8.3f}{row['recall']:>8.3f}"
+            f"{row['f1']:>8.3f}{row['points_per_second']:>14,.0f}{row['peak_memory_mb']:>10.1f}"
+        )
+        old = before.get(row["method"])
+        if old:
+            speedup = row["points_per_second"] / old["points_per_second"] if old["points_per_second"] else 0
+            line += f"{row['f1'] - old['f1']:>+9.3f}{speedup:>9.2f}x"
+        print(line)
+
+    for row in report["methods"]:
+        by_kind = ", ".join(f"{k}={v:.2f}" for k, v in row["recall_by_kind"].items() if v is not None)
+        print(f"  {row['method']:<18} recall by kind: {by_kind}")
+
+
+async def main(args):
+    available = await AnomalyDetector().get_detection_methods()
+    methods = available if args.methods == ["all"] else args.methods
+    unknown = set(methods) - set(available)
+    if unknown:
+        raise SystemExit(f"Unknown methods: {sorted(unknown)} (available: {available})")
+
+    started = time.perf_counter()
+    data = generate_dataset(args.series, args.train_days, args.eval_days, args.events_per_series, args.seed)
+    print(
+        f"Generated {args.series} series x {data['values'].shape[1]} points "
+        f"({int(data['event_kind'].size)} events) in {time.perf_counter() - started:.2f}s"
+    )
+
+    loader = SyntheticLoader(data)
+    all_rows = np.arange(args.series)
+    model_rows = all_rows[:min(args.model_series, args.series)]
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for method in methods:
+            # A fresh detector per method so no cached scores or models carry over
+            detector = AnomalyDetector(
+                cache_dir=os.path.join(cache_dir, method), data_loader=loader, lookback_days=args.eval_days
+            )
+            rows = model_rows if method in MODEL_METHODS else all_rows
+            result = await run_method(detector, data, method, rows, args.sensitivity, args.eval_days)
+            results.append(result)
+            print(f"  {method}: {result['seconds']:.2f}s, f1={result['f1']:.3f}")
+
+    report = {
+        "benchmark": "anomaly_detection",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "numba": NUMBA_AVAILABLE
+        },
+        "config": {
+            "series": args.series,
+            "model_series": int(model_rows.size),
+            "train_days": args.train_days,
+            "eval_days": args.eval_days,
+            "events_per_series": args.events_per_series,
+            "sensitivity": args.sensitivity,
+            "seed": args.seed
+        },
+        "methods": results
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if previous.get("config") != report["config"]:
+            print(f"Note: {args.compare} was run with a different config; deltas are indicative only")
+
+    print()
+    print_report(report, previous)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    name = f"anomaly_{datetime.now():%Y%m%d_%H%M%S}_{report['git_revision'] or 'nogit'}.json"
+    path = os.path.join(args.output_dir, name)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=1000, help="Series scored by the model-free methods")
+    parser.add_argument("--model-series", type=int, default=100,
+                        help="Series used for methods that train one model per series")
+    parser.add_argument("--train-days", type=int, default=28, help="Clean history before the evaluation window")
+    parser.add_argument("--eval-days", type=int, default=14, help="Labeled evaluation window")
+    parser.add_argument("--events-per-series", type=int, default=4)
+    parser.add_argument("--sensitivity", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--methods", nargs="+", default=["all"], help="Methods to run, or 'all'")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", help="Previous result file to report deltas against")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(parse_args()))
@@ -4,23 +4,38 @@ Provides ML predictions, anomaly detection, and insights generation
 """
 
 import os
+import time
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import Optional
+from datetime import datetime, timedelta, date
+from typing import Optional, Union, Literal
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 from src.data_processing.data_loader import DataLoader
+from src.data_processing.anomaly_store import AnomalyEventStore
 from src.models.time_series_forecaster import TimeSeriesForecaster
 from src.models.anomaly_detector import AnomalyDetector
+from src.models.retrain_scheduler import RetrainScheduler
+from src.models.streaming_detector import StreamingAnomalyDetector
+from src.models.alert_publisher import AlertPublisher, WebhookSink, FileSink
+from src.models.xcm_flow_graph import XcmFlowGraph, XCM_MODULES
 from src.prediction.insights_generator import InsightsGenerator
+from src.prediction.insights_precomputer import InsightsPrecomputer
+from src.prediction.health_leaderboard import HealthLeaderboard
+from src.prediction.prompt_cache import PromptCache
+from src.prediction.scenario_simulator import ScenarioSimulator, MAX_PARACHAINS, MAX_HORIZON_DAYS, MAX_PATHS
 from src.utils.logger import setup_logger
 from src.utils.health_check import HealthChecker
+from src.utils.latency_monitor import LatencyMonitor
+from src.utils.http_cache import ResponseCache, make_etag, etag_matches
+from src.utils.serialization import FastJSONResponse, negotiate_columnar, columnar_response
 
 
 class Settings(BaseSettings):
@@ -35,14 +50,42 @@ class Settings(BaseSettings):
     model_cache_dir: str = "models/cache"
     prediction_horizon_days: int = 30
     retrain_interval_hours: int = 24
+    retrain_max_concurrency: int = 2
+    latency_slo_ms: float = 500.0
 
     # Data Configuration
     data_refresh_interval_minutes: int = 60
     historical_data_days: int = 365
+    anomaly_lookback_days: int = 7
+    streaming_poll_seconds: float = 60.0
+    streaming_threshold: float = 4.0
+    xcm_bucket_minutes: int = 60
+    xcm_retention_days: int = 30
+    xcm_poll_seconds: float = 60.0
+    xcm_origin_chain_id: int = 0
+
+    # Alerting (webhook takes precedence over the file sink)
+    alert_webhook_url: Optional[str] = None
+    alert_file_path: Optional[str] = None
+    alert_coalesce_minutes: float = 30
 
     # AI Configuration
     gemini_api_key: Optional[str] = None
     huggingface_api_key: Optional[str] = None
+    llm_timeout_seconds: float = 20.0
+    llm_max_concurrency: int = 4
+    llm_cache_path: str = "models/cache/llm_responses.sqlite"
+    llm_cache_ttl_hours: float = 24
+    llm_cache_max_entries: int = 512
+    insights_precompute_minutes: float = 30
+    insights_precompute_days: int = 30
+    insights_precompute_concurrency: int = 2
+    leaderboard_window_days: int = 30
+    leaderboard_refresh_minutes: float = 15
+
+    # HTTP caching (ETags and Cache-Control max-age for polled endpoints)
+    http_cache_max_age_seconds: int = 30
+    http_cache_max_entries: int = 256
 
     # Database Configuration (MySQL)
     database_uri: str = "mysql://root:@127.0.0.1:3306/polkadot_analytics"
@@ -63,13 +106,28 @@ data_loader: Optional[DataLoader] = None
 forecaster: Optional[TimeSeriesForecaster] = None
 anomaly_detector: Optional[AnomalyDetector] = None
 insights_generator: Optional[InsightsGenerator] = None
+insights_precomputer: Optional[InsightsPrecomputer] = None
+health_leaderboard: Optional[HealthLeaderboard] = None
+response_cache: Optional[ResponseCache] = None
+scenario_simulator: Optional[ScenarioSimulator] = None
 health_checker: Optional[HealthChecker] = None
+retrain_scheduler: Optional[RetrainScheduler] = None
+streaming_detector: Optional[StreamingAnomalyDetector] = None
+anomaly_store: Optional[AnomalyEventStore] = None
+alert_publisher: Optional[AlertPublisher] = None
+streaming_task: Optional[asyncio.Task] = None
+xcm_flow_graph: Optional[XcmFlowGraph] = None
+xcm_task: Optional[asyncio.Task] = None
+latency_monitor = LatencyMonitor(slo_ms=settings.latency_slo_ms)
+last_retrain_report: Optional[dict] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle - startup and shutdown."""
-    global data_loader, forecaster, anomaly_detector, insights_generator, health_checker
+    global data_loader, forecaster, anomaly_detector, insights_generator, health_checker, retrain_scheduler
+    global scenario_simulator, streaming_detector, streaming_task, anomaly_store, alert_publisher
+    global xcm_flow_graph, xcm_task, insights_precomputer, health_leaderboard, response_cache
 
     # Setup logging
     setup_logger(settings.log_level, settings.log_file)
@@ -88,17 +146,105 @@ async def lifespan(app: FastAPI):
             horizon_days=settings.prediction_horizon_days
         )
 
+        alert_sink = None
+        if settings.alert_webhook_url:
+            alert_sink = WebhookSink(settings.alert_webhook_url)
+        elif settings.alert_file_path:
+            alert_sink = FileSink(settings.alert_file_path)
+        if alert_sink:
+            alert_publisher = AlertPublisher(alert_sink, coalesce_minutes=settings.alert_coalesce_minutes)
+            alert_publisher.start()
+
         anomaly_detector = AnomalyDetector(
-            cache_dir=settings.model_cache_dir
+            cache_dir=settings.model_cache_dir,
+            data_loader=data_loader,
+            lookback_days=settings.anomaly_lookback_days,
+            alert_publisher=alert_publisher
         )
 
+        anomaly_store = AnomalyEventStore(data_loader)
+
         insights_generator = InsightsGenerator(
-            gemini_api_key=settings.gemini_api_key
+            gemini_api_key=settings.gemini_api_key,
+            data_loader=data_loader,
+            llm_timeout_seconds=settings.llm_timeout_seconds,
+            llm_max_concurrency=settings.llm_max_concurrency,
+            prompt_cache=PromptCache(
+                settings.llm_cache_path,
+                max_entries=settings.llm_cache_max_entries,
+                ttl_seconds=settings.llm_cache_ttl_hours * 3600
+            )
+        )
+
+        response_cache = ResponseCache(data_loader, max_entries=settings.http_cache_max_entries)
+
+        health_leaderboard = HealthLeaderboard(
+            data_loader,
+            window_days=settings.leaderboard_window_days,
+            refresh_minutes=settings.leaderboard_refresh_minutes
+        )
+
+        scenario_simulator = ScenarioSimulator(
+            forecaster=forecaster,
+            data_loader=data_loader
         )
 
-        health_checker = HealthChecker()
+        health_checker = HealthChecker(insights_generator=insights_generator)
 
         # Start background tasks
+        retrain_scheduler = RetrainScheduler(
+            components={"forecaster": forecaster, "anomaly_detector": anomaly_detector},
+            data_loader=data_loader,
+            retrain_interval_hours=settings.retrain_interval_hours,
+            refresh_interval_minutes=settings.data_refresh_interval_minutes,
+            max_concurrency=settings.retrain_max_concurrency,
+            latency_monitor=latency_monitor
+        )
+        retrain_scheduler.start()
+
+        insights_precomputer = InsightsPrecomputer(
+            insights_generator,
+            data_loader=data_loader,
+            interval_minutes=settings.insights_precompute_minutes,
+            time_range_days=settings.insights_precompute_days,
+            max_concurrency=settings.insights_precompute_concurrency,
+            store_path=os.path.join(settings.model_cache_dir, "insights.json"),
+            latency_monitor=latency_monitor
+        )
+        insights_precomputer.start()
+
+        streaming_detector = StreamingAnomalyDetector(
+            threshold=settings.streaming_threshold,
+            checkpoint_path=os.path.join(settings.model_cache_dir, "streaming_state.npz")
+        )
+        streaming_detector.restore()
+        # Resume from the checkpoint so points that arrived while the service was down are scored
+        streaming_task = asyncio.create_task(
+            streaming_detector.consume(
+                data_loader.stream_new_points(
+                    since=streaming_detector.last_timestamp(),
+                    poll_interval_seconds=settings.streaming_poll_seconds
+                ),
+                on_anomaly=publish_streaming_alert if alert_publisher else None
+            )
+        )
+
+        # Backfill the retention window, then follow new XCM transactions
+        xcm_flow_graph = XcmFlowGraph(
+            bucket_minutes=settings.xcm_bucket_minutes,
+            retention_days=settings.xcm_retention_days,
+            origin_chain_id=settings.xcm_origin_chain_id
+        )
+        xcm_task = asyncio.create_task(
+            xcm_flow_graph.consume(
+                data_loader.stream_xcm_transactions(
+                    XCM_MODULES,
+                    since=datetime.now() - timedelta(days=settings.xcm_retention_days),
+                    poll_interval_seconds=settings.xcm_poll_seconds
+                )
+            )
+        )
+
         logging.info("AI Analytics services initialized successfully")
 
     except Exception as e:
@@ -109,7 +255,25 @@ async def lifespan(app: FastAPI):
 
     # Cleanup on shutdown
     logging.info("Shutting down AI Analytics API...")
-    # Add cleanup logic here if needed
+    if retrain_scheduler:
+        await retrain_scheduler.stop()
+    if insights_precomputer:
+        await insights_precomputer.stop()
+    for task in (streaming_task, xcm_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    if alert_publisher:
+        await alert_publisher.stop()
+
+
+async def publish_streaming_alert(anomaly: dict):
+    """Forward a streaming detector anomaly to the alert publisher."""
+    parachain_id, metric = anomaly["series"].split("_", 1)
+    await alert_publisher.submit(parachain_id, metric, "streaming", [anomaly])
 
 
 # Create FastAPI application
@@ -117,7 +281,8 @@ app = FastAPI(
     title="Polkadot AI Analytics API",
     description="Machine Learning predictions and insights for Polkadot parachains",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -130,6 +295,29 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    """Record request latency so background work can back off under load."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    latency_monitor.record((time.perf_counter() - started) * 1000)
+    return response
+
+
+def cache_control(max_age: Optional[int] = None, public: bool = False) -> str:
+    """Cache-Control value for cacheable responses."""
+    max_age = settings.http_cache_max_age_seconds if max_age is None else max_age
+    return f"{'public' if public else 'private'}, max-age={max_age}"
+
+
+def columnar_format(request: Request) -> Optional[str]:
+    """Columnar media type negotiated from the Accept header (None for JSON rows)."""
+    try:
+        return negotiate_columnar(request.headers.get("accept"))
+    except ValueError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+
 # Pydantic models for API requests/responses
 class PredictionRequest(BaseModel):
     """Request model for predictions."""
@@ -148,11 +336,46 @@ class PredictionResponse(BaseModel):
     generated_at: str
 
 
+class SimulationRequest(BaseModel):
+    """Request model for Monte Carlo scenario simulation."""
+    parachain_ids: list[str] = Field(min_length=1, max_length=MAX_PARACHAINS)
+    metric: str = "tvl"
+    horizon_days: int = Field(14, ge=1, le=MAX_HORIZON_DAYS)
+    n_paths: int = Field(5000, ge=1, le=MAX_PATHS)
+    drop_threshold: float = Field(0.3, gt=0, lt=1)
+    latency_budget_ms: float = Field(500.0, gt=0, le=60_000)
+
+
 class AnomalyRequest(BaseModel):
     """Request model for anomaly detection."""
     parachain_id: str
     metric: str
     sensitivity: float = 0.05
+    method: str = "isolation_forest"
+    lookback_days: Optional[int] = None
+
+
+class SeriesRef(BaseModel):
+    """A single (parachain, metric) series."""
+    parachain_id: str
+    metric: str
+
+
+class BatchAnomalyRequest(BaseModel):
+    """Request model for fleet-wide anomaly detection."""
+    series: Union[Literal["all"], list[SeriesRef]] = "all"
+    metrics: Optional[list[str]] = None  # limits "all" to these metrics
+    sensitivity: float = 0.05
+    method: str = "isolation_forest"
+    lookback_days: Optional[int] = None
+    include_anomalies: bool = False
+
+
+class EcosystemAnomalyRequest(BaseModel):
+    """Request model for cross-parachain anomaly detection."""
+    metric: str = "tvl"
+    parachain_ids: Optional[list[str]] = None  # default: every parachain with data
+    lookback_days: Optional[int] = None
 
 
 class AnomalyResponse(BaseModel):
@@ -170,6 +393,7 @@ class InsightsRequest(BaseModel):
     parachain_id: Optional[str] = None
     time_range_days: int = 30
     include_predictions: bool = True
+    fresh: bool = False
 
 
 class InsightsResponse(BaseModel):
@@ -179,6 +403,7 @@ class InsightsResponse(BaseModel):
     confidence: float
     generated_at: str
     data_points_analyzed: int
+    precomputed: bool = False
 
 
 # API Routes
@@ -198,78 +423,355 @@ async def health_check():
 
 
 @app.post("/predict", response_model=PredictionResponse)
-async def get_predictions(request: PredictionRequest):
-    """Generate predictions for a parachain metric."""
+async def get_predictions(request: PredictionRequest, http_request: Request):
+    """
+    Generate predictions for a parachain metric.
+
+    Responses carry an ETag over the model version and data watermark;
+    a matching If-None-Match is answered with 304 without forecasting.
+    Clients accepting a columnar media type (see src/utils/serialization)
+    get timestamps and values arrays instead of per-point records.
+    """
+    media_type = columnar_format(http_request)
     try:
         if not forecaster:
             raise HTTPException(status_code=503, detail="Prediction service not available")
 
+        etag = make_etag(
+            "predict", request.parachain_id, request.metric, request.days, media_type,
+            forecaster.model_version(request.parachain_id, request.metric),
+            await response_cache.watermark(request.parachain_id), date.today()
+        )
+        cached = response_cache.lookup(http_request, etag, cache_control())
+        if cached:
+            return cached
+
         predictions = await forecaster.predict(
             parachain_id=request.parachain_id,
             metric=request.metric,
-            days=request.days
+            days=request.days,
+            columnar=media_type is not None
         )
-
-        return PredictionResponse(
+        if "error" in predictions:
+            raise HTTPException(status_code=500, detail=predictions["error"])
+
+        if media_type:
+            return response_cache.store(etag, columnar_response(media_type, {
+                "parachain_id": request.parachain_id,
+                "metric": request.metric,
+                "confidence": predictions["confidence"],
+                "model_used": predictions["model"],
+                "generated_at": predictions["timestamp"]
+            }, predictions["columns"]), cache_control())
+
+        # Built from trusted forecaster output, so skip per-point validation
+        return response_cache.store(etag, PredictionResponse.model_construct(
             parachain_id=request.parachain_id,
             metric=request.metric,
             predictions=predictions["values"],
             confidence=predictions["confidence"],
             model_used=predictions["model"],
             generated_at=predictions["timestamp"]
-        )
+        ), cache_control())
 
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/predict", response_model=PredictionResponse)
+async def get_predictions_query(http_request: Request, parachain_id: str, metric: str, days: int = 7):
+    """Generate predictions (GET form, so browsers revalidate polled forecasts automatically)."""
+    return await get_predictions(
+        PredictionRequest(parachain_id=parachain_id, metric=metric, days=days), http_request
+    )
+
+
+@app.post("/simulate")
+async def simulate_scenarios(request: SimulationRequest):
+    """Simulate metric distributions and drop probabilities for many parachains."""
+    try:
+        if not scenario_simulator:
+            raise HTTPException(status_code=503, detail="Simulation service not available")
+
+        return await scenario_simulator.simulate(
+            parachain_ids=request.parachain_ids,
+            metric=request.metric,
+            horizon_days=request.horizon_days,
+            n_paths=request.n_paths,
+            drop_threshold=request.drop_threshold,
+            latency_budget_ms=request.latency_budget_ms
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Simulation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/detect-anomalies", response_model=AnomalyResponse)
-async def detect_anomalies(request: AnomalyRequest):
-    """Detect anomalies in parachain metrics."""
+async def detect_anomalies(request: AnomalyRequest, background_tasks: BackgroundTasks, http_request: Request):
+    """
+    Detect anomalies in parachain metrics.
+
+    Responses carry an ETag over the model version and data watermark;
+    a matching If-None-Match is answered with 304 without scoring.
+    Clients accepting a columnar media type get arrays of the flagged points.
+    """
+    media_type = columnar_format(http_request)
     try:
         if not anomaly_detector:
             raise HTTPException(status_code=503, detail="Anomaly detection service not available")
 
+        etag = make_etag(
+            "detect-anomalies", request.parachain_id, request.metric, request.sensitivity,
+            request.method, request.lookback_days, media_type,
+            anomaly_detector.model_version(request.parachain_id, request.metric, request.method),
+            await response_cache.watermark(request.parachain_id), date.today()
+        )
+        cached = response_cache.lookup(http_request, etag, cache_control())
+        if cached:
+            return cached
+
         anomalies = await anomaly_detector.detect(
             parachain_id=request.parachain_id,
             metric=request.metric,
-            sensitivity=request.sensitivity
+            sensitivity=request.sensitivity,
+            method=request.method,
+            lookback_days=request.lookback_days
         )
-
-        return AnomalyResponse(
+        if "error" in anomalies:
+            raise HTTPException(status_code=500, detail=anomalies["error"])
+
+        if anomaly_store and anomalies["anomalies"]:
+            background_tasks.add_task(
+                anomaly_store.save, request.parachain_id, request.metric, request.method, anomalies["anomalies"]
+            )
+
+        if media_type:
+            return response_cache.store(etag, columnar_response(media_type, {
+                "parachain_id": request.parachain_id,
+                "metric": request.metric,
+                "total_points": anomalies["total_points"],
+                "anomaly_percentage": anomalies["anomaly_percentage"],
+                "generated_at": anomalies["timestamp"]
+            }, anomalies["columns"]), cache_control())
+
+        return response_cache.store(etag, AnomalyResponse.model_construct(
             parachain_id=request.parachain_id,
             metric=request.metric,
             anomalies=anomalies["anomalies"],
             total_points=anomalies["total_points"],
             anomaly_percentage=anomalies["anomaly_percentage"],
             generated_at=anomalies["timestamp"]
-        )
+        ), cache_control())
 
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Anomaly detection error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/detect-anomalies", response_model=AnomalyResponse)
+async def detect_anomalies_query(
+    background_tasks: BackgroundTasks,
+    http_request: Request,
+    parachain_id: str,
+    metric: str,
+    sensitivity: float = 0.05,
+    method: str = "isolation_forest",
+    lookback_days: Optional[int] = None
+):
+    """Detect anomalies (GET form, so browsers revalidate polled results automatically)."""
+    return await detect_anomalies(
+        AnomalyRequest(
+            parachain_id=parachain_id, metric=metric, sensitivity=sensitivity,
+            method=method, lookback_days=lookback_days
+        ),
+        background_tasks,
+        http_request
+    )
+
+
+@app.post("/detect-anomalies/batch")
+async def detect_anomalies_batch(request: BatchAnomalyRequest, background_tasks: BackgroundTasks):
+    """Detect anomalies across many series, most severe first."""
+    try:
+        if not anomaly_detector:
+            raise HTTPException(status_code=503, detail="Anomaly detection service not available")
+
+        series = None
+        if request.series != "all":
+            series = [(ref.parachain_id, ref.metric) for ref in request.series]
+
+        result = await anomaly_detector.detect_batch(
+            series=series,
+            metrics=request.metrics,
+            sensitivity=request.sensitivity,
+            method=request.method,
+            lookback_days=request.lookback_days,
+            include_anomalies=request.include_anomalies or anomaly_store is not None
+        )
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+
+        if anomaly_store:
+            flagged = [r for r in result["results"] if r.get("anomalies")]
+            background_tasks.add_task(anomaly_store.save_results, request.method, flagged)
+            if not request.include_anomalies:
+                result["results"] = [
+                    {k: v for k, v in r.items() if k != "anomalies"} for r in result["results"]
+                ]
+
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Batch anomaly detection error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/detect-anomalies/ecosystem")
+async def detect_ecosystem_anomalies(request: EcosystemAnomalyRequest):
+    """Detect synchronized moves and correlation shifts across parachains."""
+    if not anomaly_detector:
+        raise HTTPException(status_code=503, detail="Anomaly detection service not available")
+
+    result = await anomaly_detector.detect_ecosystem(
+        metric=request.metric,
+        lookback_days=request.lookback_days,
+        parachain_ids=request.parachain_ids
+    )
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
+
+@app.get("/anomalies/history")
+async def get_anomaly_history(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    parachain_id: Optional[str] = None,
+    metric: Optional[str] = None,
+    severity: Optional[str] = None,
+    method: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None
+):
+    """Page through stored anomaly events, newest first."""
+    if not anomaly_store:
+        raise HTTPException(status_code=503, detail="Anomaly store not available")
+
+    try:
+        result = await anomaly_store.query(
+            start=start, end=end, parachain_id=parachain_id, metric=metric,
+            severity=severity, method=method, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
+
+@app.get("/alerts/publisher")
+async def get_alert_publisher_status():
+    """Get alert queue depth and delivery counters."""
+    return {"publisher": alert_publisher.get_status() if alert_publisher else None}
+
+
+@app.get("/anomalies/live")
+async def get_live_anomalies(limit: int = 100, series: Optional[str] = None):
+    """Get the most recent anomalies flagged by the streaming detector."""
+    if not streaming_detector:
+        raise HTTPException(status_code=503, detail="Streaming detection service not available")
+
+    anomalies = [a for a in streaming_detector.recent if series is None or a["series"] == series]
+    return {
+        "anomalies": anomalies[-limit:][::-1],
+        "state": streaming_detector.get_state(series) if series else None,
+        "status": streaming_detector.get_status()
+    }
+
+
+@app.get("/xcm/corridors")
+async def get_xcm_corridors(hours: float = 24, limit: int = 10, by: str = "volume"):
+    """Get the busiest cross-chain transfer corridors in a recent window."""
+    if not xcm_flow_graph:
+        raise HTTPException(status_code=503, detail="XCM flow analytics not available")
+
+    try:
+        result = xcm_flow_graph.top_corridors(hours=hours, limit=limit, by=by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, "status": xcm_flow_graph.get_status()}
+
+
+@app.get("/xcm/flow-changes")
+async def get_xcm_flow_changes(
+    recent_hours: float = 24,
+    baseline_hours: float = 168,
+    threshold: float = 3.0,
+    min_count: int = 5,
+    limit: int = 20
+):
+    """Get corridors whose transfer activity changed sharply against the preceding baseline."""
+    if not xcm_flow_graph:
+        raise HTTPException(status_code=503, detail="XCM flow analytics not available")
+
+    return xcm_flow_graph.flow_changes(
+        recent_hours=recent_hours,
+        baseline_hours=baseline_hours,
+        threshold=threshold,
+        min_count=min_count,
+        limit=limit
+    )
+
+
 @app.post("/generate-insights", response_model=InsightsResponse)
 async def generate_insights(request: InsightsRequest, background_tasks: BackgroundTasks):
-    """Generate AI insights for parachains."""
+    """
+    Generate AI insights for parachains.
+
+    Serves the latest precomputed insights when available; `fresh=true`
+    regenerates them (and updates the stored result when the request uses
+    the precomputed settings).
+    """
     try:
         if not insights_generator:
             raise HTTPException(status_code=503, detail="Insights service not available")
 
-        insights = await insights_generator.generate(
-            parachain_id=request.parachain_id,
-            time_range_days=request.time_range_days,
-            include_predictions=request.include_predictions
-        )
+        insights = None
+        if insights_precomputer and not request.fresh:
+            insights = insights_precomputer.get(
+                request.parachain_id, request.time_range_days, request.include_predictions
+            )
+        precomputed = insights is not None
+
+        if insights is None and insights_precomputer:
+            insights = await insights_precomputer.refresh(
+                request.parachain_id, request.time_range_days, request.include_predictions
+            )
+        elif insights is None:
+            insights = await insights_generator.generate(
+                parachain_id=request.parachain_id,
+                time_range_days=request.time_range_days,
+                include_predictions=request.include_predictions
+            )
 
         return InsightsResponse(
             insights=insights["insights"],
             summary=insights["summary"],
             confidence=insights["confidence"],
             generated_at=insights["timestamp"],
-            data_points_analyzed=insights["data_points"]
+            data_points_analyzed=insights["data_points"],
+            precomputed=precomputed
         )
 
     except Exception as e:
@@ -277,6 +779,41 @@ async def generate_insights(request: InsightsRequest, background_tasks: Backgrou
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/insights/precompute")
+async def get_insights_precompute_status():
+    """Get status of the background insights precomputation."""
+    if not insights_precomputer:
+        raise HTTPException(status_code=503, detail="Insights precomputation not available")
+    return insights_precomputer.get_status()
+
+
+@app.get("/leaderboard")
+async def get_health_leaderboard(
+    http_request: Request,
+    sort_by: str = "health",
+    order: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0
+):
+    """Rank all parachains by health indicators, one page at a time."""
+    if not health_leaderboard:
+        raise HTTPException(status_code=503, detail="Leaderboard not available")
+
+    await health_leaderboard.refresh()
+    etag = make_etag("leaderboard", sort_by, order, limit, offset, health_leaderboard.data_version())
+    cached = response_cache.lookup(http_request, etag, cache_control())
+    if cached:
+        return cached
+
+    try:
+        result = await health_leaderboard.get_page(
+            sort_by=sort_by, order=order, limit=max(limit, 0), offset=max(offset, 0)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return response_cache.store(etag, result, cache_control())
+
+
 @app.get("/models/status")
 async def get_model_status():
     """Get status of all ML models."""
@@ -286,7 +823,16 @@ async def get_model_status():
         "insights_generator": insights_generator.is_ready() if insights_generator else False,
         "data_loader": data_loader.is_ready() if data_loader else False
     }
-    return {"models": status}
+    return {
+        "models": status,
+        "anomaly_score_cache": dict(anomaly_detector.score_cache_stats) if anomaly_detector else None,
+        "model_loads": {
+            "forecaster": forecaster.registry.get_load_stats() if forecaster else None,
+            "anomaly_detector": anomaly_detector.registry.get_load_stats() if anomaly_detector else None
+        },
+        "insights_llm": insights_generator.get_llm_status() if insights_generator else None,
+        "http_cache": response_cache.get_stats() if response_cache else None
+    }
 
 
 @app.post("/models/retrain")
@@ -300,23 +846,50 @@ async def retrain_models(background_tasks: BackgroundTasks):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/models/scheduler")
+async def get_scheduler_status():
+    """Get status of the background retraining scheduler."""
+    return {
+        "scheduler": retrain_scheduler.get_status() if retrain_scheduler else None,
+        "latency": latency_monitor.get_status()
+    }
+
+
+@app.get("/models/retrain/report")
+async def get_retrain_report():
+    """Get the report of the most recent retraining run."""
+    if last_retrain_report is None:
+        return {"message": "No retraining has run yet"}
+    return last_retrain_report
+
+
 async def retrain_all_models():
-    """Background task to retrain all models."""
+    """Background task to retrain models whose series changed."""
+    global last_retrain_report
+
     try:
+        report = {}
         if forecaster:
-            await forecaster.retrain()
+            report["forecaster"] = await forecaster.retrain(data_loader=data_loader)
         if anomaly_detector:
-            await anomaly_detector.retrain()
+            report["anomaly_detector"] = await anomaly_detector.retrain(data_loader=data_loader)
+        last_retrain_report = report
         logging.info("Model retraining completed")
     except Exception as e:
         logging.error(f"Model retraining failed: {e}")
 
 
+AVAILABLE_METRICS = ["tvl", "transactions", "users", "blocks", "volume", "fees"]
+AVAILABLE_METRICS_ETAG = make_etag("metrics", *AVAILABLE_METRICS)
+
+
 @app.get("/data/metrics")
-async def get_available_metrics():
+async def get_available_metrics(http_request: Request):
     """Get list of available metrics for analysis."""
-    metrics = ["tvl", "transactions", "users", "blocks", "volume", "fees"]
-    return {"metrics": metrics}
+    headers = {"ETag": AVAILABLE_METRICS_ETAG, "Cache-Control": cache_control(3600, public=True)}
+    if etag_matches(http_request.headers.get("if-none-match"), AVAILABLE_METRICS_ETAG):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content={"metrics": AVAILABLE_METRICS}, headers=headers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+"""
+Persistent store for detected anomalies
+Writes detection results once and serves history from indexed queries
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+import pandas as pd
+from sqlalchemy import text
+
+
+class AnomalyEventStore:
+    """Stores anomaly events in the anomaly_events table through a DataLoader session."""
+
+    # Score field names used by the different detection methods
+    SCORE_FIELDS = ("anomaly_score", "z_score", "shift_sigma")
+
+    def __init__(self, data_loader):
+        """
+        Initialize the store.
+
+        Args:
+            data_loader: Connected (or connectable) DataLoader
+        """
+        self.data_loader = data_loader
+
+    async def save(
+        self,
+        parachain_id: str,
+        metric: str,
+        method: str,
+        anomalies: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Persist anomaly records, ignoring ones already stored.
+
+        Args:
+            parachain_id: Parachain identifier
+            metric: Metric name
+            method: Detection method that produced the records
+            anomalies: Records as returned by AnomalyDetector.detect
+
+        Returns:
+            Number of new events written
+        """
+        if not anomalies:
+            return 0
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "parachain_id": str(parachain_id),
+                "metric": metric,
+                "timestamp": pd.Timestamp(anomaly["timestamp"]).to_pydatetime(),
+                "method": method,
+                "value": anomaly.get("value"),
+                "score": next((anomaly[f] for f in self.SCORE_FIELDS if f in anomaly), None),
+                "severity": anomaly.get("severity", "medium"),
+                "description": (anomaly.get("description") or "")[:512],
+                "created_at": now,
+                "updated_at": now
+            }
+            for anomaly in anomalies
+        ]
+
+        try:
+            if not self.data_loader.is_ready():
+                await self.data_loader.connect()
+
+            async with self.data_loader.get_async_session() as session:
+                # The unique key on (parachain_id, metric, timestamp, method) drops duplicates
+                result = await session.execute(
+                    text("""
+                        INSERT IGNORE INTO anomaly_events
+                            (parachain_id, metric, timestamp, method, value, score,
+                             severity, description, created_at, updated_at)
+                        VALUES
+                            (:parachain_id, :metric, :timestamp, :method, :value, :score,
+                             :severity, :description, :created_at, :updated_at)
+                    """),
+                    rows
+                )
+                await session.commit()
+
+            written = max(result.rowcount, 0)
+            logging.info(f"Stored {written} of {len(rows)} anomaly events for {parachain_id} {metric}")
+            return written
+
+        except Exception as e:
+            logging.error(f"Error storing anomaly events for {parachain_id} {metric}: {e}")
+            return 0
+
+    async def save_results(self, method: str, results: List[Dict[str, Any]]) -> int:
+        """Persist the per-series results of AnomalyDetector.detect_batch."""
+        written = 0
+        for result in results:
+            written += await self.save(
+                result["parachain_id"], result["metric"], method, result.get("anomalies", [])
+            )
+        return written
+
+    async def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        parachain_id: Optional[str] = None,
+        metric: Optional[str] = None,
+        severity: Optional[str] = None,
+        method: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Page through stored events, newest first.
+
+        Pagination is keyset-based on (timestamp, id): each page continues
+        from the last row of the previous one, so deep pages cost the same as
+        the first.
+
+        Args:
+            start: Earliest event timestamp
+            end: Latest event timestamp
+            parachain_id: Filter by parachain
+            metric: Filter by metric
+            severity: Filter by severity
+            method: Filter by detection method
+            limit: Page size (max 1000)
+            cursor: `next_cursor` from the previous page
+
+        Returns:
+            Events and the cursor of the next page (None on the last page)
+        """
+        limit = max(1, min(limit, 1000))
+        clauses = []
+        params: Dict[str, Any] = {"limit": limit + 1}
+
+        for column, value in (
+            ("parachain_id", parachain_id), ("metric", metric),
+            ("severity", severity), ("method", method)
+        ):
+            if value is not None:
+                clauses.append(f"{column} = :{column}")
+                params[column] = str(value)
+        if start:
+            clauses.append("timestamp >= :start")
+            params["start"] = start
+        if end:
+            clauses.append("timestamp <= :end")
+            params["end"] = end
+        if cursor:
+            cursor_ts, cursor_id = cursor.rsplit("_", 1)
+            clauses.append("(timestamp < :cursor_ts OR (timestamp = :cursor_ts AND id < :cursor_id))")
+            params["cursor_ts"] = datetime.fromisoformat(cursor_ts)
+            params["cursor_id"] = int(cursor_id)
+
+        query = """
+            SELECT id, parachain_id, metric, timestamp, method, value, score, severity, description
+            FROM anomaly_events
+        """
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT :limit"
+
+        try:
+            if not self.data_loader.is_ready():
+                await self.data_loader.connect()
+
+            async with self.data_loader.get_async_session() as session:
+                result = await session.execute(text(query), params)
+                rows = [dict(row) for row in result.mappings()]
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            for row in rows:
+                row["timestamp"] = pd.Timestamp(row["timestamp"]).isoformat()
+
+            return {
+                "events": rows,
+                "count": len(rows),
+                "next_cursor": f"{rows[-1]['timestamp']}_{rows[-1]['id']}" if has_more else None
+            }
+
+        except Exception as e:
+            logging.error(f"Error querying anomaly events: {e}")
+            return {"error": str(e)}
@@ -5,12 +5,12 @@ Handles data fetching from MySQL database using SQLAlchemy
 
 import os
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Union
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Union, AsyncIterator, Tuple
 import asyncio
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.pool import QueuePool
@@ -212,6 +212,187 @@ class DataLoader:
             logging.error(f"Error fetching metrics: {e}")
             return ['tvl', 'transactions', 'users', 'blocks']
 
+    async def get_metrics_panel(
+        self,
+        metrics: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        parachain_ids: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Fetch many series in a single query.
+
+        Args:
+            metrics: Metrics to fetch
+            start_date: Start date for data range
+            end_date: End date for data range
+            parachain_ids: Parachains to fetch (default: all)
+
+        Returns:
+            Long DataFrame with parachain_id, metric, timestamp and value columns,
+            sorted by series and time
+        """
+        columns = ['parachain_id', 'metric', 'timestamp', 'value']
+
+        try:
+            if not self._ready:
+                await self.connect()
+
+            async with self.get_async_session() as session:
+                query = """
+                    SELECT parachain_id, metric, timestamp, value FROM metrics
+                    WHERE metric IN :metrics
+                """
+                params = {"metrics": list(metrics)}
+                bind = [bindparam("metrics", expanding=True)]
+
+                if parachain_ids:
+                    query += " AND parachain_id IN :parachain_ids"
+                    params["parachain_ids"] = list(parachain_ids)
+                    bind.append(bindparam("parachain_ids", expanding=True))
+                if start_date:
+                    query += " AND timestamp >= :start_date"
+                    params["start_date"] = start_date
+                if end_date:
+                    query += " AND timestamp <= :end_date"
+                    params["end_date"] = end_date
+
+                query += " ORDER BY parachain_id, metric, timestamp ASC"
+
+                result = await session.execute(text(query).bindparams(*bind), params)
+                df = pd.DataFrame(result.all(), columns=columns)
+
+            if df.empty:
+                return df
+
+            df['parachain_id'] = df['parachain_id'].astype(str)
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['value'] = pd.to_numeric(df['value'], errors='coerce')
+            df = df.dropna(subset=['value'])
+
+            logging.info(f"Fetched {len(df)} records for {df.groupby(['parachain_id', 'metric']).ngroups} series")
+            return df
+
+        except Exception as e:
+            logging.error(f"Error fetching metrics panel for {metrics}: {e}")
+            return pd.DataFrame(columns=columns)
+
+    async def get_data_watermark(self, parachain_ids: Optional[List[str]] = None) -> Optional[datetime]:
+        """
+        Latest metric timestamp, overall or for some parachains.
+
+        Args:
+            parachain_ids: Parachains to consider (default: all)
+
+        Returns:
+            Latest timestamp, or None if there is no data or the query fails
+        """
+        try:
+            if not self._ready:
+                await self.connect()
+
+            query = "SELECT MAX(timestamp) FROM metrics"
+            params = {}
+            bind = []
+            if parachain_ids:
+                query += " WHERE parachain_id IN :parachain_ids"
+                params["parachain_ids"] = list(parachain_ids)
+                bind.append(bindparam("parachain_ids", expanding=True))
+
+            async with self.get_async_session() as session:
+                result = await session.execute(text(query).bindparams(*bind), params)
+                latest = result.scalar()
+
+            return pd.Timestamp(latest).to_pydatetime() if latest is not None else None
+
+        except Exception as e:
+            logging.error(f"Error fetching data watermark: {e}")
+            return None
+
+    # Time bucket expressions for get_metrics_pivot
+    PIVOT_BUCKETS = {
+        "day": "DATE(timestamp)",
+        "hour": "DATE_FORMAT(timestamp, '%Y-%m-%d %H:00:00')"
+    }
+
+    async def get_metrics_pivot(
+        self,
+        metrics: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        parachain_ids: Optional[List[str]] = None,
+        bucket: str = "day"
+    ) -> pd.DataFrame:
+        """
+        Fetch several metrics side by side in a single aggregating query.
+
+        Each metric becomes a column of per-bucket averages, computed in the
+        database with conditional aggregation, so one row comes back per
+        parachain and bucket instead of one per raw point.
+
+        Args:
+            metrics: Metrics to fetch (one column each)
+            start_date: Start date for data range
+            end_date: End date for data range
+            parachain_ids: Parachains to fetch (default: all)
+            bucket: 'day' or 'hour'
+
+        Returns:
+            DataFrame with parachain_id, timestamp and one column per metric,
+            sorted by time; metrics missing in a bucket are NaN
+        """
+        columns = ['parachain_id', 'timestamp', *metrics]
+
+        try:
+            if bucket not in self.PIVOT_BUCKETS:
+                raise ValueError(f"Unknown bucket: {bucket}")
+            if not self._ready:
+                await self.connect()
+
+            # Metric names are bound as parameters and the columns aliased by position
+            pivots = ",\n".join(
+                f"AVG(CASE WHEN metric = :metric_{i} THEN value END) AS m{i}" for i in range(len(metrics))
+            )
+            query = f"""
+                SELECT parachain_id, {self.PIVOT_BUCKETS[bucket]} AS bucket,
+                {pivots}
+                FROM metrics
+                WHERE metric IN :metrics
+            """
+            params = {"metrics": list(metrics), **{f"metric_{i}": m for i, m in enumerate(metrics)}}
+            bind = [bindparam("metrics", expanding=True)]
+
+            if parachain_ids:
+                query += " AND parachain_id IN :parachain_ids"
+                params["parachain_ids"] = list(parachain_ids)
+                bind.append(bindparam("parachain_ids", expanding=True))
+            if start_date:
+                query += " AND timestamp >= :start_date"
+                params["start_date"] = start_date
+            if end_date:
+                query += " AND timestamp <= :end_date"
+                params["end_date"] = end_date
+
+            query += " GROUP BY parachain_id, bucket ORDER BY bucket ASC"
+
+            async with self.get_async_session() as session:
+                result = await session.execute(text(query).bindparams(*bind), params)
+                df = pd.DataFrame(result.all(), columns=columns)
+
+            if df.empty:
+                return df
+
+            df['parachain_id'] = df['parachain_id'].astype(str)
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df[list(metrics)] = df[list(metrics)].apply(pd.to_numeric, errors='coerce')
+
+            logging.info(f"Fetched {len(df)} {bucket} rows of {len(metrics)} metrics")
+            return df
+
+        except Exception as e:
+            logging.error(f"Error fetching metrics pivot for {metrics}: {e}")
+            return pd.DataFrame(columns=columns)
+
     async def preprocess_time_series(
         self,
         df: pd.DataFrame,
@@ -227,6 +408,10 @@ class DataLoader:
         Returns:
             Preprocessed DataFrame
         """
+        return self.preprocess_frame(df, fill_method)
+
+    def preprocess_frame(self, df: pd.DataFrame, fill_method: str = 'forward') -> pd.DataFrame:
+        """Synchronous preprocess_time_series, for callers running it in a worker thread."""
         if df.empty:
             return df
 
@@ -235,9 +420,9 @@ class DataLoader:
 
         # Handle missing values
         if fill_method == 'forward':
-            df = df.fillna(method='ffill')
+            df = df.ffill()
         elif fill_method == 'backward':
-            df = df.fillna(method='bfill')
+            df = df.bfill()
         elif fill_method == 'interpolate':
             df = df.interpolate(method='linear')
 
@@ -301,3 +486,137 @@ class DataLoader:
                     batch_data[parachain_id][metric] = df_processed
 
         return batch_data
+
+    async def stream_new_points(
+        self,
+        since: Optional[datetime] = None,
+        poll_interval_seconds: float = 60.0,
+        batch_size: int = 5000
+    ) -> AsyncIterator[Tuple[str, float, float]]:
+        """
+        Poll the metrics table and yield points as they arrive.
+
+        Rows are paged on (timestamp, parachain_id, metric), so a batch that
+        ends partway through the points sharing one timestamp resumes with
+        the rest of them. Stored timestamps are naive UTC.
+
+        Args:
+            since: Yield points from this time on, inclusive (default: now);
+                naive datetimes are taken as UTC
+            poll_interval_seconds: Delay between polls when no new rows are found
+            batch_size: Maximum rows fetched per poll
+
+        Yields:
+            Tuples of (series_key, unix_timestamp, value) in timestamp order
+        """
+        if since is None:
+            since = datetime.now(timezone.utc)
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+        # Keyset cursor: the last row yielded, None until the first row
+        cursor = None
+        first_page = text("""
+            SELECT parachain_id, metric, timestamp, value FROM metrics
+            WHERE timestamp >= :since
+            ORDER BY timestamp ASC, parachain_id ASC, metric ASC
+            LIMIT :limit
+        """)
+        next_page = text("""
+            SELECT parachain_id, metric, timestamp, value FROM metrics
+            WHERE timestamp >= :since
+              AND (timestamp > :since OR parachain_id > :parachain_id
+                   OR (parachain_id = :parachain_id AND metric > :metric))
+            ORDER BY timestamp ASC, parachain_id ASC, metric ASC
+            LIMIT :limit
+        """)
+
+        while True:
+            rows = []
+            try:
+                if not self._ready:
+                    await self.connect()
+
+                async with self.get_async_session() as session:
+                    if cursor is None:
+                        result = await session.execute(first_page, {"since": since, "limit": batch_size})
+                    else:
+                        result = await session.execute(next_page, {**cursor, "limit": batch_size})
+                    rows = result.all()
+
+            except Exception as e:
+                logging.error(f"Error polling new metric points: {e}")
+
+            for parachain_id, metric, timestamp, value in rows:
+                cursor = {"since": timestamp, "parachain_id": parachain_id, "metric": metric}
+                unix_ts = pd.Timestamp(timestamp).to_pydatetime().replace(tzinfo=timezone.utc).timestamp()
+                try:
+                    yield f"{parachain_id}_{metric}", unix_ts, float(value)
+                except (TypeError, ValueError):
+                    continue
+
+            # A full batch means there is a backlog: poll again immediately
+            if len(rows) < batch_size:
+                await asyncio.sleep(poll_interval_seconds)
+
+    async def stream_xcm_transactions(
+        self,
+        modules: List[str],
+        since: Optional[datetime] = None,
+        poll_interval_seconds: float = 60.0,
+        batch_size: int = 5000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Poll the transactions table for successful XCM pallet calls.
+
+        Rows are read in id order with the last seen id as the watermark, so
+        every poll is an index range scan from where the previous one stopped.
+
+        Args:
+            modules: call_module values to include (e.g. 'xcmPallet', 'xTokens')
+            since: Only include transactions in blocks at or after this time
+            poll_interval_seconds: Delay between polls when no backlog is left
+            batch_size: Maximum rows fetched per poll
+
+        Yields:
+            Lists of {id, timestamp (unix seconds), call_module, call_name, signer, params}
+        """
+        after_id = 0
+        since_ts = int((since or datetime.now()).timestamp())
+        query = text("""
+            SELECT t.id, b.timestamp, t.call_module, t.call_name, t.signer, t.params
+            FROM transactions t
+            JOIN blocks b ON b.block_number = t.block_number
+            WHERE t.id > :after_id
+              AND t.call_module IN :modules
+              AND t.success = 1
+              AND b.timestamp >= :since_ts
+            ORDER BY t.id ASC
+            LIMIT :limit
+        """).bindparams(bindparam("modules", expanding=True))
+
+        while True:
+            rows = []
+            try:
+                if not self._ready:
+                    await self.connect()
+
+                async with self.get_async_session() as session:
+                    result = await session.execute(query, {
+                        "after_id": after_id,
+                        "modules": list(modules),
+                        "since_ts": since_ts,
+                        "limit": batch_size
+                    })
+                    rows = [dict(row) for row in result.mappings()]
+
+            except Exception as e:
+                logging.error(f"Error polling XCM transactions: {e}")
+
+            if rows:
+                after_id = rows[-1]["id"]
+                yield rows
+
+            # A full batch means there is a backlog: poll again immediately
+            if len(rows) < batch_size:
+                await asyncio.sleep(poll_interval_seconds)
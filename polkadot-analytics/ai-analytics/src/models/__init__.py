@@ -4,5 +4,6 @@ from .block import Block
 from .transaction import Transaction
 from .parachain import Parachain
 from .metric import Metric
+from .anomaly_event import AnomalyEvent
 
-__all__ = ['Base', 'Block', 'Transaction', 'Parachain', 'Metric']
+__all__ = ['Base', 'Block', 'Transaction', 'Parachain', 'Metric', 'AnomalyEvent']
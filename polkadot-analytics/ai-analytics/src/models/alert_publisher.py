@@ -0,0 +1,501 @@
+"""
+Alert publishing for detected anomalies
+Maps detections to the backend Alert types, coalesces bursts per series, folds
+series caught up in an ecosystem event into one alert and delivers batches
+through a bounded queue to a pluggable sink
+"""
+
+import os
+import json
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Tuple
+
+import httpx
+
+# Metrics reported as activity alerts; any metric starting with 'xcm' is an XCM alert
+ACTIVITY_METRICS = {"transactions", "users", "active_accounts", "blocks", "extrinsics", "transfers"}
+
+# Score fields written by the different detection methods
+SCORE_FIELDS = ("anomaly_score", "z_score", "shift_sigma")
+
+# How long an ecosystem event keeps absorbing per-series detections after it
+# was last reported (every poll that still sees the event renews it)
+ABSORB_RETENTION = timedelta(days=1)
+
+
+def alert_type(metric: str, direction: str) -> Optional[str]:
+    """
+    Map a metric and deviation direction to a backend Alert type.
+
+    Args:
+        metric: Metric name
+        direction: 'drop' or 'spike'
+
+    Returns:
+        Alert type, or None for metrics with no matching type
+    """
+    if metric.startswith("xcm"):
+        return "xcm_anomaly"
+    if metric == "tvl":
+        return f"tvl_{direction}"
+    if metric in ACTIVITY_METRICS:
+        return f"activity_{direction}"
+    return None
+
+
+class WebhookSink:
+    """Posts alert batches as JSON to an HTTP endpoint."""
+
+    def __init__(self, url: str, timeout: float = 10.0, headers: Optional[Dict[str, str]] = None):
+        """
+        Initialize the sink.
+
+        Args:
+            url: Endpoint receiving {"alerts": [...]}
+            timeout: Request timeout in seconds
+            headers: Extra request headers (e.g. authorization)
+        """
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def send(self, alerts: List[Dict[str, Any]]):
+        """Deliver one batch; raises on transport or HTTP errors."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, headers=self.headers)
+        response = await self._client.post(self.url, json={"alerts": alerts})
+        response.raise_for_status()
+
+    async def close(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+
+class FileSink:
+    """Appends alert batches to a JSON-lines file (for local runs and tests)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    async def send(self, alerts: List[Dict[str, Any]]):
+        lines = "".join(json.dumps(alert, default=str) + "\n" for alert in alerts)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str):
+        with open(self.path, "a") as f:
+            f.write(lines)
+
+    async def close(self):
+        pass
+
+
+class AlertPublisher:
+    """
+    Turns anomaly records into backend alerts and delivers them in batches.
+
+    The first anomaly of a series opens a burst and is alerted immediately;
+    further anomalies of the same series and type within the coalescing
+    window only update the burst. When the window closes, a burst that
+    folded anything is reported once more as a summary alert with the count,
+    time span and worst score of the folded anomalies. Alerts wait in a
+    bounded queue: producers block briefly when it is full and drop the alert
+    if it stays full, so an anomaly storm cannot flood the backend.
+    """
+
+    def __init__(
+        self,
+        sink,
+        coalesce_minutes: float = 30,
+        max_queue: int = 1000,
+        batch_size: int = 100,
+        flush_interval_seconds: float = 2.0,
+        enqueue_timeout_seconds: float = 1.0,
+        max_retries: int = 3
+    ):
+        """
+        Initialize the publisher.
+
+        Args:
+            sink: Object with `async send(alerts)` and `async close()`
+            coalesce_minutes: Window in which repeat anomalies of a series are folded
+            max_queue: Maximum alerts waiting for delivery
+            batch_size: Maximum alerts per delivery
+            flush_interval_seconds: Longest wait to fill a batch
+            enqueue_timeout_seconds: How long producers wait on a full queue
+            max_retries: Delivery attempts per batch before it is dropped
+        """
+        self.sink = sink
+        self.coalesce_window = timedelta(minutes=coalesce_minutes)
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.max_retries = max_retries
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._bursts: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._seen_through: Dict[Tuple[str, str, str], str] = {}
+        self._absorbed: Dict[Tuple[str, str], Tuple[str, str, datetime]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = Counter()
+
+    def start(self):
+        """Start the delivery loop and the burst sweeper."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logging.info(f"Alert publisher started (coalescing window {self.coalesce_window})")
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        """Summarize open bursts, deliver what is queued, then stop the delivery loop."""
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+        await self._close_bursts(datetime.now(), force=True)
+
+        if self._task:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.flush_interval_seconds * 5)
+            except asyncio.TimeoutError:
+                logging.warning(f"Alert publisher stopped with {self._queue.qsize()} undelivered alerts")
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.sink.close()
+        logging.info("Alert publisher stopped")
+
+    async def submit(
+        self,
+        parachain_id: str,
+        metric: str,
+        method: str,
+        anomalies: List[Dict[str, Any]],
+        reference: Optional[float] = None
+    ) -> int:
+        """
+        Queue alerts for a series' anomalies.
+
+        Anomalies at or before the latest one already seen for the series and
+        method are ignored, so repeated polls of the same window do not
+        re-alert while a different method still reports its own detections.
+
+        Args:
+            parachain_id: Parachain identifier
+            metric: Metric name
+            method: Detection method
+            anomalies: Anomaly records (timestamp, value, score, severity, and
+                optionally the model's expected value under 'expected')
+            reference: Expected value for records without one; without either,
+                the sign of the score gives the direction
+
+        Returns:
+            Number of alerts queued
+        """
+        now = datetime.now()
+        await self._close_bursts(now)
+
+        series = (str(parachain_id), metric)
+        seen_key = (*series, method)
+        seen_through = self._seen_through.get(seen_key, "")
+        fresh = sorted(
+            (a for a in anomalies if str(a.get("timestamp", "")) > seen_through),
+            key=lambda a: str(a["timestamp"])
+        )
+        if not fresh:
+            return 0
+        self._seen_through[seen_key] = str(fresh[-1]["timestamp"])
+
+        # Anomalies inside an ecosystem event were already alerted as part of it
+        absorbed = self._absorbed.get(series)
+        if absorbed:
+            start, end, _ = absorbed
+            kept = [a for a in fresh if not start <= str(a["timestamp"]) < end]
+            self.stats["absorbed"] += len(fresh) - len(kept)
+            fresh = kept
+
+        queued = 0
+        for anomaly in fresh:
+            score = next((anomaly[f] for f in SCORE_FIELDS if f in anomaly), 0.0)
+            direction = self._direction(anomaly, score, reference)
+            kind = alert_type(metric, direction)
+            if kind is None:
+                self.stats["unmapped"] += 1
+                continue
+
+            burst_key = (*series, kind)
+            burst = self._bursts.get(burst_key)
+            if burst:
+                self._fold(burst, anomaly, score)
+                self.stats["coalesced"] += 1
+                continue
+
+            self._bursts[burst_key] = {
+                "opened_at": now,
+                "method": method,
+                "direction": direction,
+                "folded": 0,
+                "worst_score": abs(score),
+                "worst": anomaly,
+                "first_at": None,
+                "last_at": None
+            }
+
+            alert = self._build_alert(series, method, kind, direction, anomaly, score, reference)
+            if await self._enqueue(alert):
+                queued += 1
+
+        return queued
+
+    async def submit_ecosystem_event(self, metric: str, event: Dict[str, Any]) -> bool:
+        """
+        Queue one alert for an event spanning many parachains.
+
+        Per-series anomalies of the involved parachains from the event start
+        until one coalescing window after its end are absorbed by `submit`
+        instead of alerted separately.
+        An event that is detected again on a later poll (same start) only
+        extends that window.
+
+        Args:
+            metric: Metric name
+            event: Event as returned by EcosystemDetector.detect
+
+        Returns:
+            True if a new alert was queued
+        """
+        # Level-based detectors keep flagging for a while after the move itself
+        absorb_until = (datetime.fromisoformat(event["end"]) + self.coalesce_window).isoformat()
+        now = datetime.now()
+        for parachain_id in event["parachains"]:
+            self._absorbed[(str(parachain_id), metric)] = (event["start"], absorb_until, now)
+
+        series = ("ecosystem", metric, "ecosystem")
+        if event["start"] <= self._seen_through.get(series, ""):
+            return False
+        self._seen_through[series] = event["start"]
+
+        kind = (alert_type(metric, event["direction"]) if event["direction"] else None) or "parachain_issue"
+        count = len(event["parachains"])
+        title = f"Ecosystem-wide {metric.upper()} {event['direction'] or 'correlation shift'}"
+        if count:
+            title += f" across {count} parachains"
+
+        alert = {
+            "type": kind,
+            "severity": event["severity"],
+            "title": title,
+            "message": (
+                f"{', '.join(k.replace('_', ' ') for k in event['kinds'])} "
+                f"from {event['start']} to {event['end']} "
+                f"({event['breadth']:.0%} of parachains at the peak)"
+            ),
+            "parachainId": None,
+            "threshold": None,
+            "currentValue": event["correlation_short"],
+            "previousValue": event["correlation_long"],
+            "changePercentage": None,
+            "source": "system",
+            "metadata": {
+                "metric": metric,
+                "method": "ecosystem",
+                "detected_at": event["peak"],
+                **event
+            }
+        }
+        self.stats["ecosystem_events"] += 1
+        return await self._enqueue(alert)
+
+    def _fold(self, burst: Dict[str, Any], anomaly: Dict[str, Any], score: float):
+        """Record an anomaly coalesced into an open burst."""
+        timestamp = str(anomaly.get("timestamp", ""))
+        burst["folded"] += 1
+        burst["first_at"] = min(burst["first_at"] or timestamp, timestamp)
+        burst["last_at"] = max(burst["last_at"] or timestamp, timestamp)
+        if abs(score) > burst["worst_score"]:
+            burst["worst_score"] = abs(score)
+            burst["worst"] = anomaly
+
+    async def _close_bursts(self, now: datetime, force: bool = False):
+        """
+        Close bursts whose coalescing window has passed and report what they folded.
+
+        Args:
+            now: Current time
+            force: Close every open burst (on shutdown)
+        """
+        expired = [
+            key for key, burst in self._bursts.items()
+            if force or now - burst["opened_at"] >= self.coalesce_window
+        ]
+        for key in expired:
+            burst = self._bursts.pop(key)
+            if burst["folded"]:
+                self.stats["burst_summaries"] += 1
+                await self._enqueue(self._build_summary(key, burst))
+
+        for series in [s for s, (_, _, seen) in self._absorbed.items() if now - seen > ABSORB_RETENTION]:
+            del self._absorbed[series]
+
+    async def _sweep(self):
+        """Close expired bursts even when no new anomalies arrive."""
+        interval = max(1.0, min(60.0, self.coalesce_window.total_seconds() / 4))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._close_bursts(datetime.now())
+            except Exception as e:
+                logging.error(f"Error closing alert bursts: {e}")
+
+    def _direction(self, anomaly: Dict[str, Any], score: float, reference: Optional[float]) -> str:
+        """Decide whether an anomaly is a drop or a spike."""
+        reference = anomaly.get("expected", reference)
+        if reference is not None and anomaly.get("value") is not None:
+            return "drop" if anomaly["value"] < reference else "spike"
+        return "drop" if score < 0 else "spike"
+
+    def _build_alert(
+        self,
+        series: Tuple[str, str],
+        method: str,
+        kind: str,
+        direction: str,
+        anomaly: Dict[str, Any],
+        score: float,
+        reference: Optional[float]
+    ) -> Dict[str, Any]:
+        """Build an alert payload with the backend Alert field names."""
+        parachain_id, metric = series
+        value = anomaly.get("value")
+        reference = anomaly.get("expected", reference)
+        change = None
+        if reference and value is not None:
+            change = (value - reference) / abs(reference) * 100
+
+        title = f"{metric.upper()} {direction} on parachain {parachain_id}"
+        message = anomaly.get("description") or f"Unusual {metric} value detected"
+
+        return {
+            "type": kind,
+            "severity": anomaly.get("severity", "medium"),
+            "title": title,
+            "message": message,
+            "parachainId": int(parachain_id) if parachain_id.isdigit() else None,
+            "threshold": None,
+            "currentValue": value,
+            "previousValue": reference,
+            "changePercentage": change,
+            "source": "system",
+            "metadata": {
+                "parachain_key": parachain_id,
+                "metric": metric,
+                "method": method,
+                "detected_at": anomaly.get("timestamp"),
+                "score": score
+            }
+        }
+
+    def _build_summary(self, key: Tuple[str, str, str], burst: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the alert reporting the anomalies folded into a closed burst."""
+        parachain_id, metric, kind = key
+        worst = burst["worst"]
+        folded = burst["folded"]
+
+        return {
+            "type": kind,
+            "severity": worst.get("severity", "medium"),
+            "title": f"{metric.upper()} {burst['direction']} on parachain {parachain_id} continued",
+            "message": (
+                f"{folded} further {metric} anomalies from {burst['first_at']} to {burst['last_at']} "
+                f"(worst score {burst['worst_score']:.2f})"
+            ),
+            "parachainId": int(parachain_id) if parachain_id.isdigit() else None,
+            "threshold": None,
+            "currentValue": worst.get("value"),
+            "previousValue": worst.get("expected"),
+            "changePercentage": None,
+            "source": "system",
+            "metadata": {
+                "parachain_key": parachain_id,
+                "metric": metric,
+                "method": burst["method"],
+                "detected_at": worst.get("timestamp"),
+                "score": burst["worst_score"],
+                "coalesced": folded,
+                "first_detected_at": burst["first_at"],
+                "last_detected_at": burst["last_at"]
+            }
+        }
+
+    async def _enqueue(self, alert: Dict[str, Any]) -> bool:
+        """Put an alert on the queue, waiting briefly if it is full."""
+        try:
+            await asyncio.wait_for(self._queue.put(alert), timeout=self.enqueue_timeout_seconds)
+            self.stats["queued"] += 1
+            return True
+        except asyncio.TimeoutError:
+            self.stats["dropped"] += 1
+            logging.warning(f"Alert queue full, dropped {alert['type']} alert for {alert['title']}")
+            return False
+
+    async def _run(self):
+        """Deliver queued alerts in batches."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._deliver(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _deliver(self, batch: List[Dict[str, Any]]):
+        """Send one batch with exponential backoff between attempts."""
+        for attempt in range(self.max_retries):
+            try:
+                await self.sink.send(batch)
+                self.stats["sent"] += len(batch)
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                logging.error(f"Alert delivery failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                if attempt + 1 < self.max_retries:
+                    await asyncio.sleep(2 ** attempt)
+
+        self.stats["failed"] += len(batch)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get queue depth and delivery counters."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queue_depth": self._queue.qsize(),
+            "open_bursts": len(self._bursts),
+            **{name: self.stats.get(name, 0) for name in
+               ("queued", "sent", "batches", "coalesced", "burst_summaries", "absorbed", "ecosystem_events",
+                "dropped", "failed", "unmapped")}
+        }
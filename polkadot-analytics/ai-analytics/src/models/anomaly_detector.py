@@ -4,8 +4,11 @@ Uses statistical methods and ML to detect unusual patterns
 """
 
 import os
+import time
 import logging
 import pickle
+from collections import Counter
+from contextlib import AsyncExitStack
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 import asyncio
@@ -16,16 +19,65 @@ from sklearn.preprocessing import StandardScaler
 from scipy import stats
 import joblib
 
+from .change_detection import (
+    REFIT_DECISIONS,
+    UNTRACKED_WINDOW_DAYS,
+    classify_change,
+    new_retrain_report,
+    parse_model_key,
+    window_fingerprint,
+)
+from .rolling_detector import RollingRobustDetector
+from .change_point import ChangePointDetector
+from .ecosystem_detector import EcosystemDetector, align_panel
+from .model_registry import ModelBundle, ModelRegistry
+from .seasonality import fit_seasonal_profile, deseasonalize, hour_of_week
+
+# Feature used by IsolationForest models trained on deseasonalized values
+SEASONAL_FEATURES = ['seasonal_residual']
+
+# Methods that train a model (the rolling and change-point methods need none)
+MODEL_METHODS = ("isolation_forest", "statistical", "zscore")
+
+# Ordering used to rank series in fleet-wide results
+SEVERITY_RANK = {"high": 2, "medium": 1, "none": 0}
+
 
 class AnomalyDetector:
     """Handles anomaly detection using statistical and ML methods."""
 
-    def __init__(self, cache_dir: str = "models/cache"):
-        """Initialize the anomaly detector."""
+    def __init__(
+        self,
+        cache_dir: str = "models/cache",
+        data_loader=None,
+        lookback_days: int = 7,
+        rolling_window: int = 168,
+        ewma_alpha: float = 0.05,
+        alert_publisher=None
+    ):
+        """
+        Initialize the anomaly detector.
+
+        Args:
+            cache_dir: Directory for trained models
+            data_loader: DataLoader providing recent metric windows
+            lookback_days: Default window scored by detect()
+            rolling_window: Trailing points in the rolling median/MAD baseline
+            ewma_alpha: Smoothing factor for EWMA z-scores
+            alert_publisher: Optional AlertPublisher notified of new anomalies
+        """
         self.cache_dir = cache_dir
-        self.models = {}
-        self.scalers = {}
-        self.baselines = {}
+        self.registry = ModelRegistry(cache_dir, namespace="anomaly")
+        self.data_loader = data_loader
+        self.lookback_days = lookback_days
+        self.rolling = RollingRobustDetector(window=rolling_window, alpha=ewma_alpha)
+        self.change_points = ChangePointDetector()
+        self.ecosystem = EcosystemDetector()
+        self.alert_publisher = alert_publisher
+        self.request_counts = Counter()
+        self.drift_scores = {}
+        self.score_cache = {}
+        self.score_cache_stats = Counter()
         self._ready = False
 
         # Create cache directory
@@ -35,21 +87,32 @@ class AnomalyDetector:
         """Check if anomaly detector is ready."""
         return self._ready
 
+    def model_version(self, parachain_id: str, metric: str, method: str = "isolation_forest") -> Optional[int]:
+        """Published version of a model (None if it was never published)."""
+        pointer = self.registry.describe(f"{parachain_id}_{metric}_{method}")
+        return pointer["version"] if pointer else None
+
     async def train_anomaly_detector(
         self,
         df: pd.DataFrame,
         parachain_id: str,
         metric: str,
-        method: str = "isolation_forest"
+        method: str = "isolation_forest",
+        seasonal: bool = True
     ) -> Dict[str, Any]:
         """
         Train an anomaly detection model.
 
+        With `seasonal`, daily and weekly cycles are fitted once and stored
+        in the baseline as an hour-of-week profile; both methods then score
+        the residuals after removing that profile.
+
         Args:
             df: Historical data DataFrame
             parachain_id: Parachain identifier
             metric: Metric to analyze
             method: Detection method ('isolation_forest', 'statistical', 'zscore')
+            seasonal: Fit and remove daily/weekly seasonality
 
         Returns:
             Training results
@@ -58,77 +121,117 @@ class AnomalyDetector:
             if df.empty or len(df) < 50:
                 return {"error": "Insufficient data for training"}
 
-            # Prepare features
-            feature_cols = [col for col in df.columns if col not in ['value']]
-            if not feature_cols:
-                feature_cols = ['hour', 'day_of_week', 'month']
-
-            X = df[feature_cols].values
-            y = df['value'].values
-
-            # Scale features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-
-            # Train model based on method
-            if method == "isolation_forest":
-                model = IsolationForest(
-                    contamination=0.1,
-                    random_state=42,
-                    n_estimators=100
-                )
-                model.fit(X_scaled)
-
-                # Calculate baseline statistics
-                baseline = {
-                    'mean': np.mean(y),
-                    'std': np.std(y),
-                    'median': np.median(y),
-                    'q25': np.percentile(y, 25),
-                    'q75': np.percentile(y, 75)
-                }
-
-            else:  # statistical method
-                # Use statistical baselines only
-                baseline = {
-                    'mean': np.mean(y),
-                    'std': np.std(y),
-                    'median': np.median(y),
-                    'q25': np.percentile(y, 25),
-                    'q75': np.percentile(y, 75),
-                    'method': 'statistical'
-                }
-                model = None
-
-            # Save model and scaler
-            model_key = f"{parachain_id}_{metric}_{method}"
-            self.models[model_key] = model
-            self.scalers[model_key] = scaler
-            self.baselines[model_key] = baseline
+            # Fitting is CPU-bound; a worker thread keeps the event loop serving requests
+            return await asyncio.to_thread(self._fit_detector, df, parachain_id, metric, method, seasonal)
 
-            # Save to disk
-            await self._save_model(model_key, model, scaler, baseline)
+        except Exception as e:
+            logging.error(f"Error training anomaly detector for {parachain_id} {metric}: {e}")
+            return {"error": str(e)}
 
-            self._ready = True
+    def _fit_detector(
+        self,
+        df: pd.DataFrame,
+        parachain_id: str,
+        metric: str,
+        method: str,
+        seasonal: bool
+    ) -> Dict[str, Any]:
+        """Fit and publish one anomaly model (blocking; called in a worker thread)."""
+        started = time.perf_counter()
+
+        # Prepare features
+        feature_cols = [col for col in df.columns if col not in ['value']]
+        if not feature_cols:
+            feature_cols = ['hour', 'day_of_week', 'month']
+
+        y = df['value'].values
+
+        seasonality = {}
+        if seasonal and isinstance(df.index, pd.DatetimeIndex):
+            seasonality = fit_seasonal_profile(df.index, y)
+
+        if seasonality:
+            residual = deseasonalize(df.index, y, seasonality['profile'])
+            feature_cols = list(SEASONAL_FEATURES)
+            X = residual[:, None]
+        else:
+            residual = y
+            X = df[feature_cols].values
 
-            return {
-                "method": method,
-                "training_samples": len(X),
-                "baseline_mean": baseline['mean'],
-                "baseline_std": baseline['std'],
-                "feature_count": len(feature_cols)
+        # Scale features
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+
+        # Train model based on method
+        if method == "isolation_forest":
+            model = IsolationForest(
+                contamination=0.1,
+                random_state=42,
+                n_estimators=100
+            )
+            model.fit(X_scaled)
+
+            # Calculate baseline statistics
+            baseline = {
+                'mean': np.mean(y),
+                'std': np.std(y),
+                'median': np.median(y),
+                'q25': np.percentile(y, 25),
+                'q75': np.percentile(y, 75)
             }
 
-        except Exception as e:
-            logging.error(f"Error training anomaly detector for {parachain_id} {metric}: {e}")
-            return {"error": str(e)}
+        else:  # statistical method
+            # Use statistical baselines only
+            baseline = {
+                'mean': np.mean(y),
+                'std': np.std(y),
+                'median': np.median(y),
+                'q25': np.percentile(y, 25),
+                'q75': np.percentile(y, 75),
+                'method': 'statistical'
+            }
+            model = None
+
+        # Residual statistics are what detection compares against
+        baseline.update({
+            'seasonal': seasonality or None,
+            'residual_mean': float(np.mean(residual)),
+            'residual_std': float(np.std(residual))
+        })
+
+        # Record the training window so retraining can detect changes
+        baseline.update({
+            'parachain_id': parachain_id,
+            'metric': metric,
+            'method': method,
+            'feature_cols': feature_cols,
+            **window_fingerprint(df),
+            'train_seconds': time.perf_counter() - started,
+            'trained_at': datetime.now().isoformat()
+        })
+
+        # Publish model, scaler and baseline as one immutable version
+        model_key = f"{parachain_id}_{metric}_{method}"
+        self._save_model(model_key, model, scaler, baseline)
+
+        self._ready = True
+
+        return {
+            "method": method,
+            "training_samples": len(X),
+            "baseline_mean": baseline['mean'],
+            "baseline_std": baseline['std'],
+            "feature_count": len(feature_cols),
+            "seasonal_strength": seasonality.get('strength') if seasonality else None
+        }
 
     async def detect(
         self,
         parachain_id: str,
         metric: str,
         sensitivity: float = 0.05,
-        method: str = "isolation_forest"
+        method: str = "isolation_forest",
+        lookback_days: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Detect anomalies in parachain metrics.
@@ -138,85 +241,92 @@ class AnomalyDetector:
             metric: Metric to analyze
             sensitivity: Sensitivity threshold (0-1, lower = more sensitive)
             method: Detection method
+            lookback_days: Days of recent data to score (defaults to the detector setting)
 
         Returns:
             Anomaly detection results
         """
         try:
-            model_key = f"{parachain_id}_{metric}_{method}"
-
-            # Load model if not in memory
-            if model_key not in self.models:
-                await self._load_model(model_key)
-
-            if model_key not in self.baselines:
-                return {"error": "Model not available"}
-
-            baseline = self.baselines[model_key]
-
-            # Generate synthetic recent data for anomaly detection
-            # In production, you'd fetch recent data from the database
-            recent_data = await self._generate_recent_data(parachain_id, metric)
-
-            if recent_data.empty:
-                return {"error": "No recent data available"}
-
-            # Prepare features for anomaly detection
-            feature_cols = [col for col in recent_data.columns if col not in ['value']]
-            if not feature_cols:
-                feature_cols = ['hour', 'day_of_week', 'month']
-
-            X_recent = recent_data[feature_cols].values
-            values_recent = recent_data['value'].values
-
-            # Scale features
-            scaler = self.scalers.get(model_key)
-            if scaler:
-                X_recent_scaled = scaler.transform(X_recent)
-            else:
-                X_recent_scaled = X_recent
-
-            anomalies = []
-
-            if method == "isolation_forest" and self.models.get(model_key):
-                # Use ML-based detection
-                anomaly_scores = self.models[model_key].decision_function(X_recent_scaled)
-                anomaly_predictions = self.models[model_key].predict(X_recent_scaled)
-
-                # Convert to anomaly format (-1 becomes 1 for anomaly)
-                anomaly_mask = anomaly_predictions == -1
-
-                for i, (is_anomaly, score, value, timestamp) in enumerate(
-                    zip(anomaly_mask, anomaly_scores, values_recent, recent_data.index)
-                ):
-                    if is_anomaly:
-                        anomalies.append({
-                            "timestamp": timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp),
-                            "value": float(value),
-                            "anomaly_score": float(score),
-                            "severity": "high" if abs(score) > 0.7 else "medium",
-                            "description": f"Unusual {metric} value detected"
-                        })
+            # Rolling methods need no trained model
+            if method in RollingRobustDetector.METHODS:
+                return await self._detect_rolling(
+                    parachain_id, metric, sensitivity, method, lookback_days or self.lookback_days
+                )
+            if method in ChangePointDetector.METHODS:
+                return await self._detect_change_points(
+                    parachain_id, metric, sensitivity, method, lookback_days or self.lookback_days
+                )
 
-            else:
-                # Use statistical detection
-                mean_val = baseline['mean']
-                std_val = baseline['std']
+            model_key = f"{parachain_id}_{metric}_{method}"
+            self.request_counts[model_key] += 1
 
-                # Adjust sensitivity
-                threshold = stats.norm.ppf(1 - sensitivity / 2)
+            # Hold one version for the whole request so a concurrent retrain cannot
+            # pair the seasonal profile of one version with the model of another
+            async with self.registry.lease(model_key, lambda: self._read_legacy(model_key)) as bundle:
+                if bundle is None:
+                    return {"error": "Model not available"}
 
-                for timestamp, value in zip(recent_data.index, values_recent):
-                    z_score = abs((value - mean_val) / std_val) if std_val > 0 else 0
+                recent_data = await self._get_recent_data(
+                    parachain_id, metric, lookback_days or self.lookback_days
+                )
+                if recent_data.empty:
+                    return {"error": "No recent data available"}
+
+                baseline = bundle.metadata
+                values_recent = recent_data['value'].to_numpy(dtype=float)
+                timestamps = np.datetime_as_string(recent_data.index.values, unit='s')
+
+                if method == "isolation_forest" and bundle.model is not None:
+                    # Use ML-based detection; only points not scored by a previous call hit the model
+                    anomaly_scores = self._incremental_scores(
+                        model_key, baseline, recent_data,
+                        lambda rows: self._model_scores(bundle, rows),
+                        self._model_inputs(baseline, recent_data)
+                    )
+
+                    # IsolationForest labels a point as an outlier exactly when its score is negative
+                    anomaly_mask = anomaly_scores < 0
+
+                    columns = self._anomaly_columns(
+                        anomaly_mask,
+                        timestamps,
+                        values_recent,
+                        "anomaly_score",
+                        anomaly_scores,
+                        np.where(np.abs(anomaly_scores) > 0.7, "high", "medium")
+                    )
+                    anomalies = self._assemble_anomalies(
+                        columns, "anomaly_score", lambda score: f"Unusual {metric} value detected"
+                    )
 
-                    if z_score > threshold:
-                        anomalies.append({
-                            "timestamp": timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp),
-                            "value": float(value),
-                            "z_score": float(z_score),
-                            "severity": "high" if z_score > 3 else "medium",
-                            "description": f"Statistical anomaly detected (z-score: {z_score:.2f})"
-                        })
+                else:
+                    # Use statistical detection on the (deseasonalized) residuals
+                    mean_val, std_val = self._residual_params(baseline)
+
+                    # Adjust sensitivity
+                    threshold = stats.norm.ppf(1 - sensitivity / 2)
+
+                    if std_val > 0:
+                        z_scores = self._incremental_scores(
+                            model_key, baseline, recent_data,
+                            lambda rows: np.abs((self._residuals(baseline, rows) - mean_val) / std_val)
+                        )
+                    else:
+                        z_scores = np.zeros_like(values_recent)
+
+                    columns = self._anomaly_columns(
+                        z_scores > threshold,
+                        timestamps,
+                        values_recent,
+                        "z_score",
+                        z_scores,
+                        np.where(z_scores > 3, "high", "medium")
+                    )
+                    anomalies = self._assemble_anomalies(
+                        columns, "z_score", lambda score: f"Statistical anomaly detected (z-score: {score:.2f})"
+                    )
+
+            await self._publish_alerts(parachain_id, metric, method, anomalies, baseline)
 
             # Calculate statistics
             total_points = len(recent_data)
@@ -224,6 +334,7 @@ class AnomalyDetector:
 
             return {
                 "anomalies": anomalies,
+                "columns": columns,
                 "total_points": total_points,
                 "anomaly_percentage": anomaly_percentage,
                 "method": method,
@@ -238,105 +349,931 @@ class AnomalyDetector:
             logging.error(f"Error detecting anomalies for {parachain_id} {metric}: {e}")
             return {"error": str(e)}
 
-    async def _generate_recent_data(self, parachain_id: str, metric: str, days: int = 7) -> pd.DataFrame:
+    async def _detect_rolling(
+        self,
+        parachain_id: str,
+        metric: str,
+        sensitivity: float,
+        method: str,
+        lookback_days: int
+    ) -> Dict[str, Any]:
+        """Detect anomalies against a rolling robust or EWMA baseline."""
+        window_start = datetime.now() - timedelta(days=lookback_days)
+        data = await self._get_recent_data(parachain_id, metric, lookback_days, with_context=True)
+
+        if data.empty:
+            return {"error": "No recent data available"}
+
+        threshold = stats.norm.ppf(1 - sensitivity / 2)
+        values = data['value'].to_numpy(dtype=float)
+        scores = self.rolling.score(values[None, :], method)[0]
+
+        in_window = data.index >= window_start
+        values, scores = values[in_window], scores[in_window]
+        abs_scores = np.abs(np.nan_to_num(scores))
+
+        columns = self._anomaly_columns(
+            abs_scores > threshold,
+            np.datetime_as_string(data.index.values[in_window], unit='s'),
+            values,
+            "anomaly_score",
+            scores,
+            np.where(abs_scores > 2 * threshold, "high", "medium")
+        )
+        anomalies = self._assemble_anomalies(
+            columns, "anomaly_score",
+            lambda score: f"Deviation from rolling {metric} baseline (score: {score:.2f})"
+        )
+
+        await self._publish_alerts(parachain_id, metric, method, anomalies)
+
+        total_points = int(in_window.sum())
+        return {
+            "anomalies": anomalies,
+            "columns": columns,
+            "total_points": total_points,
+            "anomaly_percentage": (len(anomalies) / total_points * 100) if total_points > 0 else 0,
+            "method": method,
+            "sensitivity": sensitivity,
+            "baseline": {"method": method, "window": self.rolling.window, "alpha": self.rolling.alpha},
+            "parachain_id": parachain_id,
+            "metric": metric,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def _detect_change_points(
+        self,
+        parachain_id: str,
+        metric: str,
+        sensitivity: float,
+        method: str,
+        lookback_days: int
+    ) -> Dict[str, Any]:
+        """Detect sustained level shifts; each change point is reported as an anomaly."""
+        if not self.data_loader:
+            logging.error("Anomaly detector has no data loader configured")
+            return {"error": "No data loader configured"}
+
+        # Level shifts need no engineered features, only the raw series
+        data = await self.data_loader.get_parachain_data(
+            parachain_id=parachain_id,
+            metric=metric,
+            start_date=datetime.now() - timedelta(days=lookback_days)
+        )
+        if data.empty:
+            return {"error": "No recent data available"}
+
+        data = data.sort_index()
+        scored = self._score_change_points(data, sensitivity, method)
+        columns = self._anomaly_columns(
+            scored["mask"],
+            np.datetime_as_string(data.index.values, unit='s'),
+            data['value'].to_numpy(dtype=float),
+            "shift_sigma",
+            scored["scores"],
+            scored["severity"]
+        )
+        anomalies = self._assemble_anomalies(
+            columns, "shift_sigma",
+            lambda score: f"Sustained {metric} {'increase' if score > 0 else 'decrease'} ({score:.1f} sigma)"
+        )
+        await self._publish_alerts(parachain_id, metric, method, anomalies)
+
+        total_points = len(data)
+        return {
+            "anomalies": anomalies,
+            "columns": columns,
+            "total_points": total_points,
+            "anomaly_percentage": (len(anomalies) / total_points * 100) if total_points > 0 else 0,
+            "method": method,
+            "sensitivity": sensitivity,
+            "baseline": {"method": method, "segments": scored["segments"]},
+            "change_points": scored["shifts"],
+            "parachain_id": parachain_id,
+            "metric": metric,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _score_change_points(self, data: pd.DataFrame, sensitivity: float, method: str) -> Dict[str, Any]:
         """
-        Generate recent data for anomaly detection.
-        In production, this would fetch from the database.
+        Run change-point detection and express the shifts as a per-point mask and scores.
+
+        Shifts smaller than the sensitivity threshold (in noise units) are dropped.
+        """
+        values = data['value'].to_numpy(dtype=float)
+        timestamps = np.datetime_as_string(data.index.values, unit='s')
+        result = self.change_points.detect(values, timestamps, method)
+
+        threshold = stats.norm.ppf(1 - sensitivity / 2)
+        shifts = [shift for shift in result["shifts"] if abs(shift["shift_sigma"]) > threshold]
+
+        scores = np.zeros(len(values))
+        idx = np.array([shift["index"] for shift in shifts], dtype=np.int64)
+        scores[idx] = [shift["shift_sigma"] for shift in shifts]
+        mask = np.zeros(len(values), dtype=bool)
+        mask[idx] = True
+
+        return {
+            "mask": mask,
+            "scores": scores,
+            "severity": np.where(np.abs(scores) > 2 * threshold, "high", "medium"),
+            "segments": result["segments"],
+            "shifts": shifts
+        }
+
+    async def detect_batch(
+        self,
+        series: Optional[List[Tuple[str, str]]] = None,
+        metrics: Optional[List[str]] = None,
+        sensitivity: float = 0.05,
+        method: str = "isolation_forest",
+        lookback_days: Optional[int] = None,
+        include_anomalies: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Detect anomalies for many series with one data fetch.
+
+        Args:
+            series: (parachain_id, metric) pairs to check; None checks every series
+            metrics: Metrics to check when series is None (default: all available)
+            sensitivity: Sensitivity threshold (0-1, lower = more sensitive)
+            method: Detection method
+            lookback_days: Days of recent data to score
+            include_anomalies: Include individual anomaly records per series
+
+        Returns:
+            Per-series summaries sorted by severity, plus series that were skipped
         """
         try:
-            # Generate synthetic recent data based on baseline
-            model_key = f"{parachain_id}_{metric}_isolation_forest"
-            baseline = self.baselines.get(model_key, {"mean": 1000, "std": 100})
-
-            # Create recent timestamps
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            timestamps = pd.date_range(start=start_date, end=end_date, freq='H')
-
-            # Generate synthetic data with some anomalies
-            np.random.seed(42)  # For reproducible results
-            values = []
-
-            for i, timestamp in enumerate(timestamps):
-                # Base value from baseline
-                base_value = np.random.normal(baseline['mean'], baseline['std'])
-
-                # Add trend and seasonality
-                trend = 0.1 * i  # Slight upward trend
-                seasonal = 0.2 * baseline['mean'] * np.sin(2 * np.pi * timestamp.dayofyear / 365)
-
-                # Add some anomalies (5% of the time)
-                if np.random.random() < 0.05:
-                    anomaly_multiplier = np.random.choice([0.1, 10])  # Extreme values
-                    value = base_value * anomaly_multiplier
-                else:
-                    value = base_value + trend + seasonal
+            if not self.data_loader:
+                return {"error": "No data loader configured"}
 
-                values.append(value)
+            days = lookback_days or self.lookback_days
+            window_start = datetime.now() - timedelta(days=days)
 
-            # Create DataFrame
-            df = pd.DataFrame({
-                'value': values,
-                'hour': timestamps.hour,
-                'day_of_week': timestamps.dayofweek,
-                'month': timestamps.month
-            }, index=timestamps)
+            if series:
+                series = [(str(pid), m) for pid, m in series]
+                parachain_ids = sorted({pid for pid, _ in series})
+                metrics = sorted({m for _, m in series})
+            else:
+                parachain_ids = None
+                metrics = metrics or await self.data_loader.get_available_metrics()
+
+            # One query for the whole fleet, with the same 2x context as single-series detection
+            panel = await self.data_loader.get_metrics_panel(
+                metrics, start_date=window_start - timedelta(days=days), parachain_ids=parachain_ids
+            )
+
+            groups = {}
+            if not panel.empty:
+                for key, frame in panel.groupby(['parachain_id', 'metric'], sort=False):
+                    groups[key] = frame.set_index('timestamp')[['value']]
+
+            requested = series or list(groups)
+            skipped = [
+                {"parachain_id": pid, "metric": m, "reason": "no_data"}
+                for pid, m in requested if (pid, m) not in groups
+            ]
+            present = [key for key in requested if key in groups]
+
+            baselines = {}
+            if method in RollingRobustDetector.METHODS:
+                scored = self._score_batch_rolling(groups, present, sensitivity, method, window_start)
+            elif method in ChangePointDetector.METHODS:
+                scored = {}
+                for key in present:
+                    frame = groups[key].sort_index()
+                    frame = frame.loc[frame.index >= window_start]
+                    result = self._score_change_points(frame, sensitivity, method)
+                    scored[key] = {
+                        "frame": frame,
+                        "mask": result["mask"],
+                        "scores": result["scores"],
+                        "severity": result["severity"],
+                        "score_name": "shift_sigma"
+                    }
+            else:
+                scored, missing, baselines = await self._score_batch_models(
+                    groups, present, sensitivity, method, window_start
+                )
+                skipped.extend(missing)
+
+            # Fleet-wide moves are found before per-series alerts so they can absorb them
+            ecosystem_events = {}
+            for metric in sorted({m for _, m in present}):
+                events = self._ecosystem_events(groups, metric, window_start)
+                if events:
+                    ecosystem_events[metric] = events
+
+            publish = self.alert_publisher is not None
+            if publish:
+                for metric, events in ecosystem_events.items():
+                    for event in events:
+                        await self.alert_publisher.submit_ecosystem_event(metric, event)
+
+            results = [
+                self._summarize_series(pid, metric, include_anomalies or publish, **item)
+                for (pid, metric), item in scored.items()
+            ]
+            if publish:
+                for result in results:
+                    await self._publish_alerts(
+                        result["parachain_id"], result["metric"], method, result["anomalies"],
+                        baselines.get((result["parachain_id"], result["metric"]))
+                    )
+                    if not include_anomalies:
+                        del result["anomalies"]
+            results.sort(
+                key=lambda r: (SEVERITY_RANK[r["max_severity"]], r["anomaly_count"], r["max_abs_score"]),
+                reverse=True
+            )
 
-            return df
+            return {
+                "results": results,
+                "skipped": skipped,
+                "series_checked": len(results),
+                "series_with_anomalies": sum(1 for r in results if r["anomaly_count"]),
+                "ecosystem_events": ecosystem_events,
+                "method": method,
+                "sensitivity": sensitivity,
+                "lookback_days": days,
+                "timestamp": datetime.now().isoformat()
+            }
 
         except Exception as e:
-            logging.error(f"Error generating recent data: {e}")
-            return pd.DataFrame()
+            logging.error(f"Error in batch anomaly detection: {e}")
+            return {"error": str(e)}
 
-    async def _save_model(self, model_key: str, model: Any, scaler: Any, baseline: Dict):
-        """Save anomaly detection model to disk."""
+    async def detect_ecosystem(
+        self,
+        metric: str,
+        lookback_days: Optional[int] = None,
+        parachain_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Detect events that move many parachains at once.
+
+        Args:
+            metric: Metric to analyze
+            lookback_days: Days in which events are reported
+            parachain_ids: Parachains to include (default: all with data)
+
+        Returns:
+            Ecosystem events and the signals at the latest point
+        """
         try:
-            model_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_model.pkl")
-            scaler_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_scaler.pkl")
-            baseline_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_baseline.pkl")
+            if not self.data_loader:
+                return {"error": "No data loader configured"}
+
+            days = lookback_days or self.lookback_days
+            window_start = datetime.now() - timedelta(days=days)
+
+            # The per-parachain baselines need a full window before the reported range
+            context = timedelta(hours=self.ecosystem.window + 1)
+            panel = await self.data_loader.get_metrics_panel(
+                [metric], start_date=window_start - context,
+                parachain_ids=[str(p) for p in parachain_ids] if parachain_ids else None
+            )
+            frames = {
+                str(pid): frame.set_index('timestamp')['value']
+                for pid, frame in panel.groupby('parachain_id', sort=False)
+            }
+            result = self.ecosystem.detect(
+                align_panel(frames), since=pd.Timestamp(window_start), key=metric
+            )
 
-            if model:
-                joblib.dump(model, model_path)
-            joblib.dump(scaler, scaler_path)
-            joblib.dump(baseline, baseline_path)
+            if self.alert_publisher:
+                for event in result["events"]:
+                    await self.alert_publisher.submit_ecosystem_event(metric, event)
 
-            logging.info(f"Saved anomaly model {model_key}")
+            return {
+                "metric": metric,
+                "lookback_days": days,
+                **result,
+                "timestamp": datetime.now().isoformat()
+            }
 
         except Exception as e:
-            logging.error(f"Error saving anomaly model {model_key}: {e}")
+            logging.error(f"Error in ecosystem anomaly detection for {metric}: {e}")
+            return {"error": str(e)}
 
-    async def _load_model(self, model_key: str):
-        """Load anomaly detection model from disk."""
+    def _ecosystem_events(
+        self,
+        groups: Dict[Tuple[str, str], pd.DataFrame],
+        metric: str,
+        window_start: datetime
+    ) -> List[Dict[str, Any]]:
+        """Ecosystem events for one metric from already fetched series."""
+        frames = {pid: frame['value'] for (pid, m), frame in groups.items() if m == metric}
+        if len(frames) < self.ecosystem.min_series:
+            return []
         try:
-            model_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_model.pkl")
-            scaler_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_scaler.pkl")
-            baseline_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_baseline.pkl")
+            return self.ecosystem.detect(
+                align_panel(frames), since=pd.Timestamp(window_start), key=metric
+            )["events"]
+        except Exception as e:
+            logging.error(f"Error detecting ecosystem events for {metric}: {e}")
+            return []
 
-            if os.path.exists(baseline_path):
-                self.baselines[model_key] = joblib.load(baseline_path)
+    def _score_batch_rolling(
+        self,
+        groups: Dict[Tuple[str, str], pd.DataFrame],
+        keys: List[Tuple[str, str]],
+        sensitivity: float,
+        method: str,
+        window_start: datetime
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Score every series in one (series x time) pass of the rolling engine."""
+        if not keys:
+            return {}
+
+        # Right-align the series in a NaN-padded matrix; rows are scored independently
+        lengths = [len(groups[key]) for key in keys]
+        X = np.full((len(keys), max(lengths)), np.nan)
+        for row, (key, n) in enumerate(zip(keys, lengths)):
+            X[row, X.shape[1] - n:] = groups[key]['value'].to_numpy(dtype=float)
+
+        threshold = stats.norm.ppf(1 - sensitivity / 2)
+        scores = self.rolling.score(X, method)
+
+        scored = {}
+        for row, (key, n) in enumerate(zip(keys, lengths)):
+            frame = groups[key]
+            in_window = frame.index >= window_start
+            row_scores = scores[row, X.shape[1] - n:][in_window]
+            abs_scores = np.abs(np.nan_to_num(row_scores))
+            scored[key] = {
+                "frame": frame.loc[in_window],
+                "mask": abs_scores > threshold,
+                "scores": row_scores,
+                "severity": np.where(abs_scores > 2 * threshold, "high", "medium"),
+                "score_name": "anomaly_score"
+            }
+        return scored
 
-                if os.path.exists(scaler_path):
-                    self.scalers[model_key] = joblib.load(scaler_path)
+    async def _score_batch_models(
+        self,
+        groups: Dict[Tuple[str, str], pd.DataFrame],
+        keys: List[Tuple[str, str]],
+        sensitivity: float,
+        method: str,
+        window_start: datetime
+    ) -> Tuple[
+        Dict[Tuple[str, str], Dict[str, Any]], List[Dict[str, Any]], Dict[Tuple[str, str], Dict[str, Any]]
+    ]:
+        """
+        Score series against their trained models, batching the statistical check.
 
-                if os.path.exists(model_path):
-                    self.models[model_key] = joblib.load(model_path)
+        Every model is leased until the whole batch is scored, so each series
+        is scored with one version even if a retrain publishes meanwhile.
 
-                logging.info(f"Loaded anomaly model {model_key}")
-            else:
+        Returns:
+            Scored series, series skipped for lack of a model or data, and
+            the baseline each scored series was checked against
+        """
+        scored = {}
+        missing = []
+        statistical = []
+        baselines = {}
+        tracked = set(self._tracked_model_keys())
+
+        async with AsyncExitStack() as leases:
+            for pid, metric in keys:
+                model_key = f"{pid}_{metric}_{method}"
+                if model_key not in tracked:
+                    missing.append({"parachain_id": pid, "metric": metric, "reason": "model_unavailable"})
+                    continue
+
+                self.request_counts[model_key] += 1
+                bundle = await leases.enter_async_context(
+                    self.registry.lease(model_key, lambda key=model_key: self._read_legacy(key))
+                )
+                if bundle is None:
+                    missing.append({"parachain_id": pid, "metric": metric, "reason": "model_unavailable"})
+                    continue
+
+                processed = await self.data_loader.preprocess_time_series(groups[(pid, metric)].copy())
+                recent = processed.loc[processed.index >= window_start]
+                if recent.empty:
+                    missing.append({"parachain_id": pid, "metric": metric, "reason": "no_data"})
+                    continue
+
+                baseline = bundle.metadata
+                baselines[(pid, metric)] = baseline
+                if method == "isolation_forest" and bundle.model is not None:
+                    scores = self._incremental_scores(
+                        model_key, baseline, recent,
+                        lambda rows, bundle=bundle: self._model_scores(bundle, rows),
+                        self._model_inputs(baseline, recent)
+                    )
+                    scored[(pid, metric)] = {
+                        "frame": recent,
+                        "mask": scores < 0,
+                        "scores": scores,
+                        "severity": np.where(np.abs(scores) > 0.7, "high", "medium"),
+                        "score_name": "anomaly_score"
+                    }
+                else:
+                    statistical.append(((pid, metric), baseline, recent))
+
+            if statistical:
+                # One vectorized z-score pass over the concatenated windows
+                values = np.concatenate([
+                    self._residuals(baseline, recent) for _, baseline, recent in statistical
+                ])
+                lengths = [len(recent) for _, _, recent in statistical]
+                params = np.array([self._residual_params(baseline) for _, baseline, _ in statistical])
+                means = np.repeat(params[:, 0], lengths)
+                stds = np.repeat(params[:, 1], lengths)
+
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    z_scores = np.where(stds > 0, np.abs((values - means) / stds), 0.0)
+                threshold = stats.norm.ppf(1 - sensitivity / 2)
+
+                for (key, _, recent), chunk in zip(statistical, np.split(z_scores, np.cumsum(lengths)[:-1])):
+                    scored[key] = {
+                        "frame": recent,
+                        "mask": chunk > threshold,
+                        "scores": chunk,
+                        "severity": np.where(chunk > 3, "high", "medium"),
+                        "score_name": "z_score"
+                    }
+
+        return scored, missing, baselines
+
+    def _summarize_series(
+        self,
+        parachain_id: str,
+        metric: str,
+        include_anomalies: bool,
+        frame: pd.DataFrame,
+        mask: np.ndarray,
+        scores: np.ndarray,
+        severity: np.ndarray,
+        score_name: str
+    ) -> Dict[str, Any]:
+        """Reduce one scored series to a compact summary row."""
+        idx = np.flatnonzero(mask)
+        flagged = np.abs(np.nan_to_num(scores[idx]))
+        timestamps = np.datetime_as_string(frame.index.values, unit='s')
+
+        summary = {
+            "parachain_id": parachain_id,
+            "metric": metric,
+            "anomaly_count": int(idx.size),
+            "total_points": int(len(frame)),
+            "anomaly_percentage": (idx.size / len(frame) * 100) if len(frame) else 0,
+            "max_severity": "high" if (severity[idx] == "high").any() else ("medium" if idx.size else "none"),
+            "max_abs_score": float(flagged.max()) if idx.size else 0.0,
+            "latest_anomaly": timestamps[idx[-1]] if idx.size else None
+        }
+
+        if include_anomalies:
+            columns = self._anomaly_columns(
+                mask,
+                timestamps,
+                frame['value'].to_numpy(dtype=float),
+                score_name,
+                scores,
+                severity
+            )
+            summary["anomalies"] = self._assemble_anomalies(
+                columns, score_name, lambda score: f"Unusual {metric} value detected"
+            )
+        return summary
+
+    def score_fleet(
+        self,
+        panel: pd.DataFrame,
+        method: str = "rolling_mad",
+        sensitivity: float = 0.05,
+        last_n: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Score every series of an aligned panel in one pass.
+
+        Args:
+            panel: DataFrame indexed by timestamp with one column per series
+            method: 'rolling_mad' or 'ewma_zscore'
+            sensitivity: Sensitivity threshold (0-1, lower = more sensitive)
+            last_n: Only score the last n points of each series
+
+        Returns:
+            Series names, timestamps, per-point scores and the anomaly mask
+        """
+        threshold = stats.norm.ppf(1 - sensitivity / 2)
+        result = self.rolling.detect(panel.to_numpy(dtype=float).T, threshold, method, last_n)
+
+        return {
+            "series": list(panel.columns),
+            "timestamps": panel.index,
+            "scores": result["scores"],
+            "anomaly_mask": result["mask"],
+            "threshold": threshold,
+            "method": method
+        }
+
+    def _anomaly_columns(
+        self,
+        mask: np.ndarray,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        score_name: str,
+        scores: np.ndarray,
+        severity: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """Arrays of the points selected by a boolean mask, one per anomaly field."""
+        idx = np.flatnonzero(mask)
+        return {
+            "timestamps": timestamps[idx],
+            "values": values[idx],
+            score_name: scores[idx],
+            "severity": severity[idx]
+        }
+
+    def _assemble_anomalies(
+        self,
+        columns: Dict[str, np.ndarray],
+        score_name: str,
+        describe
+    ) -> List[Dict[str, Any]]:
+        """
+        Build anomaly records from the columns of flagged points.
+
+        Selection happens on whole arrays (see _anomaly_columns); only the
+        flagged points are converted to dicts for the response.
+        """
+        scores = columns[score_name].tolist()
+
+        return [
+            {
+                "timestamp": ts,
+                "value": value,
+                score_name: score,
+                "severity": sev,
+                "description": describe(score)
+            }
+            for ts, value, score, sev in zip(
+                columns["timestamps"].tolist(), columns["values"].tolist(), scores, columns["severity"].tolist()
+            )
+        ]
+
+    def _residuals(self, baseline: Dict[str, Any], rows: pd.DataFrame) -> np.ndarray:
+        """Values minus the cached seasonal profile (plain values for non-seasonal models)."""
+        values = rows['value'].to_numpy(dtype=float)
+        seasonality = baseline.get('seasonal')
+        if not seasonality:
+            return values
+        return deseasonalize(rows.index, values, seasonality['profile'])
+
+    def _residual_params(self, baseline: Dict[str, Any]) -> Tuple[float, float]:
+        """Center and scale of training residuals (models trained before seasonality use mean/std)."""
+        if baseline.get('seasonal'):
+            return baseline['residual_mean'], baseline['residual_std']
+        return baseline['mean'], baseline['std']
+
+    def _expected_values(self, baseline: Dict[str, Any], index: pd.DatetimeIndex) -> np.ndarray:
+        """Typical value at each timestamp: seasonal profile plus residual mean, else the median."""
+        seasonality = baseline.get('seasonal')
+        if seasonality:
+            return np.asarray(seasonality['profile'])[hour_of_week(index)] + baseline['residual_mean']
+        return np.full(len(index), float(baseline['median']))
+
+    async def _publish_alerts(
+        self,
+        parachain_id: str,
+        metric: str,
+        method: str,
+        anomalies: List[Dict[str, Any]],
+        baseline: Optional[Dict[str, Any]] = None
+    ):
+        """Hand new anomalies to the alert publisher, if one is configured."""
+        if not self.alert_publisher or not anomalies:
+            return
+
+        try:
+            # Unsigned scores need the expected value to tell drops from spikes
+            if baseline:
+                index = pd.DatetimeIndex([a["timestamp"] for a in anomalies])
+                expected = self._expected_values(baseline, index).tolist()
+                anomalies = [{**a, "expected": e} for a, e in zip(anomalies, expected)]
+
+            await self.alert_publisher.submit(parachain_id, metric, method, anomalies)
+
+        except Exception as e:
+            logging.error(f"Error publishing alerts for {parachain_id} {metric}: {e}")
+
+    def _model_inputs(self, baseline: Dict[str, Any], df: pd.DataFrame) -> List[str]:
+        """Columns an IsolationForest score depends on besides the value and timestamp."""
+        return [] if baseline.get('seasonal') else self._feature_cols(baseline, df)
+
+    def _model_scores(self, bundle: ModelBundle, rows: pd.DataFrame) -> np.ndarray:
+        """IsolationForest decision scores of one model bundle for the given rows."""
+        baseline = bundle.metadata
+        if baseline.get('seasonal'):
+            X = self._residuals(baseline, rows)[:, None]
+        else:
+            X = rows[self._feature_cols(baseline, rows)].to_numpy(dtype=float)
+        scaler = bundle.scaler
+        return bundle.model.decision_function(scaler.transform(X) if scaler else X)
+
+    def _incremental_scores(
+        self,
+        model_key: str,
+        baseline: Dict[str, Any],
+        frame: pd.DataFrame,
+        score_fn,
+        input_cols: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """
+        Score a window, reusing scores cached by earlier calls.
+
+        Points already scored by the current model with unchanged inputs
+        are looked up in the cache; only new or revised points go through
+        `score_fn`. Lag and rolling features make a point's inputs depend
+        on earlier values, so the whole input row is compared, not just
+        the value. The cache then holds exactly the window just scored,
+        so its size is bounded by the lookback.
+
+        Args:
+            model_key: Model identifier
+            baseline: Baseline of the model; a new `trained_at` invalidates the cache
+            frame: Preprocessed window indexed by timestamp
+            score_fn: Function scoring a DataFrame of rows
+            input_cols: Feature columns the score depends on besides the value
+
+        Returns:
+            Scores aligned with the rows of `frame`
+        """
+        timestamps = frame.index.values
+        inputs = ['value'] + [c for c in (input_cols or []) if c != 'value']
+        row_hashes = pd.util.hash_pandas_object(frame[inputs], index=False).to_numpy()
+        scores = np.empty(len(frame))
+        stale = np.ones(len(frame), dtype=bool)
+
+        cache = self.score_cache.get(model_key)
+        if cache and cache['trained_at'] == baseline.get('trained_at') and len(cache['timestamps']):
+            cached_ts = cache['timestamps']
+            pos = np.searchsorted(cached_ts, timestamps).clip(max=len(cached_ts) - 1)
+            hit = (cached_ts[pos] == timestamps) & (cache['row_hashes'][pos] == row_hashes)
+            scores[hit] = cache['scores'][pos[hit]]
+            stale = ~hit
+
+        if stale.any():
+            scores[stale] = score_fn(frame.loc[stale])
+
+        self.score_cache[model_key] = {
+            'trained_at': baseline.get('trained_at'),
+            'timestamps': timestamps,
+            'row_hashes': row_hashes,
+            'scores': scores.copy(),
+            'scored_through': timestamps[-1] if len(timestamps) else None
+        }
+        self.score_cache_stats['reused'] += int((~stale).sum())
+        self.score_cache_stats['scored'] += int(stale.sum())
+        return scores
+
+    def _feature_cols(self, baseline: Dict[str, Any], df: pd.DataFrame) -> List[str]:
+        """Get the feature columns a model was trained on."""
+        feature_cols = baseline.get('feature_cols')
+        if not feature_cols:
+            feature_cols = [c for c in ['hour', 'day_of_week', 'month'] if c in df.columns]
+        return list(feature_cols)
+
+    async def _get_recent_data(
+        self,
+        parachain_id: str,
+        metric: str,
+        days: int = 7,
+        with_context: bool = False
+    ) -> pd.DataFrame:
+        """
+        Fetch and preprocess the most recent window of a series.
+
+        Twice the window is fetched so lag and rolling features are populated
+        for every point in the scored window. With `with_context` the extra
+        history is returned too, for methods that need a trailing baseline.
+        """
+        if not self.data_loader:
+            logging.error("Anomaly detector has no data loader configured")
+            return pd.DataFrame()
+
+        try:
+            window_start = datetime.now() - timedelta(days=days)
+            raw = await self.data_loader.get_parachain_data(
+                parachain_id=parachain_id,
+                metric=metric,
+                start_date=window_start - timedelta(days=days)
+            )
+            if raw.empty:
+                return raw
+
+            processed = await self.data_loader.preprocess_time_series(raw)
+            if with_context:
+                return processed
+            return processed.loc[processed.index >= window_start]
+
+        except Exception as e:
+            logging.error(f"Error fetching recent data for {parachain_id} {metric}: {e}")
+            return pd.DataFrame()
+
+    def _save_model(self, model_key: str, model: Any, scaler: Any, baseline: Dict):
+        """Publish model, scaler and baseline as one versioned bundle."""
+        try:
+            self.registry.publish(model_key, model, scaler, baseline.get('feature_cols', []), baseline)
+
+        except Exception as e:
+            logging.error(f"Error saving anomaly model {model_key}: {e}")
+
+    async def _load_model(self, model_key: str) -> Optional[ModelBundle]:
+        """
+        Load the current anomaly model bundle.
+
+        Concurrent requests for a cold key share a single load; models saved
+        as three pickles by older versions are migrated on first load.
+        """
+        try:
+            bundle = await self.registry.load(model_key, lambda: self._read_legacy(model_key))
+            if bundle is None:
                 logging.warning(f"Anomaly model {model_key} not found on disk")
+            return bundle
 
         except Exception as e:
             logging.error(f"Error loading anomaly model {model_key}: {e}")
+            return None
+
+    def _read_legacy(self, model_key: str) -> Optional[tuple]:
+        """Read a model saved as separate model/scaler/baseline pickles."""
+        model_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_model.pkl")
+        scaler_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_scaler.pkl")
+        baseline_path = os.path.join(self.cache_dir, f"{model_key}_anomaly_baseline.pkl")
+
+        if not os.path.exists(baseline_path):
+            return None
+
+        baseline = joblib.load(baseline_path)
+        scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else None
+        model = joblib.load(model_path) if os.path.exists(model_path) else None
+        return model, scaler, baseline.get('feature_cols', []), baseline
+
+    async def retrain(
+        self,
+        data_loader=None,
+        series: Optional[List[str]] = None,
+        force: bool = False,
+        drift_threshold: float = 3.0
+    ) -> Dict[str, Any]:
+        """
+        Retrain anomaly models whose series changed since they were last trained.
+
+        Args:
+            data_loader: DataLoader used to fetch current data
+            series: Model keys to consider (defaults to every tracked model)
+            force: Refit every series regardless of change detection
+            drift_threshold: z threshold for the drift test on new points
+
+        Returns:
+            Retrain report listing refit, skipped and failed series
+        """
+        report = new_retrain_report()
+        started = time.perf_counter()
 
-    async def retrain(self):
-        """Retrain all anomaly detection models."""
         try:
+            if data_loader is None:
+                logging.warning("No data loader supplied, skipping anomaly model retraining")
+            else:
+                for model_key in (series or self._tracked_model_keys()):
+                    await self._retrain_series(data_loader, model_key, report, force, drift_threshold)
+
             self._ready = True
-            logging.info("Anomaly detection model retraining completed")
+            report["elapsed_seconds"] = time.perf_counter() - started
+            logging.info(
+                f"Anomaly detection model retraining completed: {len(report['refit'])} refit, "
+                f"{len(report['skipped'])} skipped, {len(report['failed'])} failed, "
+                f"{report['time_saved_seconds']:.1f}s saved"
+            )
 
         except Exception as e:
             logging.error(f"Error retraining anomaly models: {e}")
+            report["error"] = str(e)
+
+        return report
+
+    async def _retrain_series(
+        self,
+        data_loader,
+        model_key: str,
+        report: Dict[str, Any],
+        force: bool,
+        drift_threshold: float
+    ):
+        """Check one series for changes and refit its anomaly model if needed."""
+        try:
+            bundle = await self._load_model(model_key)
+            if bundle is None:
+                report["failed"].append({"series": model_key, "error": "Model not available"})
+                return
+
+            baseline = dict(bundle.metadata or {})
+            tracked = bool(baseline.get('content_hash'))
+            if not tracked:
+                # Saved before training windows were recorded: take the series from the key
+                identity = parse_model_key(model_key, MODEL_METHODS)
+                if identity:
+                    baseline.update(zip(('parachain_id', 'metric', 'method'), identity))
+                elif not all(baseline.get(k) for k in ('parachain_id', 'metric', 'method')):
+                    report["failed"].append({"series": model_key, "error": "Cannot identify series of model"})
+                    return
+
+            raw = await data_loader.get_parachain_data(
+                parachain_id=baseline['parachain_id'],
+                metric=baseline['metric'],
+                start_date=(
+                    baseline['first_timestamp'] if tracked
+                    else datetime.now() - timedelta(days=UNTRACKED_WINDOW_DAYS)
+                )
+            )
+
+            if force:
+                change = {"decision": "forced"}
+            else:
+                # Residuals against the training baseline: drift shows up as a mean shift.
+                # Untracked baselines are classified as such before any residual is computed
+                center, scale = self._residual_params(baseline) if tracked else (0.0, 0.0)
+                change = await asyncio.to_thread(
+                    classify_change,
+                    raw,
+                    {**baseline, 'residual_mean': 0.0, 'residual_std': scale},
+                    lambda rows: self._residuals(baseline, rows) - center,
+                    drift_threshold=drift_threshold
+                )
+
+            self.request_counts[model_key] = 0
+            self.drift_scores[model_key] = abs(change.get("drift", {}).get("z_score", 0.0))
+
+            if not force and change["decision"] not in REFIT_DECISIONS:
+                report["skipped"].append({"series": model_key, **change})
+                report["time_saved_seconds"] += baseline.get('train_seconds', 0.0)
+                return
+
+            processed = await asyncio.to_thread(data_loader.preprocess_frame, raw.copy())
+            window = processed
+            if tracked:
+                span = baseline['last_timestamp'] - baseline['first_timestamp']
+                window = window.loc[window.index >= window.index.max() - span]
+            # Untracked models recorded no seasonality setting and get the default
+            seasonal = bool(baseline.get('seasonal')) if tracked else True
+            feature_cols = baseline.get('feature_cols') or list(bundle.feature_cols)
+            if not seasonal and feature_cols:
+                window = window[['value'] + [c for c in feature_cols if c in window.columns]]
+
+            result = await self.train_anomaly_detector(
+                window, baseline['parachain_id'], baseline['metric'], baseline['method'],
+                seasonal=seasonal
+            )
+            if "error" in result:
+                report["failed"].append({"series": model_key, "error": result["error"]})
+            else:
+                self.drift_scores[model_key] = 0.0
+                report["refit"].append({"series": model_key, "reason": change["decision"]})
+
+        except Exception as e:
+            logging.error(f"Error retraining anomaly model {model_key}: {e}")
+            report["failed"].append({"series": model_key, "error": str(e)})
+
+    def _tracked_model_keys(self) -> List[str]:
+        """List published anomaly model keys plus legacy models awaiting migration."""
+        keys = set(self.registry.model_keys())
+        if os.path.exists(self.cache_dir):
+            keys.update(
+                f[:-len("_anomaly_baseline.pkl")]
+                for f in os.listdir(self.cache_dir) if f.endswith("_anomaly_baseline.pkl")
+            )
+        return sorted(keys)
+
+    def series_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get scheduling stats for every tracked anomaly model.
+
+        Returns:
+            Mapping of model key to last training time, requests since the
+            last retrain check and last measured drift
+        """
+        series = {}
+        for model_key in self._tracked_model_keys():
+            # The pointer carries the publish time without loading the bundle
+            pointer = self.registry.describe(model_key) or {}
+
+            series[model_key] = {
+                "trained_at": pointer.get("published_at"),
+                "requests": self.request_counts.get(model_key, 0),
+                "drift": self.drift_scores.get(model_key, 0.0)
+            }
+        return series
 
     async def get_detection_methods(self) -> List[str]:
         """Get available anomaly detection methods."""
-        return ["isolation_forest", "statistical", "zscore"]
+        return [
+            "isolation_forest", "statistical", "zscore",
+            *RollingRobustDetector.METHODS, *ChangePointDetector.METHODS
+        ]
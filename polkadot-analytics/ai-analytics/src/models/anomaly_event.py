@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Float, DateTime, Index, UniqueConstraint
+from .base import BaseModel, Base
+
+class AnomalyEvent(BaseModel, Base):
+    __tablename__ = 'anomaly_events'
+    __table_args__ = (
+        # One event per series, point and method: re-running detection is idempotent
+        UniqueConstraint('parachain_id', 'metric', 'timestamp', 'method', name='uq_anomaly_event'),
+        Index('ix_anomaly_events_parachain_timestamp', 'parachain_id', 'timestamp'),
+        Index('ix_anomaly_events_severity_timestamp', 'severity', 'timestamp'),
+    )
+    
+    # Series and point
+    parachain_id = Column(String(32), nullable=False)
+    metric = Column(String(64), nullable=False)
+    timestamp = Column(DateTime, nullable=False, index=True)
+    method = Column(String(32), nullable=False)
+    
+    # Detection result
+    value = Column(Float, nullable=True)
+    score = Column(Float, nullable=True)
+    severity = Column(String(16), nullable=False)
+    description = Column(String(512), nullable=True)
+    
+    def __repr__(self):
+        return f"<AnomalyEvent {self.parachain_id}.{self.metric} @ {self.timestamp} ({self.method})>"
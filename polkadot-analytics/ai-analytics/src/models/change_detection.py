@@ -0,0 +1,197 @@
+"""
+Change detection for model retraining
+Decides whether a series needs refitting by comparing its training
+window fingerprint against current data and testing recent residuals for drift
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Decisions returned by classify_change
+UNCHANGED = "unchanged"
+NO_DRIFT = "no_drift"
+REVISED = "revised"
+DRIFTED = "drifted"
+UNTRACKED = "untracked"
+
+REFIT_DECISIONS = (REVISED, DRIFTED, UNTRACKED)
+
+# Training window used to refit models that recorded none
+UNTRACKED_WINDOW_DAYS = 90
+
+
+def parse_model_key(model_key: str, model_types) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a '{parachain_id}_{metric}_{model_type}' model key.
+
+    Model types and metric names may contain underscores, so the type is
+    matched against the known ones (longest first).
+
+    Args:
+        model_key: Model identifier
+        model_types: Model types (or methods) the key may end with
+
+    Returns:
+        (parachain_id, metric, model_type), or None if the key does not parse
+    """
+    for model_type in sorted(model_types, key=len, reverse=True):
+        suffix = f"_{model_type}"
+        if model_key.endswith(suffix):
+            parachain_id, _, metric = model_key[:-len(suffix)].partition("_")
+            if parachain_id and metric:
+                return parachain_id, metric, model_type
+    return None
+
+
+def content_hash(values: pd.Series) -> str:
+    """
+    Compute a stable content hash of a value series and its index.
+
+    Args:
+        values: Series of metric values indexed by timestamp
+
+    Returns:
+        Hex digest identifying the series content
+    """
+    if values.empty:
+        return hashlib.sha256(b"").hexdigest()
+
+    hashed = pd.util.hash_pandas_object(values.astype(float), index=True).values
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def window_fingerprint(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Build the fingerprint recorded with a model at training time.
+
+    Args:
+        df: Training DataFrame with a 'value' column and timestamp index
+
+    Returns:
+        Fingerprint with content hash, window bounds and point count
+    """
+    values = df['value']
+    first_ts = values.index.min() if len(values) else None
+    last_ts = values.index.max() if len(values) else None
+
+    return {
+        "content_hash": content_hash(values),
+        "first_timestamp": first_ts,
+        "last_timestamp": last_ts,
+        "n_points": int(len(values))
+    }
+
+
+def residual_drift(
+    residuals: np.ndarray,
+    ref_mean: float,
+    ref_std: float,
+    threshold: float = 3.0
+) -> Dict[str, Any]:
+    """
+    Cheap drift test on recent residuals.
+
+    Flags drift when the mean of recent residuals is more than `threshold`
+    standard errors away from the training residual mean, or when their
+    spread has more than doubled.
+
+    Args:
+        residuals: Residuals of the current model on new points
+        ref_mean: Mean residual on the training hold-out
+        ref_std: Residual standard deviation on the training hold-out
+        threshold: z threshold for the mean-shift test
+
+    Returns:
+        Drift test result
+    """
+    residuals = np.asarray(residuals, dtype=float)
+    residuals = residuals[np.isfinite(residuals)]
+
+    if residuals.size == 0:
+        return {"drifted": False, "z_score": 0.0, "std_ratio": 1.0, "n": 0}
+
+    if not ref_std or ref_std <= 0:
+        ref_std = float(np.std(residuals)) or 1.0
+
+    z_score = (residuals.mean() - ref_mean) / (ref_std / np.sqrt(residuals.size))
+    std_ratio = float(residuals.std() / ref_std) if residuals.size > 1 else 1.0
+
+    return {
+        "drifted": bool(abs(z_score) > threshold or std_ratio > 2.0),
+        "z_score": float(z_score),
+        "std_ratio": std_ratio,
+        "n": int(residuals.size)
+    }
+
+
+def classify_change(
+    raw: pd.DataFrame,
+    metadata: Optional[Dict[str, Any]],
+    residual_fn: Callable[[pd.DataFrame], np.ndarray],
+    drift_threshold: float = 3.0
+) -> Dict[str, Any]:
+    """
+    Decide whether a series changed since its model was trained.
+
+    Args:
+        raw: Current data for the series, starting at the recorded window start
+        metadata: Metadata recorded with the model (None if never tracked)
+        residual_fn: Callable returning model residuals for a DataFrame of new points
+        drift_threshold: z threshold for the residual drift test
+
+    Returns:
+        Decision with supporting details
+    """
+    if not metadata or not metadata.get("content_hash"):
+        return {"decision": UNTRACKED}
+
+    if raw.empty or 'value' not in raw.columns:
+        return {"decision": UNCHANGED, "new_points": 0}
+
+    first_ts = metadata.get("first_timestamp")
+    last_ts = metadata.get("last_timestamp")
+
+    window = raw.loc[(raw.index >= first_ts) & (raw.index <= last_ts), 'value']
+    if content_hash(window) != metadata["content_hash"]:
+        return {"decision": REVISED, "new_points": int((raw.index > last_ts).sum())}
+
+    new_rows = raw.loc[raw.index > last_ts]
+    if new_rows.empty:
+        return {"decision": UNCHANGED, "new_points": 0}
+
+    try:
+        residuals = residual_fn(new_rows)
+    except Exception as e:
+        logging.warning(f"Residual computation failed, treating series as drifted: {e}")
+        return {"decision": DRIFTED, "new_points": len(new_rows), "error": str(e)}
+
+    drift = residual_drift(
+        residuals,
+        metadata.get("residual_mean", 0.0),
+        metadata.get("residual_std", 0.0),
+        threshold=drift_threshold
+    )
+
+    return {
+        "decision": DRIFTED if drift["drifted"] else NO_DRIFT,
+        "new_points": int(len(new_rows)),
+        "drift": drift
+    }
+
+
+def new_retrain_report() -> Dict[str, Any]:
+    """Create an empty retrain report."""
+    return {
+        "refit": [],
+        "skipped": [],
+        "failed": [],
+        "time_saved_seconds": 0.0,
+        "elapsed_seconds": 0.0,
+        "started_at": datetime.now().isoformat()
+    }
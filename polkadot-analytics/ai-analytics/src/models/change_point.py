@@ -0,0 +1,299 @@
+"""
+Change-point detection for sustained level shifts
+CUSUM for online monitoring and binary segmentation for offline analysis
+"""
+
+import logging
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+# Numba is optional; the CUSUM recursion falls back to a plain loop without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Scale factor making the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+
+
+def noise_scale(values: np.ndarray) -> float:
+    """
+    Robust noise estimate that ignores level shifts.
+
+    Uses the MAD of first differences, so a few large jumps between regimes
+    do not inflate the estimate the way the overall standard deviation would.
+    """
+    diffs = np.diff(values)
+    if diffs.size == 0:
+        return 0.0
+    sigma = MAD_SCALE * np.median(np.abs(diffs - np.median(diffs))) / np.sqrt(2)
+    if sigma > 0:
+        return float(sigma)
+    return float(np.std(values))
+
+
+def _cusum_loop(x, threshold, drift, warmup):
+    n = x.shape[0]
+    alarms = np.full(n, -1, dtype=np.int64)
+    starts = np.full(n, -1, dtype=np.int64)
+    n_alarms = 0
+
+    seg_start = 0
+    ref = 0.0
+    pos = 0.0
+    neg = 0.0
+    pos_start = 0
+    neg_start = 0
+
+    t = 0
+    while t < n:
+        # Reference level: mean of the first `warmup` points of the segment
+        if t - seg_start < warmup:
+            ref += (x[t] - ref) / (t - seg_start + 1)
+            pos_start = t + 1
+            neg_start = t + 1
+            t += 1
+            continue
+
+        pos = max(0.0, pos + x[t] - ref - drift)
+        neg = max(0.0, neg + ref - x[t] - drift)
+        if pos == 0.0:
+            pos_start = t + 1
+        if neg == 0.0:
+            neg_start = t + 1
+
+        if pos > threshold or neg > threshold:
+            # The shift began where the triggering sum last left zero
+            change = pos_start if pos > threshold else neg_start
+            alarms[n_alarms] = t
+            starts[n_alarms] = change
+            n_alarms += 1
+
+            # Restart from the change with a fresh reference level
+            seg_start = change
+            t = change
+            ref = 0.0
+            pos = 0.0
+            neg = 0.0
+            continue
+
+        t += 1
+
+    return starts[:n_alarms], alarms[:n_alarms]
+
+
+if NUMBA_AVAILABLE:
+    _cusum_kernel = njit(cache=True)(_cusum_loop)
+else:
+    _cusum_kernel = _cusum_loop
+
+
+def cusum(
+    values: np.ndarray,
+    threshold: float = 8.0,
+    drift: float = 1.0,
+    warmup: int = 24
+) -> Dict[str, np.ndarray]:
+    """
+    Two-sided tabular CUSUM on noise-standardized values.
+
+    Each point is visited once, with a restart after every alarm, so the cost
+    is linear in the series length and state is O(1): the same recursion can
+    run online, one point at a time.
+
+    Args:
+        values: 1-D series
+        threshold: Alarm level for the cumulative sums, in noise units
+        drift: Slack per point, in noise units (half the smallest shift of interest)
+        warmup: Points used to set the reference level after each restart
+
+    Returns:
+        Estimated change indices and the indices where each alarm fired
+    """
+    values = np.asarray(values, dtype=float)
+    sigma = noise_scale(values)
+    if values.size <= warmup or sigma == 0:
+        empty = np.array([], dtype=np.int64)
+        return {"change_points": empty, "alarms": empty}
+
+    standardized = np.ascontiguousarray(values / sigma)
+    starts, alarms = _cusum_kernel(standardized, float(threshold), float(drift), int(warmup))
+    return {"change_points": np.asarray(starts), "alarms": np.asarray(alarms)}
+
+
+def binary_segmentation(
+    values: np.ndarray,
+    penalty: Optional[float] = None,
+    min_size: int = 24,
+    max_change_points: int = 20
+) -> np.ndarray:
+    """
+    Offline mean-shift segmentation by recursive best splits.
+
+    Segment costs come from prefix sums, so evaluating every split of a
+    segment is one vectorized O(n) pass and the whole search is O(n log n).
+
+    Args:
+        values: 1-D series
+        penalty: Minimum cost reduction for a split (default: BIC-style 2 * sigma^2 * log n)
+        min_size: Minimum points per segment
+        max_change_points: Upper bound on the number of splits
+
+    Returns:
+        Sorted indices where new segments begin
+    """
+    x = np.asarray(values, dtype=float)
+    n = x.size
+    if n < 2 * min_size:
+        return np.array([], dtype=np.int64)
+
+    if penalty is None:
+        penalty = 2.0 * noise_scale(x) ** 2 * np.log(n)
+
+    s1 = np.concatenate(([0.0], np.cumsum(x)))
+    s2 = np.concatenate(([0.0], np.cumsum(x * x)))
+
+    def cost(a, b):
+        # Sum of squared deviations from the mean of x[a:b]
+        return (s2[b] - s2[a]) - (s1[b] - s1[a]) ** 2 / (b - a)
+
+    def best_split(a, b):
+        splits = np.arange(a + min_size, b - min_size + 1)
+        if splits.size == 0:
+            return None, 0.0
+        left = (s2[splits] - s2[a]) - (s1[splits] - s1[a]) ** 2 / (splits - a)
+        right = (s2[b] - s2[splits]) - (s1[b] - s1[splits]) ** 2 / (b - splits)
+        gains = cost(a, b) - (left + right)
+        i = int(np.argmax(gains))
+        return int(splits[i]), float(gains[i])
+
+    change_points = []
+    candidates = []
+    split, gain = best_split(0, n)
+    if split is not None:
+        candidates.append((gain, 0, n, split))
+
+    while candidates and len(change_points) < max_change_points:
+        candidates.sort()
+        gain, a, b, split = candidates.pop()
+        if gain <= penalty:
+            break
+        change_points.append(split)
+        for lo, hi in ((a, split), (split, b)):
+            child, child_gain = best_split(lo, hi)
+            if child is not None:
+                candidates.append((child_gain, lo, hi, child))
+
+    return np.array(sorted(change_points), dtype=np.int64)
+
+
+def describe_segments(
+    values: np.ndarray,
+    timestamps: np.ndarray,
+    change_points: np.ndarray
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Summarize the segments between change points and the shift at each boundary.
+
+    Args:
+        values: 1-D series
+        timestamps: ISO timestamps aligned with values
+        change_points: Sorted indices where new segments begin
+
+    Returns:
+        Segments (start, end, mean, points) and shifts (timestamp, before/after
+        means, absolute and relative shift, shift in noise units)
+    """
+    values = np.asarray(values, dtype=float)
+    bounds = np.concatenate(([0], np.asarray(change_points, dtype=np.int64), [values.size]))
+    sums = np.add.reduceat(values, bounds[:-1]) if values.size else np.array([])
+    counts = np.diff(bounds)
+    means = sums / np.maximum(counts, 1)
+    sigma = noise_scale(values)
+
+    segments = [
+        {
+            "start": timestamps[start],
+            "end": timestamps[end - 1],
+            "mean": float(mean),
+            "points": int(count)
+        }
+        for start, end, mean, count in zip(bounds[:-1], bounds[1:], means, counts)
+    ]
+
+    shifts = []
+    for i, cp in enumerate(bounds[1:-1]):
+        before, after = float(means[i]), float(means[i + 1])
+        shift = after - before
+        shifts.append({
+            "index": int(cp),
+            "timestamp": timestamps[cp],
+            "before_mean": before,
+            "after_mean": after,
+            "shift": shift,
+            "relative_shift": shift / abs(before) if before else None,
+            "shift_sigma": shift / sigma if sigma > 0 else 0.0,
+            "direction": "increase" if shift > 0 else "decrease"
+        })
+
+    return {"segments": segments, "shifts": shifts}
+
+
+class ChangePointDetector:
+    """Finds sustained level shifts with CUSUM or binary segmentation."""
+
+    METHODS = ("cusum", "binary_segmentation")
+
+    def __init__(
+        self,
+        cusum_threshold: float = 8.0,
+        cusum_drift: float = 1.0,
+        min_segment: int = 24
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            cusum_threshold: CUSUM alarm level in noise units
+            cusum_drift: CUSUM slack per point in noise units
+            min_segment: Minimum segment length (CUSUM warmup and binary segmentation min size)
+        """
+        self.cusum_threshold = cusum_threshold
+        self.cusum_drift = cusum_drift
+        self.min_segment = min_segment
+
+        if not NUMBA_AVAILABLE:
+            logging.info("numba not available, using pure Python CUSUM")
+
+    def detect(
+        self,
+        values: np.ndarray,
+        timestamps: np.ndarray,
+        method: str = "cusum",
+        penalty: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Find change points in one series.
+
+        Args:
+            values: 1-D series
+            timestamps: ISO timestamps aligned with values
+            method: 'cusum' or 'binary_segmentation'
+            penalty: Split penalty for binary segmentation
+
+        Returns:
+            Change point indices with segment and shift summaries
+        """
+        if method == "cusum":
+            change_points = cusum(values, self.cusum_threshold, self.cusum_drift, self.min_segment)["change_points"]
+        elif method == "binary_segmentation":
+            change_points = binary_segmentation(values, penalty, self.min_segment)
+        else:
+            raise ValueError(f"Unknown change-point method: {method}")
+
+        # Restarts can land on an earlier estimate; keep each boundary once
+        change_points = np.unique(change_points[(change_points > 0) & (change_points < len(values))])
+        return {"change_points": change_points, **describe_segments(values, timestamps, change_points)}
@@ -0,0 +1,396 @@
+"""
+Cross-parachain anomaly detection
+Aligns parachains on a common time grid, keeps rolling covariance sums per
+panel that advance one grid point at a time, and groups synchronized moves
+and correlation shifts into ecosystem events
+"""
+
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Any, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def align_panel(frames: Dict[str, pd.Series], freq: str = "h", max_gap: int = 6) -> pd.DataFrame:
+    """
+    Align per-parachain series on a common time grid.
+
+    Args:
+        frames: Values indexed by timestamp, keyed by parachain id
+        freq: Grid frequency
+        max_gap: Longest run of missing grid points to forward-fill
+
+    Returns:
+        DataFrame indexed by grid timestamp with one column per parachain
+    """
+    if not frames:
+        return pd.DataFrame()
+    matrix = pd.concat(frames, axis=1).sort_index()
+    return matrix.resample(freq).last().ffill(limit=max_gap)
+
+
+def mean_correlation(cov: np.ndarray) -> float:
+    """Average pairwise correlation of an (N, N) covariance matrix."""
+    std = np.sqrt(np.clip(np.diagonal(cov), 0, None))
+    valid = std > 0
+    n = int(valid.sum())
+    if n < 2:
+        return float("nan")
+    # Sum of all correlations as a quadratic form, without forming the matrix
+    inv = np.divide(1.0, std, out=np.zeros_like(std), where=valid)
+    return float((inv @ cov @ inv - n) / (n * (n - 1)))
+
+
+class PanelState:
+    """
+    Rolling moments of one aligned panel.
+
+    Holds the last `window` raw changes in a ring buffer plus first and
+    second moment sums over the long and short windows. Each new grid point
+    adds its row and subtracts the row leaving each window, so advancing
+    costs O(N^2) regardless of history length and memory stays at
+    O(window x N + N^2) plus the retained per-step signals.
+
+    Changes are centered and winsorized with a robust scale taken from the
+    ring buffer. The scale is refreshed every `refresh` steps, and the sums
+    are rebuilt from the buffer at the same time so that rounding error from
+    the running updates cannot accumulate.
+    """
+
+    def __init__(
+        self,
+        columns: Tuple[str, ...],
+        window: int,
+        short_window: int,
+        z_threshold: float,
+        refresh: int,
+        retention: int
+    ):
+        n = len(columns)
+        self.columns = columns
+        self.window = window
+        self.short_window = short_window
+        self.z_threshold = z_threshold
+        self.refresh = refresh
+
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self.last_values: Optional[np.ndarray] = None
+        self.bucket: Optional[pd.Timedelta] = None
+
+        self.ring = np.zeros((window, n))
+        self.pos = 0
+        self.filled = 0
+        self.since_refresh = 0
+        self.center = np.zeros(n)
+        self.limit = np.full(n, np.inf)
+        self.long_sum = np.zeros(n)
+        self.long_outer = np.zeros((n, n))
+        self.short_sum = np.zeros(n)
+        self.short_outer = np.zeros((n, n))
+
+        self.timestamps: deque = deque(maxlen=retention)
+        self.z: deque = deque(maxlen=retention)
+        self.corr_short: deque = deque(maxlen=retention)
+        self.corr_long: deque = deque(maxlen=retention)
+
+    def matches(self, values: pd.DataFrame) -> bool:
+        """Whether `values` extends what this state has already consumed."""
+        if self.last_timestamp is None or self.last_timestamp not in values.index:
+            return False
+        if len(values) > 1 and values.index[1] - values.index[0] != self.bucket:
+            return False
+        current = values.loc[self.last_timestamp].to_numpy(dtype=float)
+        return bool(np.allclose(current, self.last_values, equal_nan=True))
+
+    def extend(self, values: pd.DataFrame) -> None:
+        """Consume the grid points of `values` after the last one seen."""
+        if self.last_timestamp is not None:
+            values = values.loc[values.index > self.last_timestamp]
+        if values.empty:
+            return
+        if self.bucket is None and len(values) > 1:
+            self.bucket = values.index[1] - values.index[0]
+
+        rows = values.to_numpy(dtype=float)
+        for timestamp, row in zip(values.index, rows):
+            if self.last_values is not None:
+                self._advance(timestamp, row - self.last_values)
+            self.last_values = row
+            self.last_timestamp = timestamp
+
+    def _clip(self, change: np.ndarray) -> np.ndarray:
+        return np.clip(change - self.center, -self.limit, self.limit)
+
+    def _advance(self, timestamp: pd.Timestamp, change: np.ndarray) -> None:
+        """Score one row of changes and roll it into both windows."""
+        centered = change - self.center
+
+        # Score against the window that ends just before this step
+        z = np.zeros(len(change))
+        if self.filled == self.window:
+            mean = self.long_sum / self.window
+            var = (np.diagonal(self.long_outer) / self.window - mean ** 2) * (self.window / (self.window - 1))
+            std = np.sqrt(np.clip(var, 0, None))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z = np.nan_to_num(np.where(std > 0, (centered - mean) / std, 0.0))
+
+        x = self._clip(change)
+        if self.filled == self.window:
+            old = self._clip(self.ring[self.pos])
+            self.long_sum -= old
+            self.long_outer -= np.outer(old, old)
+        if self.filled >= self.short_window:
+            old = self._clip(self.ring[(self.pos - self.short_window) % self.window])
+            self.short_sum -= old
+            self.short_outer -= np.outer(old, old)
+        outer = np.outer(x, x)
+        self.long_sum += x
+        self.long_outer += outer
+        self.short_sum += x
+        self.short_outer += outer
+
+        self.ring[self.pos] = change
+        self.pos = (self.pos + 1) % self.window
+        self.filled = min(self.filled + 1, self.window)
+        self.since_refresh += 1
+        warming = self.filled == self.short_window < self.window
+        if warming or (self.filled == self.window and self.since_refresh >= self.refresh):
+            self._rebuild()
+
+        self.timestamps.append(timestamp)
+        self.z.append(z)
+        self.corr_short.append(self._correlation(self.short_sum, self.short_outer, self.short_window))
+        self.corr_long.append(self._correlation(self.long_sum, self.long_outer, self.window))
+
+    def _correlation(self, total: np.ndarray, outer: np.ndarray, window: int) -> float:
+        if window < 2 or self.filled < window:
+            return float("nan")
+        cov = (outer - np.outer(total, total) / window) / (window - 1)
+        return mean_correlation(cov)
+
+    def _rebuild(self) -> None:
+        """Refresh the robust center and scale and recompute the sums exactly."""
+        if self.filled < self.window:
+            rows = self.ring[:self.filled]
+        else:
+            rows = np.roll(self.ring, -self.pos, axis=0)
+
+        # Sums come from winsorized changes: a crash then neither inflates
+        # the baselines for a whole window nor registers as a correlation
+        # breakdown when it later leaves the short window
+        self.center = np.median(rows, axis=0)
+        deviation = np.abs(rows - self.center)
+        scale = 1.4826 * np.median(deviation, axis=0)
+        self.limit = self.z_threshold * np.where(scale > 0, scale, deviation.max(axis=0))
+
+        clipped = self._clip(rows)
+        recent = clipped[-self.short_window:]
+        self.long_sum = clipped.sum(axis=0)
+        self.long_outer = clipped.T @ clipped
+        self.short_sum = recent.sum(axis=0)
+        self.short_outer = recent.T @ recent
+        self.since_refresh = 0
+
+
+class EcosystemDetector:
+    """
+    Detects events that hit many parachains at once.
+
+    Works on first differences of an aligned parachain x time matrix. Two
+    signals are computed for every time step:
+
+    - synchronized moves: the share of parachains whose change is an outlier
+      against their own trailing window
+    - correlation shifts: the gap between average pairwise correlation over a
+      short and a long trailing window (a surge when parachains suddenly move
+      together, a breakdown when usual co-movement disappears)
+
+    Rolling moments live in a PanelState per stream key, so repeated calls
+    on a growing panel only process the grid points added since the last
+    call. Consecutive flagged steps are merged into one ecosystem event
+    listing the parachains involved, so a market-wide crash is reported once.
+    """
+
+    def __init__(
+        self,
+        window: int = 168,
+        short_window: int = 24,
+        z_threshold: float = 4.0,
+        min_fraction: float = 0.3,
+        min_series: int = 3,
+        correlation_shift: float = 0.3,
+        merge_gap: int = 3,
+        refresh: int = 24,
+        retention: int = 24 * 31,
+        max_streams: int = 32
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            window: Trailing points for per-series baselines and long-run correlation
+            short_window: Trailing points for the recent correlation
+            z_threshold: |z| at which a parachain's move counts as an outlier
+            min_fraction: Share of parachains that must move together
+            min_series: Minimum parachains moving together (and minimum panel width)
+            correlation_shift: Change in average correlation that is flagged
+            merge_gap: Flagged steps at most this far apart belong to the same event
+            refresh: Steps between robust scale refreshes of a panel's state
+            retention: Per-step signals kept per stream for event reporting
+            max_streams: Panel states kept before the least recently used is dropped
+        """
+        self.window = window
+        self.short_window = min(short_window, window)
+        self.z_threshold = z_threshold
+        self.min_fraction = min_fraction
+        self.min_series = min_series
+        self.correlation_shift = correlation_shift
+        self.merge_gap = merge_gap
+        self.refresh = refresh
+        self.retention = retention
+        self.max_streams = max_streams
+        self._states: "OrderedDict[Tuple[Hashable, Tuple[str, ...]], PanelState]" = OrderedDict()
+
+    def detect(
+        self,
+        matrix: pd.DataFrame,
+        since: Optional[pd.Timestamp] = None,
+        key: Optional[Hashable] = None
+    ) -> Dict[str, Any]:
+        """
+        Find ecosystem events in an aligned panel.
+
+        Args:
+            matrix: Output of align_panel (timestamps x parachains)
+            since: Only report events that end at or after this time
+            key: Stream identifier (e.g. the metric). With a key the rolling
+                state is kept and the next call only consumes newer grid
+                points; without one the panel is processed from scratch.
+
+        Event `start` is the first flagged grid point and `end` the end of
+        the last flagged grid interval.
+
+        Returns:
+            Events, per-step signal summaries and the parachains analyzed
+        """
+        # Parachains need a full baseline window; gaps left after alignment count as no change
+        matrix = matrix.loc[:, matrix.notna().sum() > self.window]
+        if matrix.shape[1] < self.min_series:
+            return {"events": [], "parachains": list(matrix.columns), "points": len(matrix)}
+
+        columns = tuple(str(c) for c in matrix.columns)
+        values = matrix.ffill().bfill()
+        state = self._state(key, columns, values)
+        state.extend(values)
+
+        # Report on the steps covered by this panel
+        timestamps = pd.DatetimeIndex(state.timestamps)
+        keep = timestamps > matrix.index[0]
+        timestamps = timestamps[keep]
+        z = np.array(state.z).reshape(-1, len(columns))[keep]
+        corr_short = np.array(state.corr_short)[keep]
+        corr_long = np.array(state.corr_long)[keep]
+
+        outliers = np.abs(z) > self.z_threshold
+        movers = outliers.sum(axis=1)
+        breadth = movers / len(columns)
+        synchronized = (movers >= self.min_series) & (breadth >= self.min_fraction)
+
+        shift = corr_short - corr_long
+        surge = np.nan_to_num(shift) > self.correlation_shift
+        breakdown = np.nan_to_num(shift) < -self.correlation_shift
+
+        flagged = np.flatnonzero(synchronized | surge | breakdown)
+        events = []
+        if flagged.size:
+            groups = np.split(flagged, np.flatnonzero(np.diff(flagged) > self.merge_gap) + 1)
+            for steps in groups:
+                if since is not None and timestamps[steps[-1]] < since:
+                    continue
+                events.append(self._describe(
+                    steps, timestamps, state.bucket, list(columns), z, outliers, breadth,
+                    synchronized, surge, breakdown, corr_short, corr_long
+                ))
+
+        return {
+            "events": events,
+            "parachains": list(columns),
+            "points": len(timestamps),
+            "latest_breadth": float(breadth[-1]) if len(breadth) else 0.0,
+            "latest_correlation": {
+                "short": None if not len(corr_short) or np.isnan(corr_short[-1]) else float(corr_short[-1]),
+                "long": None if not len(corr_long) or np.isnan(corr_long[-1]) else float(corr_long[-1])
+            }
+        }
+
+    def _state(self, key: Optional[Hashable], columns: Tuple[str, ...], values: pd.DataFrame) -> PanelState:
+        """Rolling state that `values` can extend, starting a new one if none fits."""
+        def fresh() -> PanelState:
+            return PanelState(
+                columns, self.window, self.short_window, self.z_threshold,
+                self.refresh, self.retention
+            )
+
+        if key is None:
+            return fresh()
+
+        # A different parachain set, a gap or revised history invalidates the sums
+        slot = (key, columns)
+        state = self._states.get(slot)
+        if state is None or not state.matches(values):
+            state = fresh()
+        self._states[slot] = state
+        self._states.move_to_end(slot)
+        while len(self._states) > self.max_streams:
+            self._states.popitem(last=False)
+        return state
+
+    def _describe(
+        self,
+        steps: np.ndarray,
+        timestamps: pd.DatetimeIndex,
+        bucket: pd.Timedelta,
+        parachains: List[str],
+        z: np.ndarray,
+        outliers: np.ndarray,
+        breadth: np.ndarray,
+        synchronized: np.ndarray,
+        surge: np.ndarray,
+        breakdown: np.ndarray,
+        corr_short: np.ndarray,
+        corr_long: np.ndarray
+    ) -> Dict[str, Any]:
+        """Summarize one run of flagged steps as an ecosystem event."""
+        kinds = [
+            name for name, signal in (
+                ("synchronized_move", synchronized),
+                ("correlation_surge", surge),
+                ("correlation_breakdown", breakdown)
+            ) if signal[steps].any()
+        ]
+        peak = steps[np.argmax(breadth[steps])]
+        involved = outliers[steps].any(axis=0)
+
+        direction = None
+        if outliers[peak].any():
+            direction = "drop" if z[peak, outliers[peak]].sum() < 0 else "spike"
+
+        peak_breadth = float(breadth[peak])
+        if "synchronized_move" in kinds:
+            severity = "high" if peak_breadth >= 0.5 else "medium"
+        else:
+            severity = "low"
+
+        return {
+            "start": timestamps[steps[0]].isoformat(),
+            "end": (timestamps[steps[-1]] + bucket).isoformat(),
+            "peak": timestamps[peak].isoformat(),
+            "kinds": kinds,
+            "direction": direction,
+            "severity": severity,
+            "breadth": peak_breadth,
+            "parachains": [str(p) for p, hit in zip(parachains, involved) if hit],
+            "correlation_short": None if np.isnan(corr_short[peak]) else float(corr_short[peak]),
+            "correlation_long": None if np.isnan(corr_long[peak]) else float(corr_long[peak])
+        }
@@ -0,0 +1,348 @@
+"""
+Versioned model registry
+Publishes immutable model bundles atomically so readers never see a
+half-written model or a model paired with the wrong scaler
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Any, NamedTuple, Callable, Tuple
+
+import joblib
+
+
+class ModelBundle(NamedTuple):
+    """Immutable unit of publication: everything needed to serve one model version."""
+    model: Any
+    scaler: Any
+    feature_cols: tuple
+    metadata: Dict[str, Any]
+    version: int
+
+
+class ModelRegistry:
+    """Stores versioned model bundles on disk and swaps the current version atomically."""
+
+    POINTER_FILE = "CURRENT"
+
+    def __init__(self, cache_dir: str = "models/cache", namespace: str = "forecaster"):
+        """
+        Initialize the registry.
+
+        Args:
+            cache_dir: Base model cache directory
+            namespace: Subdirectory separating model families
+        """
+        self.root = os.path.join(cache_dir, namespace)
+        self._current: Dict[str, ModelBundle] = {}
+        self._pointers: Dict[str, tuple] = {}
+        self._leases = Counter()
+        self._gc_tasks: Dict[str, asyncio.Task] = {}
+        self._gc_rerun: set = set()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        self.load_stats = Counter()
+        self._key_load_stats: Dict[str, Dict[str, float]] = {}
+
+        os.makedirs(self.root, exist_ok=True)
+
+    def _key_dir(self, model_key: str) -> str:
+        return os.path.join(self.root, model_key)
+
+    def _version_path(self, model_key: str, version: int) -> str:
+        return os.path.join(self._key_dir(model_key), f"v{version}.joblib")
+
+    def publish(
+        self,
+        model_key: str,
+        model: Any,
+        scaler: Any,
+        feature_cols: List[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> ModelBundle:
+        """
+        Write a new version aside and make it current in one step.
+
+        The bundle file is written under a temporary name and renamed into
+        place, then the pointer file is replaced the same way, and finally the
+        in-memory reference is swapped. Requests holding the previous bundle
+        keep using it until they finish.
+
+        Args:
+            model_key: Model identifier
+            model: Trained model
+            scaler: Fitted scaler matching the model
+            feature_cols: Feature columns the model was trained on
+            metadata: Training metadata
+
+        Returns:
+            The published bundle
+        """
+        key_dir = self._key_dir(model_key)
+        os.makedirs(key_dir, exist_ok=True)
+
+        current = self._current.get(model_key)
+        last_version = max([current.version if current else 0] + self.versions(model_key))
+        version = max(int(time.time() * 1000), last_version + 1)
+
+        bundle = ModelBundle(
+            model=model,
+            scaler=scaler,
+            feature_cols=tuple(feature_cols),
+            metadata=dict(metadata or {}),
+            version=version
+        )
+
+        path = self._version_path(model_key, version)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(bundle._asdict(), tmp_path)
+        os.replace(tmp_path, path)
+
+        self._write_pointer(model_key, version)
+        self._current[model_key] = bundle
+
+        logging.info(f"Published model {model_key} version {version}")
+        self.collect_garbage(model_key)
+
+        return bundle
+
+    def _write_pointer(self, model_key: str, version: int):
+        """Atomically point a model key at a version."""
+        pointer_path = os.path.join(self._key_dir(model_key), self.POINTER_FILE)
+        tmp_path = f"{pointer_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": version, "published_at": datetime.now().isoformat()}, f)
+        os.replace(tmp_path, pointer_path)
+
+    def describe(self, model_key: str) -> Optional[Dict[str, Any]]:
+        """Read the pointer of a model key without loading the bundle."""
+        pointer_path = os.path.join(self._key_dir(model_key), self.POINTER_FILE)
+        try:
+            mtime = os.stat(pointer_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        # Only re-read the pointer when another writer replaced it
+        cached = self._pointers.get(model_key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(pointer_path) as f:
+            pointer = json.load(f)
+        self._pointers[model_key] = (mtime, pointer)
+        return pointer
+
+    def _cached(self, model_key: str) -> Tuple[Optional[ModelBundle], Optional[Dict[str, Any]], bool]:
+        """Return the in-memory bundle, the pointer, and whether the bundle is current."""
+        bundle = self._current.get(model_key)
+        pointer = self.describe(model_key)
+        fresh = bundle is not None and (pointer is None or bundle.version == pointer["version"])
+        return bundle, pointer, fresh
+
+    def _read_version(self, model_key: str, version: int) -> Optional[ModelBundle]:
+        """Read one version from disk and make it the in-memory bundle."""
+        path = self._version_path(model_key, version)
+        if not os.path.exists(path):
+            logging.warning(f"Model {model_key} version {version} missing on disk")
+            return None
+
+        started = time.perf_counter()
+        bundle = ModelBundle(**joblib.load(path))
+        self._current[model_key] = bundle
+        self._record_load(model_key, (time.perf_counter() - started) * 1000)
+        logging.info(f"Loaded model {model_key} version {bundle.version}")
+        return bundle
+
+    def _record_load(self, model_key: str, elapsed_ms: float):
+        self.load_stats["loads"] += 1
+        self.load_stats["load_ms_total"] += elapsed_ms
+        stats = self._key_load_stats.setdefault(model_key, {"loads": 0, "last_ms": 0.0, "max_ms": 0.0})
+        stats["loads"] += 1
+        stats["last_ms"] = elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def get(self, model_key: str) -> Optional[ModelBundle]:
+        """
+        Get the current bundle for a model key, loading it from disk if needed.
+
+        Args:
+            model_key: Model identifier
+
+        Returns:
+            Current bundle, or None if the key was never published
+        """
+        bundle, pointer, fresh = self._cached(model_key)
+        if fresh or pointer is None:
+            return bundle
+        return self._read_version(model_key, pointer["version"]) or bundle
+
+    async def load(
+        self,
+        model_key: str,
+        fallback: Optional[Callable[[], Optional[tuple]]] = None
+    ) -> Optional[ModelBundle]:
+        """
+        Get the current bundle, with at most one disk load per key in flight.
+
+        Concurrent callers for a cold key wait on a per-key lock while the
+        first one loads; they then find the bundle in memory. Disk reads run
+        in a worker thread so the event loop keeps serving warm keys.
+
+        Args:
+            model_key: Model identifier
+            fallback: Called (in a thread) when nothing is published for the key;
+                may return (model, scaler, feature_cols, metadata) to publish,
+                e.g. from files written before versioned publishing
+
+        Returns:
+            Current bundle, or None if there is none
+        """
+        bundle, pointer, fresh = self._cached(model_key)
+        if fresh:
+            return bundle
+
+        lock = self._load_locks.setdefault(model_key, asyncio.Lock())
+        if lock.locked():
+            self.load_stats["coalesced_waits"] += 1
+
+        async with lock:
+            # Another caller may have finished the load while we waited
+            bundle, pointer, fresh = self._cached(model_key)
+            if fresh:
+                return bundle
+
+            if pointer is not None:
+                return await asyncio.to_thread(self._read_version, model_key, pointer["version"]) or bundle
+
+            if fallback is None:
+                self.load_stats["misses"] += 1
+                return None
+
+            started = time.perf_counter()
+            parts = await asyncio.to_thread(fallback)
+            if parts is None:
+                self.load_stats["misses"] += 1
+                return None
+
+            bundle = await asyncio.to_thread(self.publish, model_key, *parts)
+            self.load_stats["migrations"] += 1
+            self._record_load(model_key, (time.perf_counter() - started) * 1000)
+            logging.info(f"Migrated legacy model {model_key}")
+            return bundle
+
+    def get_load_stats(self, top: int = 5) -> Dict[str, Any]:
+        """
+        Get load counters and the slowest keys.
+
+        Args:
+            top: Number of slowest keys to list
+
+        Returns:
+            Load count, total and mean duration, coalesced waits, migrations,
+            misses and the keys with the slowest last load
+        """
+        loads = self.load_stats.get("loads", 0)
+        slowest = sorted(self._key_load_stats.items(), key=lambda kv: kv[1]["last_ms"], reverse=True)[:top]
+        return {
+            "loads": loads,
+            "load_ms_total": self.load_stats.get("load_ms_total", 0.0),
+            "load_ms_mean": self.load_stats.get("load_ms_total", 0.0) / loads if loads else 0.0,
+            "coalesced_waits": self.load_stats.get("coalesced_waits", 0),
+            "migrations": self.load_stats.get("migrations", 0),
+            "misses": self.load_stats.get("misses", 0),
+            "slowest": [{"model_key": key, **stats} for key, stats in slowest]
+        }
+
+    @asynccontextmanager
+    async def lease(self, model_key: str, fallback: Optional[Callable[[], Optional[tuple]]] = None):
+        """
+        Hold the current bundle for the duration of a request.
+
+        The leased version is kept on disk until every lease on it is
+        released, even if a newer version is published meanwhile. Releasing
+        the last lease on a superseded version removes it in a worker thread;
+        releasing the current version touches neither the disk nor the loop.
+        """
+        bundle = await self.load(model_key, fallback)
+        if bundle is None:
+            yield None
+            return
+
+        lease_key = (model_key, bundle.version)
+        self._leases[lease_key] += 1
+        try:
+            yield bundle
+        finally:
+            self._leases[lease_key] -= 1
+            if self._leases[lease_key] <= 0:
+                del self._leases[lease_key]
+                current = self._current.get(model_key)
+                if current is None or current.version != bundle.version:
+                    self._schedule_garbage_collection(model_key)
+
+    def _schedule_garbage_collection(self, model_key: str):
+        """Run collect_garbage in a worker thread, at most once at a time per key."""
+        if model_key in self._gc_tasks:
+            # The running pass may have listed versions while they were still leased
+            self._gc_rerun.add(model_key)
+            return
+
+        task = asyncio.create_task(asyncio.to_thread(self.collect_garbage, model_key))
+        self._gc_tasks[model_key] = task
+
+        def done(finished: asyncio.Task):
+            del self._gc_tasks[model_key]
+            if not finished.cancelled() and finished.exception():
+                logging.error(f"Error collecting old versions of model {model_key}: {finished.exception()}")
+            if model_key in self._gc_rerun:
+                self._gc_rerun.discard(model_key)
+                self._schedule_garbage_collection(model_key)
+
+        task.add_done_callback(done)
+
+    def versions(self, model_key: str) -> List[int]:
+        """List versions of a model key stored on disk."""
+        key_dir = self._key_dir(model_key)
+        if not os.path.isdir(key_dir):
+            return []
+        return sorted(
+            int(name[1:-len(".joblib")])
+            for name in os.listdir(key_dir)
+            if name.startswith("v") and name.endswith(".joblib")
+        )
+
+    def model_keys(self) -> List[str]:
+        """List model keys published in memory or on disk."""
+        keys = set(self._current)
+        keys.update(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+        return sorted(keys)
+
+    def collect_garbage(self, model_key: str) -> int:
+        """
+        Delete versions that are neither current nor leased.
+
+        Returns:
+            Number of versions removed
+        """
+        pointer = self.describe(model_key)
+        current_version = pointer["version"] if pointer else None
+        removed = 0
+
+        for version in self.versions(model_key):
+            if version == current_version or self._leases.get((model_key, version)):
+                continue
+            try:
+                os.remove(self._version_path(model_key, version))
+                removed += 1
+            except OSError as e:
+                logging.warning(f"Could not remove model {model_key} version {version}: {e}")
+
+        return removed
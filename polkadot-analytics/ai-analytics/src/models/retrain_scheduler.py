@@ -0,0 +1,206 @@
+"""
+Priority-based retraining scheduler
+Periodically retrains the stalest, busiest and most drifted series first
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+from ..utils.latency_monitor import LatencyMonitor
+
+
+class RetrainScheduler:
+    """
+    Runs retraining jobs in-process, ordered by staleness x traffic x drift.
+
+    Components fit models in worker threads, so up to `max_concurrency`
+    jobs train in parallel while the event loop keeps serving requests.
+    """
+
+    def __init__(
+        self,
+        components: Dict[str, Any],
+        data_loader=None,
+        retrain_interval_hours: float = 24,
+        refresh_interval_minutes: float = 60,
+        max_concurrency: int = 2,
+        latency_monitor: Optional[LatencyMonitor] = None,
+        drift_threshold: float = 3.0
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            components: Retrainable components by name (forecaster, anomaly detector)
+            data_loader: DataLoader passed to each retraining job
+            retrain_interval_hours: Age after which a series is due for retraining
+            refresh_interval_minutes: How often the queue is rebuilt
+            max_concurrency: Maximum number of concurrent training jobs
+            latency_monitor: Request latency monitor used to pause under load
+            drift_threshold: Drift z-score that makes a series due regardless of age
+        """
+        self.components = components
+        self.data_loader = data_loader
+        self.retrain_interval_hours = retrain_interval_hours
+        self.refresh_interval_minutes = refresh_interval_minutes
+        self.max_concurrency = max_concurrency
+        self.latency_monitor = latency_monitor
+        self.drift_threshold = drift_threshold
+
+        self._queue: List[Tuple[float, str, str]] = []
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._running: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._last_checked: Dict[Tuple[str, str], datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._paused = False
+        self._last_cycle: Optional[str] = None
+        self._jobs_completed = 0
+
+    def start(self):
+        """Start the scheduler loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logging.info(
+                f"Retrain scheduler started (interval {self.retrain_interval_hours}h, "
+                f"refresh {self.refresh_interval_minutes}m, concurrency {self.max_concurrency})"
+            )
+
+    async def stop(self):
+        """Stop the scheduler loop and wait for running jobs to finish."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+        logging.info("Retrain scheduler stopped")
+
+    def priority(self, stats: Dict[str, Any], now: Optional[datetime] = None) -> float:
+        """
+        Score a series for retraining.
+
+        Args:
+            stats: Series stats with 'trained_at', 'requests' and 'drift'
+            now: Reference time (defaults to now)
+
+        Returns:
+            Priority score (higher runs first, 0 means not due)
+        """
+        now = now or datetime.now()
+        staleness = self._staleness(stats.get("trained_at"), now)
+        drift = abs(stats.get("drift", 0.0))
+
+        if staleness < 1.0 and drift < self.drift_threshold:
+            return 0.0
+
+        traffic = 1.0 + math.log1p(stats.get("requests", 0))
+        return staleness * traffic * (1.0 + drift)
+
+    def _staleness(self, trained_at: Optional[str], now: datetime) -> float:
+        """Age of a series in units of the retrain interval."""
+        if not trained_at:
+            return 10.0
+
+        age_hours = (now - datetime.fromisoformat(trained_at)).total_seconds() / 3600
+        return max(0.0, age_hours / max(self.retrain_interval_hours, 1e-9))
+
+    def refresh_queue(self):
+        """Rebuild the priority queue from current series stats."""
+        now = datetime.now()
+        queue = []
+
+        for name, component in self.components.items():
+            for model_key, stats in component.series_stats().items():
+                if (name, model_key) in self._running:
+                    continue
+
+                # A check that skipped an unchanged series still counts as fresh
+                checked = self._last_checked.get((name, model_key))
+                if checked and (not stats.get("trained_at") or checked.isoformat() > stats["trained_at"]):
+                    stats = {**stats, "trained_at": checked.isoformat()}
+
+                score = self.priority(stats, now)
+                if score > 0:
+                    queue.append((-score, name, model_key))
+
+        heapq.heapify(queue)
+        self._queue = queue
+
+    async def _run(self):
+        """Scheduler loop: rebuild the queue, then drain it within the concurrency bound."""
+        while True:
+            try:
+                self.refresh_queue()
+                self._last_cycle = datetime.now().isoformat()
+                await self._drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Retrain scheduler cycle failed: {e}")
+
+            await asyncio.sleep(self.refresh_interval_minutes * 60)
+
+    async def _drain(self):
+        """Start jobs in priority order, pausing while the latency SLO is at risk."""
+        while self._queue:
+            await self._wait_for_headroom()
+            await self._semaphore.acquire()
+
+            _, name, model_key = heapq.heappop(self._queue)
+            task = asyncio.create_task(self._retrain(name, model_key))
+            self._running[(name, model_key)] = task
+
+    async def _wait_for_headroom(self, poll_seconds: float = 5.0):
+        """Block while request latency is close to the SLO."""
+        while self.latency_monitor and self.latency_monitor.at_risk():
+            if not self._paused:
+                logging.warning("Request latency SLO at risk, pausing retraining")
+                self._paused = True
+            await asyncio.sleep(poll_seconds)
+
+        if self._paused:
+            logging.info("Request latency recovered, resuming retraining")
+            self._paused = False
+
+    async def _retrain(self, name: str, model_key: str):
+        """Run one retraining job."""
+        try:
+            report = await self.components[name].retrain(
+                data_loader=self.data_loader,
+                series=[model_key],
+                drift_threshold=self.drift_threshold
+            )
+            self._last_checked[(name, model_key)] = datetime.now()
+            self._jobs_completed += 1
+
+            if report.get("failed"):
+                logging.warning(f"Scheduled retrain of {name} {model_key} failed: {report['failed']}")
+
+        except Exception as e:
+            logging.error(f"Scheduled retrain of {name} {model_key} failed: {e}")
+        finally:
+            self._running.pop((name, model_key), None)
+            self._semaphore.release()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get scheduler status."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "paused": self._paused,
+            "queued": [
+                {"component": name, "series": model_key, "priority": -score}
+                for score, name, model_key in sorted(self._queue)
+            ],
+            "in_progress": [f"{name}:{model_key}" for name, model_key in self._running],
+            "jobs_completed": self._jobs_completed,
+            "last_cycle": self._last_cycle
+        }
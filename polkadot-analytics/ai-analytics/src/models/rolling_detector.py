@@ -0,0 +1,287 @@
+"""
+Rolling robust anomaly scoring across many series at once
+Computes rolling median/MAD and EWMA z-scores on a (series x time) array
+"""
+
+import logging
+import warnings
+from typing import Dict, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+# Numba is optional; the strided NumPy path is used without it
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Scale factor making the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+
+# Upper bound on the temporary window buffer used by the NumPy path
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _sorted_median_mad(win, n):
+        """Median and MAD of the first n entries of a sorted buffer."""
+        half = n // 2
+        if n % 2:
+            med = win[half]
+        else:
+            med = 0.5 * (win[half - 1] + win[half])
+
+        # |x - med| is increasing outward from the median on both sides: merge the two runs
+        right = np.searchsorted(win[:n], med)
+        left = right - 1
+        lo = 0.0
+        dev = 0.0
+        for rank in range(half + 1):
+            if left >= 0 and (right >= n or med - win[left] <= win[right] - med):
+                dev = med - win[left]
+                left -= 1
+            else:
+                dev = win[right] - med
+                right += 1
+            if rank == half - 1:
+                lo = dev
+
+        mad = dev if n % 2 else 0.5 * (lo + dev)
+        return med, mad
+
+    @njit(parallel=True, cache=True)
+    def _rolling_median_mad_numba(X, window, start):
+        n_series, n_points = X.shape
+        median = np.full((n_series, n_points), np.nan)
+        mad = np.full((n_series, n_points), np.nan)
+
+        for s in prange(n_series):
+            # Sorted copy of the non-NaN values in the current window
+            win = np.empty(window)
+            n = 0
+            for k in range(start - window, start):
+                if not np.isnan(X[s, k]):
+                    win[n] = X[s, k]
+                    n += 1
+            win[:n] = np.sort(win[:n])
+
+            for t in range(start, n_points):
+                if n > 0:
+                    median[s, t], mad[s, t] = _sorted_median_mad(win, n)
+
+                # Slide: drop X[t - window], add X[t]
+                old = X[s, t - window]
+                if not np.isnan(old):
+                    pos = np.searchsorted(win[:n], old)
+                    win[pos:n - 1] = win[pos + 1:n]
+                    n -= 1
+                new = X[s, t]
+                if not np.isnan(new):
+                    pos = np.searchsorted(win[:n], new)
+                    for k in range(n, pos, -1):
+                        win[k] = win[k - 1]
+                    win[pos] = new
+                    n += 1
+
+        return median, mad
+
+
+def _rolling_median_mad_numpy(X: np.ndarray, window: int, start: int):
+    """Strided rolling median/MAD, processed in time chunks to bound memory."""
+    n_series, n_points = X.shape
+    median = np.full((n_series, n_points), np.nan)
+    mad = np.full((n_series, n_points), np.nan)
+
+    if n_points <= start:
+        return median, mad
+
+    # windows[:, i] covers X[:, i:i + window], the baseline of point i + window
+    windows = sliding_window_view(X, window, axis=1)[:, start - window:n_points - window]
+    reduce = np.nanmedian if np.isnan(X).any() else np.median
+
+    chunk = max(1, CHUNK_BYTES // (8 * window * max(n_series, 1)))
+    with warnings.catch_warnings():
+        # Windows that are entirely missing stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for offset in range(0, windows.shape[1], chunk):
+            block = windows[:, offset:offset + chunk]
+            cols = slice(start + offset, start + offset + block.shape[1])
+            med = reduce(block, axis=2)
+            median[:, cols] = med
+            mad[:, cols] = reduce(np.abs(block - med[:, :, None]), axis=2)
+
+    return median, mad
+
+
+def rolling_median_mad(X: np.ndarray, window: int, last_n: Optional[int] = None):
+    """
+    Trailing rolling median and MAD for every series.
+
+    The window for point t covers the `window` points before it, so a spike
+    never contaminates its own baseline.
+
+    Args:
+        X: Array of shape (n_series, n_points)
+        window: Number of trailing points
+        last_n: Only compute the last n points (e.g. the points added since the last sweep)
+
+    Returns:
+        Tuple of (median, mad) arrays shaped like X, NaN where not computed
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    start = window if last_n is None else max(window, X.shape[1] - last_n)
+
+    if NUMBA_AVAILABLE:
+        return _rolling_median_mad_numba(X, window, start)
+    return _rolling_median_mad_numpy(X, window, start)
+
+
+def _forward_fill(X: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along time; leading NaNs take the first valid value."""
+    mask = np.isnan(X)
+    if not mask.any():
+        return X
+
+    idx = np.where(~mask, np.arange(X.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = X[np.arange(X.shape[0])[:, None], idx]
+
+    first_valid = np.argmax(~mask, axis=1)
+    leading = np.arange(X.shape[1]) < first_valid[:, None]
+    filled[leading] = np.broadcast_to(
+        X[np.arange(X.shape[0]), first_valid][:, None], X.shape
+    )[leading]
+    return np.nan_to_num(filled)
+
+
+def ewma_zscore(X: np.ndarray, alpha: float = 0.05, warmup: int = 24) -> np.ndarray:
+    """
+    EWMA z-scores for every series.
+
+    Each point is compared against the exponentially weighted mean and
+    variance of the points before it. Both recursions run as linear filters
+    along the time axis, so all series are processed in one call.
+
+    Args:
+        X: Array of shape (n_series, n_points)
+        alpha: Smoothing factor
+        warmup: Leading points per series left unscored
+
+    Returns:
+        Array of z-scores shaped like X (NaN for missing points and warmup)
+    """
+    X = np.asarray(X, dtype=float)
+    missing = np.isnan(X)
+    filled = _forward_fill(X)
+
+    # m_t = alpha * x_t + (1 - alpha) * m_{t-1}, seeded with the first value
+    b, a = [alpha], [1.0, -(1.0 - alpha)]
+    mean = lfilter(b, a, filled, axis=1, zi=(1.0 - alpha) * filled[:, :1])[0]
+
+    prev_mean = np.empty_like(mean)
+    prev_mean[:, 0] = filled[:, 0]
+    prev_mean[:, 1:] = mean[:, :-1]
+    deviation = filled - prev_mean
+
+    # v_t = (1 - alpha) * (v_{t-1} + alpha * d_t^2)
+    var = lfilter([(1.0 - alpha) * alpha], a, deviation ** 2, axis=1,
+                  zi=np.zeros((X.shape[0], 1)))[0]
+    prev_std = np.empty_like(var)
+    prev_std[:, 0] = np.nan
+    prev_std[:, 1:] = np.sqrt(var[:, :-1])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(prev_std > 0, deviation / prev_std, 0.0)
+
+    z[:, :warmup] = np.nan
+    z[missing] = np.nan
+    return z
+
+
+def robust_zscore(X: np.ndarray, window: int = 168, last_n: Optional[int] = None) -> np.ndarray:
+    """
+    Rolling robust z-scores: (x - rolling median) / (1.4826 * rolling MAD).
+
+    Args:
+        X: Array of shape (n_series, n_points)
+        window: Number of trailing points in the baseline
+        last_n: Only score the last n points
+
+    Returns:
+        Array of robust z-scores shaped like X (NaN where undefined)
+    """
+    X = np.asarray(X, dtype=float)
+    median, mad = rolling_median_mad(X, window, last_n)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = MAD_SCALE * mad
+        z = np.where(scale > 0, (X - median) / scale, 0.0)
+
+    z[np.isnan(median) | np.isnan(X)] = np.nan
+    return z
+
+
+class RollingRobustDetector:
+    """Scores a whole fleet of aligned series in one pass."""
+
+    METHODS = ("rolling_mad", "ewma_zscore")
+
+    def __init__(self, window: int = 168, alpha: float = 0.05):
+        """
+        Initialize the detector.
+
+        Args:
+            window: Trailing window (points) for the rolling median/MAD
+            alpha: Smoothing factor for EWMA z-scores
+        """
+        self.window = window
+        self.alpha = alpha
+
+        if not NUMBA_AVAILABLE:
+            logging.info("numba not available, using strided NumPy rolling median")
+
+    def score(self, X: np.ndarray, method: str = "rolling_mad", last_n: Optional[int] = None) -> np.ndarray:
+        """
+        Compute per-point scores for every series.
+
+        Args:
+            X: Array of shape (n_series, n_points)
+            method: 'rolling_mad' or 'ewma_zscore'
+            last_n: Only score the last n points (rolling_mad)
+
+        Returns:
+            Signed scores shaped like X
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if method == "rolling_mad":
+            return robust_zscore(X, self.window, last_n)
+        if method == "ewma_zscore":
+            return ewma_zscore(X, self.alpha)
+        raise ValueError(f"Unknown rolling method: {method}")
+
+    def detect(
+        self,
+        X: np.ndarray,
+        threshold: float,
+        method: str = "rolling_mad",
+        last_n: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score and threshold every series.
+
+        Args:
+            X: Array of shape (n_series, n_points)
+            threshold: Absolute score above which a point is anomalous
+            method: 'rolling_mad' or 'ewma_zscore'
+            last_n: Only score the last n points (rolling_mad)
+
+        Returns:
+            Scores and boolean anomaly mask, both shaped like X
+        """
+        scores = self.score(X, method, last_n)
+        mask = np.abs(np.nan_to_num(scores)) > threshold
+        return {"scores": scores, "mask": mask}
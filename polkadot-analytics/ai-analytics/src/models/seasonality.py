@@ -0,0 +1,272 @@
+"""
+Seasonal profiles for parachain metrics
+Fits daily and weekly cycles once at training time as an hour-of-week lookup table,
+and detects dominant periods across many series at once
+"""
+
+from typing import Dict, Optional, Any, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# One profile entry per hour of the week, Monday 00:00 first
+HOURS_PER_WEEK = 168
+
+
+def hour_of_week(index: pd.DatetimeIndex) -> np.ndarray:
+    """Map timestamps to 0..167, the position in the weekly profile."""
+    return np.asarray(index.dayofweek * 24 + index.hour, dtype=np.int64)
+
+
+def fourier_terms(hours: np.ndarray, daily_harmonics: int = 3, weekly_harmonics: int = 2) -> np.ndarray:
+    """
+    Sine/cosine terms of the daily (24h) and weekly (168h) cycles.
+
+    Args:
+        hours: Hour-of-week positions
+        daily_harmonics: Harmonics of the 24 hour cycle
+        weekly_harmonics: Harmonics of the 168 hour cycle
+
+    Returns:
+        Array of shape (len(hours), 2 * (daily_harmonics + weekly_harmonics))
+    """
+    hours = np.asarray(hours, dtype=float)
+    periods = [24.0] * daily_harmonics + [168.0] * weekly_harmonics
+    orders = list(range(1, daily_harmonics + 1)) + list(range(1, weekly_harmonics + 1))
+
+    angles = 2 * np.pi * hours[:, None] * np.array(orders) / np.array(periods)
+    return np.hstack([np.sin(angles), np.cos(angles)])
+
+
+def fit_seasonal_profile(
+    index: pd.DatetimeIndex,
+    values: np.ndarray,
+    daily_harmonics: int = 3,
+    weekly_harmonics: int = 2
+) -> Dict[str, Any]:
+    """
+    Fit daily and weekly cycles by Fourier regression.
+
+    The regression includes an intercept and a linear trend so that growth
+    over the training window is not absorbed into the cycles. The fitted
+    cycles are evaluated once into a mean-zero 168-entry profile.
+
+    Args:
+        index: Timestamps of the training points
+        values: Metric values
+        daily_harmonics: Harmonics of the 24 hour cycle
+        weekly_harmonics: Harmonics of the 168 hour cycle (skipped with under two weeks of data)
+
+    Returns:
+        Profile (list of 168 floats) and seasonal strength (share of detrended
+        variance explained by the cycles), or an empty dict if there is too
+        little data to fit
+    """
+    values = np.asarray(values, dtype=float)
+    span = index.max() - index.min() if len(index) else pd.Timedelta(0)
+    if span < pd.Timedelta(days=2) or len(values) < 48:
+        return {}
+    if span < pd.Timedelta(days=14):
+        weekly_harmonics = 0
+
+    hours = hour_of_week(index)
+    seasonal = fourier_terms(hours, daily_harmonics, weekly_harmonics)
+    trend = ((index - index.min()) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+    design = np.column_stack([np.ones(len(values)), trend, seasonal])
+
+    coef, *_ = np.linalg.lstsq(design, values, rcond=None)
+
+    profile = fourier_terms(np.arange(HOURS_PER_WEEK), daily_harmonics, weekly_harmonics) @ coef[2:]
+    profile -= profile.mean()
+
+    detrended = values - design[:, :2] @ coef[:2]
+    residual = detrended - profile[hours]
+    total_var = np.var(detrended)
+
+    return {
+        "profile": profile.tolist(),
+        "strength": float(1 - np.var(residual) / total_var) if total_var > 0 else 0.0,
+        "daily_harmonics": daily_harmonics,
+        "weekly_harmonics": weekly_harmonics
+    }
+
+
+def deseasonalize(index: pd.DatetimeIndex, values: np.ndarray, profile) -> np.ndarray:
+    """Subtract a fitted profile from values: a single table lookup per point."""
+    return np.asarray(values, dtype=float) - np.asarray(profile)[hour_of_week(index)]
+
+
+def _detrend(x: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """Remove each column's linear trend; missing points become 0."""
+    t = np.arange(len(x), dtype=float)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = observed.sum(axis=0)
+        t_mean = (observed * t).sum(axis=0) / n
+        x_mean = np.where(observed, x, 0.0).sum(axis=0) / n
+        tc = np.where(observed, t - t_mean, 0.0)
+        xc = np.where(observed, x - x_mean, 0.0)
+        slope = (tc * xc).sum(axis=0) / (tc ** 2).sum(axis=0)
+    return np.nan_to_num(np.where(observed, xc - slope * tc, 0.0))
+
+
+def _regular_grid(frame: pd.DataFrame, freq: str) -> Tuple[pd.DataFrame, float]:
+    """Resample a frame onto a regular grid and return the step in hours."""
+    grid = frame.sort_index().resample(freq).mean()
+    step = grid.index[1] - grid.index[0] if len(grid) > 1 else pd.Timedelta(0)
+    return grid, step / pd.Timedelta(hours=1)
+
+
+def detect_periodicity(
+    frame: pd.DataFrame,
+    freq: str = "h",
+    min_period: int = 2,
+    max_period: Optional[int] = None,
+    alpha: float = 0.01
+) -> pd.DataFrame:
+    """
+    Find the dominant period of every column of a frame.
+
+    All columns go through the same FFTs. The strongest periodogram bin
+    proposes a period and Fisher's g test gives its significance; the
+    autocorrelation (computed from the zero-padded spectrum) then refines
+    the period to the best lag inside that bin, and the period is kept only
+    if that lag is a local autocorrelation peak above the white-noise bound.
+    Missing points are left out of both, and each column's linear trend is
+    removed first so growth does not show up as a long period.
+
+    Args:
+        frame: Values indexed by timestamp, one column per series
+        freq: Grid the values are resampled onto
+        min_period: Shortest period considered, in grid steps
+        max_period: Longest period considered, in grid steps (default: half the series)
+        alpha: Significance level of both tests
+
+    Returns:
+        DataFrame indexed by column with 'period' (grid steps), 'period_hours',
+        'power_share', 'p_value', 'autocorrelation' and 'significant'
+    """
+    grid, step_hours = _regular_grid(frame, freq)
+    x = grid.to_numpy(dtype=float)
+    T, N = x.shape
+    observed = np.isfinite(x)
+    max_period = min(max_period or T // 2, T // 2)
+
+    result = pd.DataFrame({
+        'period': np.zeros(N, dtype=int),
+        'period_hours': np.nan,
+        'power_share': 0.0,
+        'p_value': 1.0,
+        'autocorrelation': 0.0,
+        'significant': False
+    }, index=grid.columns)
+    if N == 0 or max_period < max(min_period, 2):
+        return result
+
+    # Series along the last axis so every FFT runs over contiguous memory
+    residual = np.ascontiguousarray(_detrend(x, observed).T)
+    cols = np.arange(N)
+
+    # Periodogram: bin k has period T / k steps
+    spectrum = np.abs(np.fft.rfft(residual)) ** 2
+    k = np.arange(spectrum.shape[1])
+    with np.errstate(divide='ignore'):
+        bin_periods = T / k
+    band = (k > 0) & (bin_periods >= min_period) & (bin_periods <= max_period)
+    power = spectrum[:, band]
+    total = power.sum(axis=1)
+    best = power.argmax(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g = np.where(total > 0, power[cols, best] / total, 0.0)
+    m = int(band.sum())
+    p_value = np.clip(m * (1 - g) ** (m - 1), 0.0, 1.0)
+    k_best = k[band][best]
+
+    # Autocorrelation over observed pairs only (Wiener-Khinchin on zero-padded series);
+    # fully observed series have T - lag pairs, only gappy ones need their mask transformed
+    nfft = 1 << (2 * T - 1).bit_length()
+    acf = np.fft.irfft(np.abs(np.fft.rfft(residual, nfft)) ** 2, nfft)[:, :T].T
+    pairs = np.repeat((T - np.arange(T, dtype=float))[:, None], N, axis=1)
+    gappy = ~observed.all(axis=0)
+    if gappy.any():
+        mask = np.ascontiguousarray(observed[:, gappy].T, dtype=float)
+        pairs[:, gappy] = np.round(np.fft.irfft(np.abs(np.fft.rfft(mask, nfft)) ** 2, nfft)[:, :T].T)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acf = np.where(pairs > 0, acf / pairs, 0.0)
+        acf = np.where(acf[0] > 0, acf / acf[0], 0.0)
+
+    # Best lag within the proposed bin's period range
+    lo = np.maximum(np.floor(T / (k_best + 0.5)), min_period)
+    hi = np.minimum(np.ceil(T / np.maximum(k_best - 0.5, 0.5)), max_period)
+    lags = np.arange(T)[:, None]
+    period = np.where((lags >= lo) & (lags <= hi), acf, -np.inf).argmax(axis=0)
+
+    rho = acf[period, cols]
+    hill = (rho >= acf[period - 1, cols]) & (rho >= acf[np.minimum(period + 1, T - 1), cols])
+    with np.errstate(divide='ignore'):
+        bound = stats.norm.isf(alpha / 2) / np.sqrt(np.maximum(pairs[period, cols], 1))
+
+    result['period'] = period
+    result['period_hours'] = period * step_hours
+    result['power_share'] = g
+    result['p_value'] = p_value
+    result['autocorrelation'] = rho
+    result['significant'] = (p_value < alpha) & hill & (rho > bound) & (observed.sum(axis=0) >= 2 * period)
+    return result
+
+
+def _group_effect(
+    residual: np.ndarray,
+    observed: np.ndarray,
+    groups: np.ndarray,
+    n_groups: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """One-way ANOVA of every column across groups: peak group, explained share and p-value."""
+    onehot = np.eye(n_groups)[groups]
+    counts = onehot.T @ observed
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = (onehot.T @ residual) / counts
+        # Residuals are mean zero over observed points, so the grand mean drops out
+        between = np.nansum(counts * means ** 2, axis=0)
+        total = (residual ** 2).sum(axis=0)
+        df1 = (counts > 0).sum(axis=0) - 1
+        df2 = observed.sum(axis=0) - df1 - 1
+        f = (between / df1) / ((total - between) / df2)
+        share = np.where(total > 0, between / total, 0.0)
+    p_value = np.where((df1 > 0) & (df2 > 0) & np.isfinite(f), stats.f.sf(f, df1, np.maximum(df2, 1)), 1.0)
+    peak = np.where(np.isnan(means), -np.inf, means).argmax(axis=0)
+    return peak, share, p_value
+
+
+def cycle_peaks(frame: pd.DataFrame, freq: str = "h") -> pd.DataFrame:
+    """
+    Peak hour of day and day of week of every column.
+
+    Values are detrended and compared across hours and weekdays with a
+    one-way ANOVA per column, all columns at once. Hour effects need a
+    sub-daily grid and are NaN otherwise.
+
+    Args:
+        frame: Values indexed by timestamp, one column per series
+        freq: Grid the values are resampled onto
+
+    Returns:
+        DataFrame indexed by column with 'peak_hour', 'hour_share',
+        'hour_p_value', 'peak_day' (0 = Monday), 'day_share' and 'day_p_value'
+    """
+    grid, step_hours = _regular_grid(frame, freq)
+    x = grid.to_numpy(dtype=float)
+    observed = np.isfinite(x)
+    residual = _detrend(x, observed)
+    mask = observed.astype(float)
+
+    result = pd.DataFrame(index=grid.columns)
+    if step_hours < 24:
+        peak, share, p_value = _group_effect(residual, mask, np.asarray(grid.index.hour), 24)
+        result['peak_hour'], result['hour_share'], result['hour_p_value'] = peak, share, p_value
+    else:
+        result['peak_hour'], result['hour_share'], result['hour_p_value'] = np.nan, np.nan, np.nan
+
+    peak, share, p_value = _group_effect(residual, mask, np.asarray(grid.index.dayofweek), 7)
+    result['peak_day'], result['day_share'], result['day_p_value'] = peak, share, p_value
+    return result
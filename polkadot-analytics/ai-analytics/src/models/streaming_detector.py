@@ -0,0 +1,327 @@
+"""
+Streaming anomaly detection for live metric feeds
+Scores each new point in O(1) against compact per-series running statistics
+"""
+
+import os
+import math
+import time
+import inspect
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Any, AsyncIterator, Callable, Tuple
+
+import numpy as np
+
+# Hours in a week: one seasonal bucket per hour-of-week
+SEASON_BUCKETS = 168
+
+# The Unix epoch fell on a Thursday; shift so bucket 0 is Monday 00:00 UTC
+EPOCH_WEEKDAY_OFFSET_HOURS = 72
+
+
+class StreamingAnomalyDetector:
+    """
+    Online detector with struct-of-arrays state indexed by series id.
+
+    Per series it keeps Welford mean/variance, an EWMA mean/variance, Welford
+    means per hour-of-week bucket and an EWMA variance of the residuals from
+    those bucket means. Each point is scored before it is folded into the
+    state, so updates are O(1) and need no history.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        alpha: float = 0.05,
+        threshold: float = 4.0,
+        min_count: int = 48,
+        min_bucket_count: int = 8,
+        checkpoint_path: Optional[str] = None,
+        recent_size: int = 1000
+    ):
+        """
+        Initialize the streaming detector.
+
+        Args:
+            capacity: Initial number of series slots (grows by doubling)
+            alpha: EWMA smoothing factor
+            threshold: Absolute score above which a point is anomalous
+            min_count: Points a series needs before it is scored
+            min_bucket_count: Points a seasonal bucket needs before it is used
+            checkpoint_path: File used by checkpoint() and restore()
+            recent_size: Number of recent anomalies kept in memory
+        """
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_count = min_count
+        self.min_bucket_count = min_bucket_count
+        self.checkpoint_path = checkpoint_path
+
+        self._index: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._allocate(capacity)
+
+        self.recent = deque(maxlen=recent_size)
+        self.points_processed = 0
+        self.processing_seconds = 0.0
+
+    def _allocate(self, capacity: int):
+        """Allocate empty state arrays."""
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros(capacity)
+        self.m2 = np.zeros(capacity)
+        self.ewma = np.zeros(capacity)
+        self.ewvar = np.zeros(capacity)
+        self.last_ts = np.full(capacity, -np.inf)
+        self.season_count = np.zeros((capacity, SEASON_BUCKETS), dtype=np.int32)
+        self.season_mean = np.zeros((capacity, SEASON_BUCKETS))
+        self.season_m2 = np.zeros((capacity, SEASON_BUCKETS))
+        self.season_resvar = np.zeros(capacity)
+
+    def _state_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "ewma": self.ewma,
+            "ewvar": self.ewvar,
+            "last_ts": self.last_ts,
+            "season_count": self.season_count,
+            "season_mean": self.season_mean,
+            "season_m2": self.season_m2,
+            "season_resvar": self.season_resvar
+        }
+
+    def _grow(self):
+        """Double the number of series slots."""
+        capacity = len(self.count)
+        for name, array in self._state_arrays().items():
+            grown = np.zeros((capacity * 2,) + array.shape[1:], dtype=array.dtype)
+            if name == "last_ts":
+                grown[:] = -np.inf
+            grown[:capacity] = array
+            setattr(self, name, grown)
+
+    def _slot(self, series_key: str) -> int:
+        """Get the state row of a series, allocating one if needed."""
+        slot = self._index.get(series_key)
+        if slot is None:
+            slot = len(self._keys)
+            if slot >= len(self.count):
+                self._grow()
+            self._index[series_key] = slot
+            self._keys.append(series_key)
+        return slot
+
+    def update(self, series_key: str, timestamp: float, value: float) -> Optional[Dict[str, Any]]:
+        """
+        Score one point and fold it into the series state.
+
+        Args:
+            series_key: Series identifier (e.g. '2004_tvl')
+            timestamp: Point time as Unix seconds
+            value: Metric value
+
+        Returns:
+            Anomaly record if the point is anomalous, otherwise None
+        """
+        i = self._slot(series_key)
+        if timestamp <= self.last_ts[i] or value != value:
+            return None  # out of order, duplicate or NaN
+
+        n = int(self.count[i])
+        mean = float(self.mean[i])
+        bucket = int(timestamp // 3600 + EPOCH_WEEKDAY_OFFSET_HOURS) % SEASON_BUCKETS
+        b_count = int(self.season_count[i, bucket])
+        b_mean = float(self.season_mean[i, bucket])
+
+        # Residual variance is pooled over all buckets: a single bucket holds
+        # too few points for a stable variance estimate
+        seasonal = b_count >= self.min_bucket_count
+        resvar = float(self.season_resvar[i])
+
+        # Score against the state before this point
+        anomaly = None
+        if n >= self.min_count:
+            if seasonal and resvar > 0:
+                score = (value - b_mean) / math.sqrt(resvar)
+                basis = "seasonal"
+            else:
+                ewvar = float(self.ewvar[i])
+                score = (value - float(self.ewma[i])) / math.sqrt(ewvar) if ewvar > 0 else 0.0
+                basis = "ewma"
+
+            if abs(score) > self.threshold:
+                anomaly = {
+                    "series": series_key,
+                    "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
+                    "value": value,
+                    "anomaly_score": score,
+                    "basis": basis,
+                    "severity": "high" if abs(score) > 2 * self.threshold else "medium"
+                }
+
+        # Welford update of the global statistics
+        n += 1
+        delta = value - mean
+        mean += delta / n
+        self.count[i] = n
+        self.mean[i] = mean
+        self.m2[i] += delta * (value - mean)
+
+        # EWMA mean and variance
+        if n == 1:
+            self.ewma[i] = value
+        else:
+            ew_delta = value - float(self.ewma[i])
+            self.ewma[i] += self.alpha * ew_delta
+            self.ewvar[i] = (1 - self.alpha) * (float(self.ewvar[i]) + self.alpha * ew_delta * ew_delta)
+
+        # Clip anomalous points before they enter the hour-of-week profile so a
+        # spike does not echo as an anomaly in the same hour next week
+        folded = value
+        if anomaly and basis == "seasonal":
+            folded = b_mean + math.copysign(self.threshold * math.sqrt(resvar), score)
+
+        # Residual variance around the hour-of-week profile
+        if seasonal:
+            residual = folded - b_mean
+            if resvar > 0:
+                self.season_resvar[i] = (1 - self.alpha) * resvar + self.alpha * residual * residual
+            else:
+                self.season_resvar[i] = float(self.season_m2[i, bucket]) / (b_count - 1)
+
+        # Welford update of the hour-of-week bucket
+        b_count += 1
+        b_delta = folded - b_mean
+        b_mean += b_delta / b_count
+        self.season_count[i, bucket] = b_count
+        self.season_mean[i, bucket] = b_mean
+        self.season_m2[i, bucket] += b_delta * (folded - b_mean)
+
+        self.last_ts[i] = timestamp
+        return anomaly
+
+    async def consume(
+        self,
+        feed: AsyncIterator[Tuple[str, float, float]],
+        on_anomaly: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        checkpoint_interval_seconds: float = 300.0
+    ):
+        """
+        Score points from an async feed until it ends or the task is cancelled.
+
+        Args:
+            feed: Async iterator of (series_key, unix_timestamp, value)
+            on_anomaly: Optional callback (sync or async) for each anomaly
+            checkpoint_interval_seconds: How often state is checkpointed
+        """
+        last_checkpoint = time.monotonic()
+
+        try:
+            async for series_key, timestamp, value in feed:
+                started = time.perf_counter()
+                anomaly = self.update(series_key, timestamp, value)
+                self.processing_seconds += time.perf_counter() - started
+                self.points_processed += 1
+
+                if anomaly:
+                    self.recent.append(anomaly)
+                    if on_anomaly:
+                        result = on_anomaly(anomaly)
+                        if inspect.isawaitable(result):
+                            await result
+
+                if self.checkpoint_path and time.monotonic() - last_checkpoint > checkpoint_interval_seconds:
+                    self.checkpoint()
+                    last_checkpoint = time.monotonic()
+
+        finally:
+            if self.checkpoint_path:
+                self.checkpoint()
+
+    def checkpoint(self, path: Optional[str] = None):
+        """Atomically write the detector state to disk."""
+        path = path or self.checkpoint_path
+        if not path:
+            return
+
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            n = len(self._keys)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(
+                tmp_path,
+                keys=np.array(self._keys, dtype=str),
+                **{name: array[:n] for name, array in self._state_arrays().items()}
+            )
+            os.replace(tmp_path, path)
+            logging.info(f"Checkpointed streaming state for {n} series")
+
+        except Exception as e:
+            logging.error(f"Error checkpointing streaming state: {e}")
+
+    def restore(self, path: Optional[str] = None) -> bool:
+        """
+        Load detector state from a checkpoint.
+
+        Returns:
+            True if a checkpoint was loaded
+        """
+        path = path or self.checkpoint_path
+        if not path or not os.path.exists(path):
+            return False
+
+        try:
+            with np.load(path) as data:
+                keys = [str(k) for k in data["keys"]]
+                self._allocate(max(len(keys) * 2, 16))
+                for name in self._state_arrays():
+                    getattr(self, name)[:len(keys)] = data[name]
+
+            self._keys = keys
+            self._index = {key: i for i, key in enumerate(keys)}
+            logging.info(f"Restored streaming state for {len(keys)} series")
+            return True
+
+        except Exception as e:
+            logging.error(f"Error restoring streaming state: {e}")
+            return False
+
+    def last_timestamp(self) -> Optional[datetime]:
+        """Latest point folded into any series, as a naive UTC datetime (None if empty)."""
+        n = len(self._keys)
+        latest = float(self.last_ts[:n].max()) if n else -math.inf
+        return datetime.utcfromtimestamp(latest) if math.isfinite(latest) else None
+
+    def get_state(self, series_key: str) -> Optional[Dict[str, Any]]:
+        """Get the running statistics of one series."""
+        i = self._index.get(series_key)
+        if i is None:
+            return None
+
+        n = int(self.count[i])
+        return {
+            "count": n,
+            "mean": float(self.mean[i]),
+            "std": math.sqrt(self.m2[i] / (n - 1)) if n > 1 else 0.0,
+            "ewma": float(self.ewma[i]),
+            "ewma_std": math.sqrt(self.ewvar[i]),
+            "last_timestamp": datetime.utcfromtimestamp(self.last_ts[i]).isoformat() if n else None
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get throughput and size of the detector."""
+        return {
+            "series": len(self._keys),
+            "points_processed": self.points_processed,
+            "mean_point_cost_us": (
+                self.processing_seconds / self.points_processed * 1e6 if self.points_processed else 0.0
+            ),
+            "recent_anomalies": len(self.recent)
+        }
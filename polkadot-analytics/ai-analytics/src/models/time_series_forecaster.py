@@ -4,8 +4,10 @@ Uses multiple ML models for predictions
 """
 
 import os
+import time
 import logging
 import pickle
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import asyncio
@@ -17,16 +19,29 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import joblib
 
+from .change_detection import (
+    REFIT_DECISIONS,
+    UNTRACKED_WINDOW_DAYS,
+    classify_change,
+    new_retrain_report,
+    parse_model_key,
+    window_fingerprint,
+)
+from .model_registry import ModelBundle, ModelRegistry
+
 
 class TimeSeriesForecaster:
     """Handles time series forecasting using multiple ML models."""
 
+    MODEL_TYPES = ("linear", "rf", "gbm", "ensemble")
+
     def __init__(self, cache_dir: str = "models/cache", horizon_days: int = 30):
         """Initialize the forecaster."""
         self.cache_dir = cache_dir
         self.horizon_days = horizon_days
-        self.models = {}
-        self.scalers = {}
+        self.registry = ModelRegistry(cache_dir, namespace="forecaster")
+        self.request_counts = Counter()
+        self.drift_scores = {}
         self._ready = False
 
         # Create cache directory
@@ -36,6 +51,11 @@ class TimeSeriesForecaster:
         """Check if forecaster is ready."""
         return self._ready
 
+    def model_version(self, parachain_id: str, metric: str, model_type: str = "ensemble") -> Optional[int]:
+        """Published version of a model (None if it was never published)."""
+        pointer = self.registry.describe(f"{parachain_id}_{metric}_{model_type}")
+        return pointer["version"] if pointer else None
+
     async def train_model(
         self,
         df: pd.DataFrame,
@@ -59,72 +79,92 @@ class TimeSeriesForecaster:
             if df.empty or len(df) < 30:
                 return {"error": "Insufficient data for training"}
 
-            # Prepare features
-            feature_cols = [col for col in df.columns if col not in ['value']]
-            if not feature_cols:
-                feature_cols = ['hour', 'day_of_week', 'month']
-
-            X = df[feature_cols].values
-            y = df['value'].values
-
-            # Split data (80-20 split)
-            split_idx = int(0.8 * len(df))
-            X_train, X_test = X[:split_idx], X[split_idx:]
-            y_train, y_test = y[:split_idx], y[split_idx:]
-
-            # Scale features
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-
-            # Train model based on type
-            if model_type == "linear":
-                model = LinearRegression()
-            elif model_type == "rf":
-                model = RandomForestRegressor(n_estimators=100, random_state=42)
-            elif model_type == "gbm":
-                model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-            else:  # ensemble
-                # Use gradient boosting as default for ensemble
-                model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-
-            model.fit(X_train_scaled, y_train)
-
-            # Evaluate model
-            y_pred = model.predict(X_test_scaled)
-            mae = mean_absolute_error(y_test, y_pred)
-            mse = mean_squared_error(y_test, y_pred)
-            rmse = np.sqrt(mse)
-
-            # Save model and scaler
-            model_key = f"{parachain_id}_{metric}_{model_type}"
-            self.models[model_key] = model
-            self.scalers[model_key] = scaler
-
-            # Save to disk
-            await self._save_model(model_key, model, scaler)
-
-            self._ready = True
-
-            return {
-                "model_type": model_type,
-                "mae": mae,
-                "rmse": rmse,
-                "training_samples": len(X_train),
-                "test_samples": len(X_test),
-                "feature_count": len(feature_cols)
-            }
+            # Fitting is CPU-bound; a worker thread keeps the event loop serving requests
+            return await asyncio.to_thread(self._fit_model, df, parachain_id, metric, model_type)
 
         except Exception as e:
             logging.error(f"Error training model for {parachain_id} {metric}: {e}")
             return {"error": str(e)}
 
+    def _fit_model(self, df: pd.DataFrame, parachain_id: str, metric: str, model_type: str) -> Dict[str, Any]:
+        """Fit, evaluate and publish one model (blocking; called in a worker thread)."""
+        started = time.perf_counter()
+
+        # Prepare features
+        feature_cols = [col for col in df.columns if col not in ['value']]
+        if not feature_cols:
+            feature_cols = ['hour', 'day_of_week', 'month']
+
+        X = df[feature_cols].values
+        y = df['value'].values
+
+        # Split data (80-20 split)
+        split_idx = int(0.8 * len(df))
+        X_train, X_test = X[:split_idx], X[split_idx:]
+        y_train, y_test = y[:split_idx], y[split_idx:]
+
+        # Scale features
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+        # Train model based on type
+        if model_type == "linear":
+            model = LinearRegression()
+        elif model_type == "rf":
+            model = RandomForestRegressor(n_estimators=100, random_state=42)
+        elif model_type == "gbm":
+            model = GradientBoostingRegressor(n_estimators=100, random_state=42)
+        else:  # ensemble
+            # Use gradient boosting as default for ensemble
+            model = GradientBoostingRegressor(n_estimators=100, random_state=42)
+
+        model.fit(X_train_scaled, y_train)
+
+        # Evaluate model
+        y_pred = model.predict(X_test_scaled)
+        mae = mean_absolute_error(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+        rmse = np.sqrt(mse)
+        residuals = y_test - y_pred
+
+        model_key = f"{parachain_id}_{metric}_{model_type}"
+
+        # Record the training window so retraining can detect changes
+        metadata = {
+            "parachain_id": parachain_id,
+            "metric": metric,
+            "model_type": model_type,
+            "feature_cols": feature_cols,
+            "last_row": df[feature_cols].iloc[-1].to_dict(),
+            **window_fingerprint(df),
+            "residual_mean": float(np.mean(residuals)),
+            "residual_std": float(np.std(residuals)),
+            "train_seconds": time.perf_counter() - started,
+            "trained_at": datetime.now().isoformat()
+        }
+
+        # Publish model, scaler and feature spec as one immutable version
+        self.registry.publish(model_key, model, scaler, feature_cols, metadata)
+
+        self._ready = True
+
+        return {
+            "model_type": model_type,
+            "mae": mae,
+            "rmse": rmse,
+            "training_samples": len(X_train),
+            "test_samples": len(X_test),
+            "feature_count": len(feature_cols)
+        }
+
     async def predict(
         self,
         parachain_id: str,
         metric: str,
         days: int = 7,
-        model_type: str = "ensemble"
+        model_type: str = "ensemble",
+        columnar: bool = False
     ) -> Dict[str, Any]:
         """
         Generate predictions for a parachain metric.
@@ -134,76 +174,132 @@ class TimeSeriesForecaster:
             metric: Metric to predict
             days: Number of days to predict
             model_type: Model type to use
+            columnar: Return 'columns' (timestamps and values arrays) instead
+                of per-point 'values' records
 
         Returns:
             Prediction results
         """
         try:
             model_key = f"{parachain_id}_{metric}_{model_type}"
+            self.request_counts[model_key] += 1
 
-            # Load model if not in memory
-            if model_key not in self.models:
-                await self._load_model(model_key)
-
-            if model_key not in self.models:
-                return {"error": "Model not available"}
-
-            model = self.models[model_key]
-            scaler = self.scalers[model_key]
-
-            # Generate future dates
-            last_date = datetime.now()
-            future_dates = [last_date + timedelta(days=i) for i in range(1, days + 1)]
-
-            # Create future features
-            future_features = []
-            for date in future_dates:
-                features = [
-                    date.hour,      # hour
-                    date.weekday(), # day_of_week
-                    date.day,       # day_of_month
-                    date.month,     # month
-                    date.quarter,   # quarter
-                    1 if date.weekday() >= 5 else 0  # is_weekend
-                ]
-
-                # Add lag features (use last known values)
-                # This is simplified - in production you'd want more sophisticated lag handling
-                future_features.append(features)
-
-            # Scale features
-            X_future = np.array(future_features)
-            X_future_scaled = scaler.transform(X_future)
-
-            # Make predictions
-            predictions = model.predict(X_future_scaled)
-
-            # Calculate confidence based on historical performance
-            confidence = self._calculate_confidence(model, X_future_scaled)
-
-            # Format results
-            result = {
-                "values": [
-                    {
-                        "timestamp": date.isoformat(),
-                        "predicted_value": float(pred),
-                        "confidence": confidence
-                    }
-                    for date, pred in zip(future_dates, predictions)
-                ],
-                "confidence": confidence,
-                "model": model_type,
-                "parachain_id": parachain_id,
-                "metric": metric,
-                "timestamp": datetime.now().isoformat()
-            }
+            # Hold the current version so a concurrent retrain cannot swap it mid-request
+            async with self.registry.lease(model_key, lambda: self._read_legacy(model_key)) as bundle:
+                if bundle is None:
+                    return {"error": "Model not available"}
 
-            return result
+                return self._forecast(bundle, parachain_id, metric, days, model_type, columnar)
 
         except Exception as e:
             logging.error(f"Error making prediction for {parachain_id} {metric}: {e}")
             return {"error": str(e)}
 
+    def _forecast(
+        self,
+        bundle: ModelBundle,
+        parachain_id: str,
+        metric: str,
+        days: int,
+        model_type: str,
+        columnar: bool = False
+    ) -> Dict[str, Any]:
+        """Generate predictions from one model bundle."""
+        model = bundle.model
+        scaler = bundle.scaler
+
+        # Generate future dates
+        last_date = datetime.now()
+        future_dates = pd.DatetimeIndex([last_date + timedelta(days=i) for i in range(1, days + 1)])
+
+        # Scale features
+        X_future_scaled = scaler.transform(self._future_features(bundle, future_dates))
+
+        # Make predictions
+        predictions = model.predict(X_future_scaled)
+
+        # Calculate confidence based on historical performance
+        confidence = self._calculate_confidence(model, X_future_scaled)
+
+        # Format results
+        result = {
+            "confidence": confidence,
+            "model": model_type,
+            "parachain_id": parachain_id,
+            "metric": metric,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        if columnar:
+            result["columns"] = {
+                "timestamps": future_dates.values,
+                "values": np.asarray(predictions, dtype=float)
+            }
+        else:
+            result["values"] = [
+                {
+                    "timestamp": date.isoformat(),
+                    "predicted_value": float(pred),
+                    "confidence": confidence
+                }
+                for date, pred in zip(future_dates, predictions)
+            ]
+
+        return result
+
+    def _future_features(self, bundle: ModelBundle, future_dates: pd.DatetimeIndex) -> np.ndarray:
+        """
+        Build the feature matrix for future dates in the bundle's feature order.
+
+        Calendar features are derived from the dates; lag and rolling features
+        are held at their last known training values.
+        """
+        calendar = {
+            'hour': future_dates.hour,
+            'day_of_week': future_dates.dayofweek,
+            'day_of_month': future_dates.day,
+            'month': future_dates.month,
+            'quarter': future_dates.quarter,
+            'is_weekend': (future_dates.dayofweek >= 5).astype(int)
+        }
+
+        feature_cols = list(bundle.feature_cols) or list(calendar)
+        last_row = bundle.metadata.get("last_row", {})
+
+        return np.column_stack([
+            np.asarray(calendar[col], dtype=float) if col in calendar
+            else np.full(len(future_dates), float(last_row.get(col, 0.0)))
+            for col in feature_cols
+        ])
+
+    async def forecast_path(
+        self,
+        parachain_id: str,
+        metric: str,
+        days: int,
+        model_type: str = "ensemble"
+    ) -> Optional[np.ndarray]:
+        """
+        Get the daily point forecast as an array.
+
+        Args:
+            parachain_id: Parachain identifier
+            metric: Metric to predict
+            days: Number of days to predict
+            model_type: Model type to use
+
+        Returns:
+            Array of predicted values, or None if no model is available
+        """
+        model_key = f"{parachain_id}_{metric}_{model_type}"
+        async with self.registry.lease(model_key, lambda: self._read_legacy(model_key)) as bundle:
+            if bundle is None:
+                return None
+
+            future_dates = pd.date_range(datetime.now(), periods=days + 1, freq='D')[1:]
+            X_future = bundle.scaler.transform(self._future_features(bundle, future_dates))
+            return bundle.model.predict(X_future)
+
     def _calculate_confidence(self, model: Any, X: np.ndarray) -> float:
         """
         Calculate prediction confidence based on feature variance.
@@ -227,62 +323,204 @@ class TimeSeriesForecaster:
         except Exception:
             return 0.5  # Default confidence
 
-    async def _save_model(self, model_key: str, model: Any, scaler: Any):
-        """Save model and scaler to disk."""
+    async def _load_model(self, model_key: str) -> Optional[ModelBundle]:
+        """Load the current bundle, migrating models saved by older versions."""
         try:
-            model_path = os.path.join(self.cache_dir, f"{model_key}_model.pkl")
-            scaler_path = os.path.join(self.cache_dir, f"{model_key}_scaler.pkl")
+            bundle = await self.registry.load(model_key, lambda: self._read_legacy(model_key))
+            if bundle is None:
+                logging.warning(f"Model {model_key} not found on disk")
+            return bundle
 
-            joblib.dump(model, model_path)
-            joblib.dump(scaler, scaler_path)
+        except Exception as e:
+            logging.error(f"Error loading model {model_key}: {e}")
+            return None
 
-            logging.info(f"Saved model {model_key}")
+    def _read_legacy(self, model_key: str) -> Optional[tuple]:
+        """Read a model saved as separate pickles before versioned publishing."""
+        model_path = os.path.join(self.cache_dir, f"{model_key}_model.pkl")
+        scaler_path = os.path.join(self.cache_dir, f"{model_key}_scaler.pkl")
+        meta_path = os.path.join(self.cache_dir, f"{model_key}_meta.pkl")
 
-        except Exception as e:
-            logging.error(f"Error saving model {model_key}: {e}")
+        if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+            return None
 
-    async def _load_model(self, model_key: str):
-        """Load model and scaler from disk."""
-        try:
-            model_path = os.path.join(self.cache_dir, f"{model_key}_model.pkl")
-            scaler_path = os.path.join(self.cache_dir, f"{model_key}_scaler.pkl")
+        metadata = joblib.load(meta_path) if os.path.exists(meta_path) else {}
+        return joblib.load(model_path), joblib.load(scaler_path), metadata.get("feature_cols", []), metadata
 
-            if os.path.exists(model_path) and os.path.exists(scaler_path):
-                self.models[model_key] = joblib.load(model_path)
-                self.scalers[model_key] = joblib.load(scaler_path)
-                logging.info(f"Loaded model {model_key}")
-            else:
-                logging.warning(f"Model {model_key} not found on disk")
+    async def retrain(
+        self,
+        data_loader=None,
+        series: Optional[List[str]] = None,
+        force: bool = False,
+        drift_threshold: float = 3.0
+    ) -> Dict[str, Any]:
+        """
+        Retrain models whose series changed since they were last trained.
 
-        except Exception as e:
-            logging.error(f"Error loading model {model_key}: {e}")
+        A series is refit when its training window was revised, or when new
+        points arrived and the model's residuals on them show drift.
+        Everything else is skipped.
+
+        Args:
+            data_loader: DataLoader used to fetch current data
+            series: Model keys to consider (defaults to every tracked model)
+            force: Refit every series regardless of change detection
+            drift_threshold: z threshold for the residual drift test
+
+        Returns:
+            Retrain report listing refit, skipped and failed series
+        """
+        report = new_retrain_report()
+        started = time.perf_counter()
 
-    async def retrain(self, data_loader=None):
-        """Retrain all available models."""
         try:
-            # This would typically fetch current data and retrain models
-            # For now, just mark as ready
+            if data_loader is None:
+                logging.warning("No data loader supplied, skipping forecaster retraining")
+            else:
+                for model_key in (series or self._tracked_model_keys()):
+                    await self._retrain_series(data_loader, model_key, report, force, drift_threshold)
+
             self._ready = True
-            logging.info("Model retraining completed")
+            report["elapsed_seconds"] = time.perf_counter() - started
+            logging.info(
+                f"Model retraining completed: {len(report['refit'])} refit, "
+                f"{len(report['skipped'])} skipped, {len(report['failed'])} failed, "
+                f"{report['time_saved_seconds']:.1f}s saved"
+            )
 
         except Exception as e:
             logging.error(f"Error retraining models: {e}")
+            report["error"] = str(e)
+
+        return report
+
+    async def _retrain_series(
+        self,
+        data_loader,
+        model_key: str,
+        report: Dict[str, Any],
+        force: bool,
+        drift_threshold: float
+    ):
+        """Check one series for changes and refit it if needed."""
+        try:
+            bundle = await self._load_model(model_key)
+            if bundle is None:
+                report["failed"].append({"series": model_key, "error": "Model not available"})
+                return
+
+            meta = dict(bundle.metadata or {})
+            tracked = bool(meta.get("content_hash"))
+            if not tracked:
+                # Saved before training windows were recorded: take the series from the key
+                identity = parse_model_key(model_key, self.MODEL_TYPES)
+                if identity:
+                    meta.update(zip(("parachain_id", "metric", "model_type"), identity))
+                elif not all(meta.get(k) for k in ("parachain_id", "metric", "model_type")):
+                    report["failed"].append({"series": model_key, "error": "Cannot identify series of model"})
+                    return
+
+            raw = await data_loader.get_parachain_data(
+                parachain_id=meta["parachain_id"],
+                metric=meta["metric"],
+                start_date=(
+                    meta["first_timestamp"] if tracked
+                    else datetime.now() - timedelta(days=UNTRACKED_WINDOW_DAYS)
+                )
+            )
+            processed = await asyncio.to_thread(data_loader.preprocess_frame, raw.copy()) if not raw.empty else raw
+
+            if force:
+                change = {"decision": "forced"}
+            else:
+                change = await asyncio.to_thread(
+                    classify_change,
+                    raw,
+                    meta,
+                    lambda rows: self._residuals(bundle, processed.loc[processed.index.isin(rows.index)]),
+                    drift_threshold=drift_threshold
+                )
+
+            self.request_counts[model_key] = 0
+            self.drift_scores[model_key] = abs(change.get("drift", {}).get("z_score", 0.0))
+
+            if not force and change["decision"] not in REFIT_DECISIONS:
+                report["skipped"].append({"series": model_key, **change})
+                report["time_saved_seconds"] += meta.get("train_seconds", 0.0)
+                return
+
+            # Refit on a trailing window of the same length with the same feature spec
+            window = processed
+            if tracked:
+                span = meta["last_timestamp"] - meta["first_timestamp"]
+                window = window.loc[window.index >= window.index.max() - span]
+            feature_cols = meta.get("feature_cols") or list(bundle.feature_cols)
+            if feature_cols:
+                window = window[['value'] + [c for c in feature_cols if c in window.columns]]
+
+            result = await self.train_model(window, meta["parachain_id"], meta["metric"], meta["model_type"])
+            if "error" in result:
+                report["failed"].append({"series": model_key, "error": result["error"]})
+            else:
+                self.drift_scores[model_key] = 0.0
+                report["refit"].append({"series": model_key, "reason": change["decision"], "mae": result["mae"]})
+
+        except Exception as e:
+            logging.error(f"Error retraining {model_key}: {e}")
+            report["failed"].append({"series": model_key, "error": str(e)})
+
+    def _residuals(self, bundle: ModelBundle, rows: pd.DataFrame) -> np.ndarray:
+        """Compute residuals of a model bundle on new rows."""
+        X = bundle.scaler.transform(rows[list(bundle.feature_cols)].values)
+        return rows['value'].values - bundle.model.predict(X)
+
+    def _tracked_model_keys(self) -> List[str]:
+        """List published model keys plus legacy models awaiting migration."""
+        keys = set(self.registry.model_keys())
+        if os.path.exists(self.cache_dir):
+            # Metadata was optional in that layout; the model pickle marks a legacy model
+            keys.update(
+                key for key in (
+                    f[:-len("_model.pkl")] for f in os.listdir(self.cache_dir) if f.endswith("_model.pkl")
+                )
+                if parse_model_key(key, self.MODEL_TYPES)
+            )
+        return sorted(keys)
+
+    def series_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get scheduling stats for every tracked model.
+
+        Returns:
+            Mapping of model key to last training time, requests since the
+            last retrain check and last measured drift
+        """
+        series = {}
+        for model_key in self._tracked_model_keys():
+            pointer = self.registry.describe(model_key) or {}
+
+            series[model_key] = {
+                "trained_at": pointer.get("published_at"),
+                "requests": self.request_counts.get(model_key, 0),
+                "drift": self.drift_scores.get(model_key, 0.0)
+            }
+        return series
 
     async def get_model_info(self, parachain_id: str, metric: str) -> Dict[str, Any]:
         """Get information about available models for a parachain metric."""
         try:
-            model_types = ["linear", "rf", "gbm", "ensemble"]
             info = {}
 
-            for model_type in model_types:
+            for model_type in self.MODEL_TYPES:
                 model_key = f"{parachain_id}_{metric}_{model_type}"
-                if model_key in self.models:
-                    info[model_type] = {"status": "loaded", "ready": True}
+                pointer = self.registry.describe(model_key)
+                if pointer:
+                    info[model_type] = {"status": "available", "ready": True, "version": pointer["version"]}
                 else:
-                    # Check if model exists on disk
+                    # Check for a model saved before versioned publishing
                     model_path = os.path.join(self.cache_dir, f"{model_key}_model.pkl")
                     if os.path.exists(model_path):
-                        info[model_type] = {"status": "available", "ready": False}
+                        info[model_type] = {"status": "legacy", "ready": False}
                     else:
                         info[model_type] = {"status": "not_trained", "ready": False}
 
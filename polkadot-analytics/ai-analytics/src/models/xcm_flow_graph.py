@@ -0,0 +1,403 @@
+"""
+XCM flow graph analytics
+Maintains sparse source -> destination transfer matrices per time bucket from
+streamed XCM pallet calls, for corridor rankings and flow change queries
+
+The transactions table holds the extrinsics of a single indexed chain, and a
+signed XCM call always executes on the chain it was submitted to, so every
+transfer's source is that chain (`origin_chain_id`). Until transactions of
+other chains are indexed the graph is a star around the origin and the
+corridors rank its outbound destinations.
+"""
+
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, AsyncIterator, Iterable, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Pallets whose calls move assets or messages across chains
+XCM_MODULES = ("xcmPallet", "polkadotXcm", "xTokens", "xTransfer")
+
+# Chain id used for the relay chain in the graph
+RELAY_CHAIN_ID = 0
+
+
+def _params_dict(params: Any) -> Dict[str, Any]:
+    """Normalize call params stored as a dict, a [{name, value}] list or JSON text."""
+    if isinstance(params, (str, bytes)):
+        try:
+            params = json.loads(params)
+        except ValueError:
+            return {}
+    if isinstance(params, list):
+        return {p.get("name"): p.get("value") for p in params if isinstance(p, dict)}
+    return params if isinstance(params, dict) else {}
+
+
+def _find(obj: Any, key: str) -> Iterable[Any]:
+    """Yield every value stored under `key` (case-insensitive) in nested JSON."""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if str(k).lower() == key:
+                yield v
+            yield from _find(v, key)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _find(item, key)
+
+
+def _as_number(value: Any) -> Optional[float]:
+    """Parse amounts given as numbers, decimal strings or hex strings."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(int(value.replace(",", ""), 0))
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def parse_xcm_call(call_name: str, params: Any, origin: int = RELAY_CHAIN_ID) -> Optional[Tuple[int, int, float]]:
+    """
+    Extract the corridor and amount of an XCM pallet call.
+
+    The destination is the first `Parachain` junction of the `dest` location;
+    a location without one that points to the parent is the relay chain.
+    The source is always `origin`: neither the beneficiary (an account on
+    the destination) nor the asset locations (the reserve) identify the
+    sending chain, which is the chain the call was submitted on.
+    The amount is the sum of fungible assets (or the `amount` param of
+    xTokens-style calls); message-only calls such as `send` count with 0.
+
+    Args:
+        call_name: Extrinsic call name
+        params: Extrinsic params
+        origin: Chain the transactions were indexed from
+
+    Returns:
+        (source, destination, amount), or None if there is no destination
+    """
+    params = _params_dict(params)
+    dest = params.get("dest", params.get("destination"))
+    if dest is None:
+        return None
+
+    destination = None
+    for junction in _find(dest, "parachain"):
+        destination = _as_number(junction)
+        if destination is not None:
+            break
+    if destination is None:
+        parents = next(iter(_find(dest, "parents")), None)
+        if _as_number(parents) and _as_number(parents) >= 1:
+            destination = RELAY_CHAIN_ID
+        else:
+            return None
+
+    amounts = [_as_number(v) for v in _find(params.get("assets"), "fungible")]
+    if not amounts and "amount" in params:
+        amounts = [_as_number(params["amount"])]
+    amount = sum(a for a in amounts if a is not None)
+
+    return int(origin), int(destination), float(amount)
+
+
+class XcmFlowGraph:
+    """
+    Sparse transfer graph between chains, bucketed in time.
+
+    Each bucket holds a volume and a count matrix in CSR form, indexed by a
+    growing chain registry. New transfers are added per bucket in one sparse
+    construction (duplicates are summed), and queries add up the buckets of
+    their range, which costs O(buckets x non-zero corridors) instead of a
+    scan of the transactions table.
+    """
+
+    def __init__(self, bucket_minutes: int = 60, retention_days: int = 30, origin_chain_id: int = RELAY_CHAIN_ID):
+        """
+        Initialize the graph.
+
+        Args:
+            bucket_minutes: Width of a time bucket
+            retention_days: Buckets older than this (relative to the newest) are dropped
+            origin_chain_id: Chain the indexed transactions were submitted on, used
+                as the source of every transfer they contain
+        """
+        self.bucket_seconds = int(bucket_minutes * 60)
+        self.retention_seconds = int(retention_days * 86400)
+        self.origin_chain_id = origin_chain_id
+
+        self._index: Dict[int, int] = {}
+        self._chains: List[int] = []
+        self._volume: Dict[int, sparse.csr_matrix] = {}
+        self._count: Dict[int, sparse.csr_matrix] = {}
+
+        self.transactions_seen = 0
+        self.transfers_ingested = 0
+        self.unparsed = 0
+        self.processing_seconds = 0.0
+
+    def _node(self, chain_id: int) -> int:
+        """Matrix index of a chain, registering it on first sight."""
+        i = self._index.get(chain_id)
+        if i is None:
+            i = self._index[chain_id] = len(self._chains)
+            self._chains.append(chain_id)
+        return i
+
+    def ingest_transactions(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Parse XCM transactions and add them to the graph.
+
+        Args:
+            rows: Rows from DataLoader.stream_xcm_transactions
+
+        Returns:
+            Number of transfers added
+        """
+        transfers = []
+        for row in rows:
+            parsed = parse_xcm_call(row.get("call_name", ""), row.get("params"), self.origin_chain_id)
+            if parsed is None or row.get("timestamp") is None:
+                self.unparsed += 1
+                continue
+            transfers.append((int(row["timestamp"]), *parsed))
+
+        self.transactions_seen += len(rows)
+        return self.ingest(transfers)
+
+    def ingest(self, transfers: List[Tuple[int, int, int, float]]) -> int:
+        """
+        Add transfers to their time buckets.
+
+        Args:
+            transfers: (unix_timestamp, source_chain, destination_chain, amount)
+
+        Returns:
+            Number of transfers added
+        """
+        if not transfers:
+            return 0
+
+        started = time.perf_counter()
+        timestamps, sources, destinations, amounts = zip(*transfers)
+        n_before = len(self._chains)
+        src = np.fromiter((self._node(c) for c in sources), dtype=np.int64, count=len(transfers))
+        dst = np.fromiter((self._node(c) for c in destinations), dtype=np.int64, count=len(transfers))
+        amounts = np.asarray(amounts, dtype=float)
+        buckets = np.asarray(timestamps, dtype=np.int64) // self.bucket_seconds * self.bucket_seconds
+
+        n = len(self._chains)
+        if n != n_before:
+            for matrices in (self._volume, self._count):
+                for matrix in matrices.values():
+                    matrix.resize((n, n))
+
+        order = np.argsort(buckets, kind="stable")
+        bounds = np.flatnonzero(np.diff(buckets[order])) + 1
+        for chunk in np.split(order, bounds):
+            bucket = int(buckets[chunk[0]])
+            coords = (src[chunk], dst[chunk])
+            volume = sparse.csr_matrix((amounts[chunk], coords), shape=(n, n))
+            count = sparse.csr_matrix((np.ones(chunk.size), coords), shape=(n, n))
+            if bucket in self._volume:
+                volume = volume + self._volume[bucket]
+                count = count + self._count[bucket]
+            self._volume[bucket] = volume
+            self._count[bucket] = count
+
+        self._prune()
+        self.transfers_ingested += len(transfers)
+        self.processing_seconds += time.perf_counter() - started
+        return len(transfers)
+
+    def _prune(self):
+        """Drop buckets that fell out of the retention window."""
+        if not self._volume:
+            return
+        cutoff = max(self._volume) - self.retention_seconds
+        for bucket in [b for b in self._volume if b < cutoff]:
+            del self._volume[bucket]
+            del self._count[bucket]
+
+    def _range(self, start: float, end: float) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """Summed volume and count matrices of the buckets starting in [start, end)."""
+        n = len(self._chains)
+        volume = sparse.csr_matrix((n, n))
+        count = sparse.csr_matrix((n, n))
+        for bucket in self._volume:
+            if start <= bucket < end:
+                volume = volume + self._volume[bucket]
+                count = count + self._count[bucket]
+        return volume, count
+
+    def _window_end(self, end: Optional[datetime]) -> float:
+        """End of a query window: the given time or the end of the newest bucket."""
+        if end is not None:
+            return end.timestamp()
+        return max(self._volume) + self.bucket_seconds if self._volume else time.time()
+
+    def top_corridors(
+        self,
+        hours: float = 24,
+        limit: int = 10,
+        by: str = "volume",
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Rank source -> destination corridors over a recent window.
+
+        With transactions from a single indexed chain all corridors share
+        the origin as their source (see the module docstring).
+
+        Args:
+            hours: Window length
+            limit: Number of corridors returned
+            by: 'volume' or 'count'
+            end: Window end (default: end of the newest bucket)
+
+        Returns:
+            Corridors with volume, count and share of the window total
+        """
+        if by not in ("volume", "count"):
+            raise ValueError(f"Unknown ranking: {by}")
+
+        window_end = self._window_end(end)
+        volume, count = self._range(window_end - hours * 3600, window_end)
+        ranked = (volume if by == "volume" else count).tocoo()
+
+        top = np.argsort(-ranked.data, kind="stable")[:limit]
+        total = ranked.data.sum()
+        corridors = []
+        for k in top:
+            i, j = int(ranked.row[k]), int(ranked.col[k])
+            corridors.append({
+                "source": self._chains[i],
+                "destination": self._chains[j],
+                "volume": float(volume[i, j]),
+                "count": int(count[i, j]),
+                "share": float(ranked.data[k] / total) if total else 0.0
+            })
+
+        return {
+            "corridors": corridors,
+            "window_start": datetime.fromtimestamp(window_end - hours * 3600).isoformat(),
+            "window_end": datetime.fromtimestamp(window_end).isoformat(),
+            "total_volume": float(volume.sum()),
+            "total_count": int(count.sum()),
+            "ranked_by": by
+        }
+
+    def flow_changes(
+        self,
+        recent_hours: float = 24,
+        baseline_hours: float = 168,
+        threshold: float = 3.0,
+        min_count: int = 5,
+        limit: int = 20,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Find corridors whose activity changed sharply.
+
+        Transfer counts in the recent window are compared with the count
+        expected from the baseline window just before it (scaled to the same
+        length), as a Poisson z-score computed over all corridors at once.
+
+        Args:
+            recent_hours: Recent window length
+            baseline_hours: Baseline window length
+            threshold: |z| above which a corridor is reported
+            min_count: Minimum recent or expected count to report a corridor
+            limit: Maximum corridors returned
+            end: Recent window end (default: end of the newest bucket)
+
+        Returns:
+            Changed corridors, largest |z| first
+        """
+        window_end = self._window_end(end)
+        recent_start = window_end - recent_hours * 3600
+        recent_volume, recent_count = self._range(recent_start, window_end)
+        base_volume, base_count = self._range(recent_start - baseline_hours * 3600, recent_start)
+        scale = recent_hours / baseline_hours
+
+        # Union of corridors active in either window
+        support = (recent_count + base_count).tocoo()
+        rows, cols = support.row, support.col
+        observed = np.asarray(recent_count[rows, cols]).ravel()
+        expected = np.asarray(base_count[rows, cols]).ravel() * scale
+        z = (observed - expected) / np.sqrt(expected + 1)
+
+        keep = (np.abs(z) > threshold) & (np.maximum(observed, expected) >= min_count)
+        order = np.flatnonzero(keep)[np.argsort(-np.abs(z[keep]), kind="stable")][:limit]
+
+        recent_vol = np.asarray(recent_volume[rows, cols]).ravel()
+        expected_vol = np.asarray(base_volume[rows, cols]).ravel() * scale
+
+        changes = []
+        for k in order:
+            if expected[k] == 0:
+                kind = "new_corridor"
+            elif observed[k] == 0:
+                kind = "vanished"
+            else:
+                kind = "surge" if z[k] > 0 else "drop"
+            changes.append({
+                "source": self._chains[int(rows[k])],
+                "destination": self._chains[int(cols[k])],
+                "kind": kind,
+                "z_score": float(z[k]),
+                "count": int(observed[k]),
+                "expected_count": float(expected[k]),
+                "volume": float(recent_vol[k]),
+                "expected_volume": float(expected_vol[k])
+            })
+
+        return {
+            "changes": changes,
+            "corridors_compared": int(rows.size),
+            "recent_start": datetime.fromtimestamp(recent_start).isoformat(),
+            "window_end": datetime.fromtimestamp(window_end).isoformat(),
+            "threshold": threshold
+        }
+
+    async def consume(self, feed: AsyncIterator[List[Dict[str, Any]]]):
+        """
+        Add transactions from an async feed until it ends or the task is cancelled.
+
+        Args:
+            feed: Async iterator of transaction row batches
+        """
+        async for rows in feed:
+            try:
+                added = self.ingest_transactions(rows)
+                logging.debug(f"Added {added} XCM transfers from {len(rows)} transactions")
+            except Exception as e:
+                logging.error(f"Error adding XCM transfers to the flow graph: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get size and throughput of the graph."""
+        newest = max(self._volume) if self._volume else None
+        return {
+            "origin_chain_id": self.origin_chain_id,
+            "chains": len(self._chains),
+            "buckets": len(self._volume),
+            "bucket_corridors": sum(m.nnz for m in self._count.values()),
+            "transactions_seen": self.transactions_seen,
+            "transfers_ingested": self.transfers_ingested,
+            "unparsed": self.unparsed,
+            "newest_bucket": datetime.fromtimestamp(newest).isoformat() if newest is not None else None,
+            "mean_ingest_cost_us": (
+                self.processing_seconds / self.transfers_ingested * 1e6 if self.transfers_ingested else 0.0
+            )
+        }
@@ -0,0 +1,278 @@
+"""
+Fleet-wide parachain health leaderboard
+Scores every parachain in one pass over an aligned daily panel, which is kept
+up to date by fetching only the days that changed
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Any
+
+import numpy as np
+import pandas as pd
+
+HEALTH_METRICS = ['tvl', 'transactions', 'users']
+
+# Sort field -> (columns, ascending order puts the healthiest first)
+SORT_FIELDS = {
+    "health": (["health", "score"], False),
+    "score": (["score"], False),
+    "tvl_growth": (["tvl_growth"], False),
+    "user_growth": (["user_growth"], False),
+    "transaction_cv": (["transaction_cv"], True),
+    "parachain_id": (["parachain_id"], True)
+}
+
+
+def score_health(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Health indicators of every parachain in an aligned panel.
+
+    Three checks are applied to each parachain: TVL growth above 10%,
+    transaction coefficient of variation below 0.5 and user growth above 5%
+    between the first and last observed day. A check counts when the metric
+    has at least two observations. `score` breaks ties between equal health
+    shares: the average percentile of the three indicators across the fleet.
+
+    Args:
+        panel: Daily values indexed by day with (metric, parachain_id) columns
+
+    Returns:
+        DataFrame indexed by parachain_id with tvl_growth, transaction_cv,
+        user_growth, checks, checks_passed, health (% of checks passed) and
+        score (0-100)
+    """
+    parachains = panel.columns.get_level_values(1).unique()
+    present = set(panel.columns.get_level_values(0))
+
+    def metric(name: str) -> pd.DataFrame:
+        frame = panel[name] if name in present else pd.DataFrame(index=panel.index)
+        return frame.reindex(columns=parachains)
+
+    def growth(frame: pd.DataFrame) -> pd.Series:
+        first = frame.bfill().iloc[0]
+        last = frame.ffill().iloc[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return ((last - first) / first).replace([np.inf, -np.inf], np.nan)
+
+    tvl, transactions, users = (metric(m) for m in HEALTH_METRICS)
+    mean = transactions.mean()
+    indicators = pd.DataFrame({
+        'tvl_growth': growth(tvl),
+        'transaction_cv': (transactions.std() / mean).where(mean > 0),
+        'user_growth': growth(users)
+    }, index=parachains)
+
+    available = pd.DataFrame({
+        'tvl_growth': tvl.count() > 1,
+        'transaction_cv': transactions.count() > 1,
+        'user_growth': users.count() > 1
+    }, index=parachains)
+    passed = pd.DataFrame({
+        'tvl_growth': indicators['tvl_growth'] > 0.1,
+        'transaction_cv': indicators['transaction_cv'] < 0.5,
+        'user_growth': indicators['user_growth'] > 0.05
+    }, index=parachains) & available
+
+    checks = available.sum(axis=1)
+    percentiles = pd.DataFrame({
+        'tvl_growth': indicators['tvl_growth'].rank(pct=True),
+        'transaction_cv': (-indicators['transaction_cv']).rank(pct=True),
+        'user_growth': indicators['user_growth'].rank(pct=True)
+    })
+
+    scores = indicators.assign(
+        checks=checks,
+        checks_passed=passed.sum(axis=1),
+        health=(passed.sum(axis=1) / checks * 100).where(checks > 0),
+        score=percentiles.mean(axis=1) * 100
+    )
+    scores.index.name = 'parachain_id'
+    return scores
+
+
+class HealthLeaderboard:
+    """
+    Cached health ranking of all parachains.
+
+    The daily panel is fetched once for the whole window; later refreshes
+    are skipped while the data watermark is unchanged and otherwise fetch
+    only the days from the last (partial) day onwards. A full rebuild every
+    `rebuild_hours` picks up late corrections to older days.
+    """
+
+    def __init__(
+        self,
+        data_loader,
+        window_days: int = 30,
+        refresh_minutes: float = 15,
+        rebuild_hours: float = 24
+    ):
+        """
+        Initialize the leaderboard.
+
+        Args:
+            data_loader: DataLoader providing the daily metrics
+            window_days: Days the health indicators cover
+            refresh_minutes: Minimum time between refreshes
+            rebuild_hours: Time between full reloads of the window
+        """
+        self.data_loader = data_loader
+        self.window_days = window_days
+        self.refresh_minutes = refresh_minutes
+        self.rebuild_hours = rebuild_hours
+
+        self._panel = pd.DataFrame()
+        self._scores = pd.DataFrame()
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at: Optional[datetime] = None
+        self._rebuilt_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self.stats = Counter()
+
+    async def refresh(self, force: bool = False):
+        """
+        Bring the panel and scores up to date.
+
+        Args:
+            force: Refresh even if the last refresh is recent
+        """
+        async with self._lock:
+            now = datetime.now()
+            if (
+                not force and self._refreshed_at
+                and now - self._refreshed_at < timedelta(minutes=self.refresh_minutes)
+            ):
+                return
+
+            try:
+                watermark = await self.data_loader.get_data_watermark()
+                rebuild = (
+                    self._rebuilt_at is None
+                    or now - self._rebuilt_at >= timedelta(hours=self.rebuild_hours)
+                )
+                if not rebuild and watermark == self._watermark:
+                    self._refreshed_at = now
+                    self.stats["unchanged"] += 1
+                    return
+
+                window_start = (pd.Timestamp(now) - pd.Timedelta(days=self.window_days)).normalize()
+                if rebuild or self._panel.empty:
+                    since = window_start
+                else:
+                    since = self._panel['timestamp'].max()
+
+                rows = await self.data_loader.get_metrics_pivot(
+                    HEALTH_METRICS, start_date=since.to_pydatetime(), bucket="day"
+                )
+
+                panel = self._panel if not (rebuild or self._panel.empty) else pd.DataFrame()
+                if not panel.empty:
+                    panel = panel[panel['timestamp'] < since]
+                panel = pd.concat([panel, rows], ignore_index=True) if not rows.empty else panel
+                if not panel.empty:
+                    panel = panel[panel['timestamp'] >= window_start]
+
+                self._panel = panel
+                self._scores = self._score(panel)
+                self._watermark = watermark
+                self._refreshed_at = now
+                if rebuild:
+                    self._rebuilt_at = now
+                self.stats["rebuilds" if rebuild else "incremental"] += 1
+                logging.info(
+                    f"Health leaderboard {'rebuilt' if rebuild else 'updated'}: "
+                    f"{len(rows)} rows fetched, {len(self._scores)} parachains scored"
+                )
+
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.error(f"Error refreshing health leaderboard: {e}")
+
+    def data_version(self) -> str:
+        """
+        Identify the data the scores were computed from.
+
+        Built from the data watermark, the last full rebuild (which picks
+        up corrections that leave the watermark unchanged) and the window,
+        so it means the same thing across restarts and workers.
+        """
+        return "|".join([
+            self._watermark.isoformat() if self._watermark else "",
+            self._rebuilt_at.isoformat() if self._rebuilt_at else "",
+            str(self.window_days)
+        ])
+
+    def _score(self, panel: pd.DataFrame) -> pd.DataFrame:
+        """Score the long panel after aligning it into (metric, parachain) columns."""
+        if panel.empty:
+            return pd.DataFrame()
+        wide = panel.pivot_table(index='timestamp', columns='parachain_id', values=HEALTH_METRICS)
+        return score_health(wide.sort_index())
+
+    async def get_page(
+        self,
+        sort_by: str = "health",
+        order: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        One page of the ranking.
+
+        Args:
+            sort_by: One of SORT_FIELDS
+            order: 'asc' or 'desc' (default: healthiest first)
+            limit: Parachains per page
+            offset: Parachains to skip
+
+        Returns:
+            Ranked parachains with their indicators, the total count and
+            the data they were computed from
+
+        Raises:
+            ValueError: Unknown sort field or order
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort_by} (expected one of {', '.join(SORT_FIELDS)})")
+        if order not in (None, "asc", "desc"):
+            raise ValueError(f"Unknown order: {order} (expected 'asc' or 'desc')")
+
+        await self.refresh()
+
+        columns, ascending = SORT_FIELDS[sort_by]
+        if order:
+            ascending = order == "asc"
+
+        ranked = self._scores.reset_index() if not self._scores.empty else pd.DataFrame()
+        if not ranked.empty:
+            ranked = ranked.sort_values(columns, ascending=ascending, na_position='last', kind='stable')
+        page = ranked.iloc[offset:offset + limit]
+        page = page.astype(object).where(page.notna(), None)
+
+        return {
+            "parachains": [
+                {"rank": offset + i + 1, **row}
+                for i, row in enumerate(page.to_dict(orient='records'))
+            ],
+            "total": len(ranked),
+            "offset": offset,
+            "limit": limit,
+            "sort_by": sort_by,
+            "order": "asc" if ascending else "desc",
+            "window_days": self.window_days,
+            "data_watermark": self._watermark.isoformat() if self._watermark else None,
+            "rebuilt_at": self._rebuilt_at.isoformat() if self._rebuilt_at else None
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get panel size, freshness and refresh counters."""
+        return {
+            "parachains": len(self._scores),
+            "panel_rows": len(self._panel),
+            "refreshed_at": self._refreshed_at.isoformat() if self._refreshed_at else None,
+            "rebuilt_at": self._rebuilt_at.isoformat() if self._rebuilt_at else None,
+            **{name: self.stats.get(name, 0) for name in ("rebuilds", "incremental", "unchanged", "errors")}
+        }
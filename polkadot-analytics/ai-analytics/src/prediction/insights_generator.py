@@ -6,8 +6,9 @@ Uses Google Gemini API to generate natural language insights
 import os
 import logging
 import asyncio
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import json
 
 # Google Gemini API import
@@ -20,20 +21,57 @@ except ImportError:
 import pandas as pd
 import numpy as np
 
+from .prompt_cache import prompt_key
+from .health_leaderboard import score_health
+from ..models.seasonality import detect_periodicity, cycle_peaks
+
+# Metrics the rule-based analyzers look at
+ANALYZED_METRICS = ['tvl', 'transactions', 'users']
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+
+# Significance level of periodicity and peak tests
+PATTERN_ALPHA = 0.01
+
 
 class InsightsGenerator:
     """Generates AI-powered insights for parachain data."""
 
-    def __init__(self, gemini_api_key: Optional[str] = None):
-        """Initialize the insights generator."""
+    def __init__(
+        self,
+        gemini_api_key: Optional[str] = None,
+        data_loader=None,
+        llm_timeout_seconds: float = 20.0,
+        llm_max_concurrency: int = 4,
+        prompt_cache=None
+    ):
+        """
+        Initialize the insights generator.
+
+        Args:
+            gemini_api_key: Gemini API key (rule-based insights only without it)
+            data_loader: DataLoader providing the metrics that are analyzed
+            llm_timeout_seconds: Budget per enhancement, including the wait for a slot
+            llm_max_concurrency: Maximum Gemini requests in flight
+            prompt_cache: Optional PromptCache for Gemini responses
+        """
         self.gemini_api_key = gemini_api_key
+        self.data_loader = data_loader
+        self.llm_timeout_seconds = llm_timeout_seconds
+        self._llm_slots = asyncio.Semaphore(llm_max_concurrency)
+        self._llm_inflight: Dict[str, asyncio.Future] = {}
+        self.llm_stats = Counter()
+        self.prompt_cache = prompt_cache
+        self._model = None
         self._ready = False
 
         if self.gemini_api_key and GEMINI_AVAILABLE:
             try:
+                # Configure the SDK once; the model instance is reused by every request
                 genai.configure(api_key=self.gemini_api_key)
-                # Test the configuration by creating a model instance
-                model = genai.GenerativeModel('gemini-2.5-flash')
+                self._model = genai.GenerativeModel(GEMINI_MODEL)
                 self._ready = True
                 logging.info("Gemini API configured successfully")
             except Exception as e:
@@ -72,8 +110,12 @@ class InsightsGenerator:
             )
 
             # Try to enhance with Gemini if available
+            enhanced = False
             if self._ready and GEMINI_AVAILABLE:
-                insights = await self._enhance_with_gemini(insights, parachain_id, time_range_days)
+                watermark = await self._data_watermark(parachain_id)
+                insights, enhanced = await self._enhance_with_gemini(
+                    insights, parachain_id, time_range_days, watermark
+                )
 
             return {
                 "insights": insights,
@@ -83,7 +125,7 @@ class InsightsGenerator:
                 "data_points": len(insights),
                 "parachain_id": parachain_id,
                 "time_range_days": time_range_days,
-                "ai_enhanced": self._ready and GEMINI_AVAILABLE
+                "ai_enhanced": enhanced
             }
 
         except Exception as e:
@@ -105,27 +147,31 @@ class InsightsGenerator:
         insights = []
 
         try:
-            # Generate sample data for insights
-            sample_data = await self._get_sample_data(parachain_id, time_range_days)
+            pivot = await self._get_metrics_pivot(parachain_id, time_range_days)
+            hourly = self._totals(pivot)
 
-            if sample_data.empty:
+            if hourly.empty:
                 return ["No data available for analysis"]
 
+            data = hourly.resample('D').mean()
+
             # Analyze trends
-            trends = self._analyze_trends(sample_data)
+            trends = self._analyze_trends(data)
             insights.extend(trends)
 
             # Analyze volatility
-            volatility = self._analyze_volatility(sample_data)
+            volatility = self._analyze_volatility(data)
             insights.extend(volatility)
 
-            # Analyze patterns
-            patterns = self._analyze_patterns(sample_data)
+            # Analyze patterns (across all parachains at once for the ecosystem)
+            patterns = self._analyze_patterns(hourly)
             insights.extend(patterns)
+            if not parachain_id:
+                insights.extend(self._analyze_fleet_patterns(pivot))
 
             # Generate parachain-specific insights
             if parachain_id:
-                parachain_insights = self._analyze_parachain_health(sample_data, parachain_id)
+                parachain_insights = self._analyze_parachain_health(data, parachain_id)
                 insights.extend(parachain_insights)
 
             return insights[:10]  # Limit to top 10 insights
@@ -134,77 +180,56 @@ class InsightsGenerator:
             logging.error(f"Error in rule-based insights: {e}")
             return [f"Error analyzing data: {str(e)}"]
 
-    async def _get_sample_data(self, parachain_id: Optional[str], days: int) -> pd.DataFrame:
-        """Get sample data for analysis."""
+    async def _get_metrics_pivot(self, parachain_id: Optional[str], days: int) -> pd.DataFrame:
+        """Hourly averages of the analyzed metrics per parachain (all parachains without an ID)."""
+        if not self.data_loader:
+            logging.warning("No data loader configured for insights")
+            return pd.DataFrame()
+
         try:
-            # Generate synthetic data for demonstration
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            timestamps = pd.date_range(start=start_date, end=end_date, freq='D')
-
-            # Create synthetic metrics
-            np.random.seed(42)
-            base_tvl = 1000000
-            base_txns = 10000
-            base_users = 1000
-
-            data = []
-            for i, timestamp in enumerate(timestamps):
-                # Add trends and seasonality
-                tvl_trend = base_tvl * (1 + 0.02 * i / 30)  # 2% growth
-                tvl_seasonal = tvl_trend * (0.9 + 0.2 * np.sin(2 * np.pi * timestamp.dayofyear / 365))
-                tvl_noise = np.random.normal(0, tvl_trend * 0.1)
-                tvl = tvl_seasonal + tvl_noise
-
-                txn_trend = base_txns * (1 + 0.015 * i / 30)
-                txn_seasonal = txn_trend * (0.8 + 0.3 * np.sin(2 * np.pi * timestamp.dayofyear / 7))
-                txn_noise = np.random.normal(0, txn_trend * 0.15)
-                transactions = max(0, txn_seasonal + txn_noise)
-
-                user_trend = base_users * (1 + 0.01 * i / 30)
-                user_seasonal = user_trend * (0.9 + 0.15 * np.sin(2 * np.pi * timestamp.dayofyear / 30))
-                user_noise = np.random.normal(0, user_trend * 0.1)
-                users = max(0, user_seasonal + user_noise)
-
-                data.append({
-                    'timestamp': timestamp,
-                    'tvl': tvl,
-                    'transactions': transactions,
-                    'users': users
-                })
-
-            df = pd.DataFrame(data)
-            df = df.set_index('timestamp')
-
-            return df
+            return await self.data_loader.get_metrics_pivot(
+                ANALYZED_METRICS,
+                start_date=datetime.now() - timedelta(days=days),
+                parachain_ids=[str(parachain_id)] if parachain_id else None,
+                bucket="hour"
+            )
 
         except Exception as e:
-            logging.error(f"Error getting sample data: {e}")
+            logging.error(f"Error getting metrics for insights: {e}")
             return pd.DataFrame()
 
+    def _totals(self, pivot: pd.DataFrame) -> pd.DataFrame:
+        """
+        Hourly metrics as a wide frame: one column per analyzed metric.
+
+        For a single parachain the frame holds its own values; for several,
+        they are summed into ecosystem totals.
+        """
+        if pivot.empty:
+            return pd.DataFrame()
+        df = pivot.groupby('timestamp')[ANALYZED_METRICS].sum(min_count=1).sort_index()
+        return df.dropna(axis=1, how='all')
+
     def _analyze_trends(self, df: pd.DataFrame) -> List[str]:
         """Analyze trends in the data."""
         insights = []
 
-        for metric in ['tvl', 'transactions', 'users']:
-            if metric not in df.columns:
-                continue
-
-            values = df[metric].dropna()
-            if len(values) < 7:
-                continue
-
-            # Calculate trend
-            first_half = values.iloc[:len(values)//2].mean()
-            second_half = values.iloc[len(values)//2:].mean()
-            change_pct = ((second_half - first_half) / first_half) * 100
-
-            if abs(change_pct) > 5:  # Significant change
-                direction = "increased" if change_pct > 0 else "decreased"
-                insights.append(
-                    f"{metric.upper()} has {direction} by {abs(change_pct):.1f} over the past "
-                    f"{len(df)} days, indicating {'growth' if change_pct > 0 else 'decline'} momentum."
-                )
+        # Compare the mean of each column's first and second half, all columns at once
+        half = len(df) // 2
+        first_half = df.iloc[:half].mean()
+        second_half = df.iloc[half:].mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = (second_half - first_half) / first_half.abs() * 100
+
+        enough = df.count() >= 7
+        significant = change_pct[enough & (change_pct.abs() > 5) & np.isfinite(change_pct)]
+
+        for metric, change in significant.items():
+            direction = "increased" if change > 0 else "decreased"
+            insights.append(
+                f"{metric.upper()} has {direction} by {abs(change):.1f}% over the past "
+                f"{len(df)} days, indicating {'growth' if change > 0 else 'decline'} momentum."
+            )
 
         return insights
 
@@ -212,106 +237,123 @@ class InsightsGenerator:
         """Analyze volatility in the data."""
         insights = []
 
-        for metric in ['tvl', 'transactions', 'users']:
-            if metric not in df.columns:
-                continue
+        # Coefficient of variation per column
+        mean = df.mean()
+        cv = (df.std() / mean * 100).where((mean > 0) & (df.count() >= 7))
 
-            values = df[metric].dropna()
-            if len(values) < 7:
-                continue
+        for metric, value in cv.dropna().items():
+            if value > 30:
+                insights.append(
+                    f"{metric.upper()} shows high volatility ({value:.1f}% coefficient of variation), "
+                    "suggesting unstable market conditions."
+                )
+            elif value < 10:
+                insights.append(
+                    f"{metric.upper()} is relatively stable ({value:.1f}% coefficient of variation), "
+                    "indicating consistent performance."
+                )
 
-            # Calculate volatility (coefficient of variation)
-            mean_val = values.mean()
-            std_val = values.std()
+        return insights
 
-            if mean_val > 0:
-                cv = (std_val / mean_val) * 100
+    def _analyze_patterns(self, hourly: pd.DataFrame) -> List[str]:
+        """Analyze daily, weekly and other cycles of each metric."""
+        insights = []
 
-                if cv > 30:
-                    insights.append(
-                        f"{metric.upper()} shows high volatility ({cv:.1f} coefficient of variation), "
-                        "suggesting unstable market conditions."
-                    )
-                elif cv < 10:
-                    insights.append(
-                        f"{metric.upper()} is relatively stable ({cv:.1f} coefficient of variation), "
-                        "indicating consistent performance."
-                    )
+        # Need at least 2 weeks
+        candidates = hourly.loc[:, hourly.count() >= 14 * 24]
+        if candidates.empty:
+            return insights
+
+        pattern = self._detect_patterns(candidates)
+        for metric, row in pattern.iterrows():
+            timing = self._describe_timing(row)
+            if row['significant']:
+                insights.append(
+                    f"{metric.upper()} follows a {self._describe_period(row['period_hours'])} "
+                    f"(autocorrelation {row['autocorrelation']:.2f}){timing}."
+                )
+            elif timing:
+                insights.append(f"{metric.upper()} shows a recurring pattern{timing}.")
 
         return insights
 
-    def _analyze_patterns(self, df: pd.DataFrame) -> List[str]:
-        """Analyze patterns in the data."""
+    def _analyze_fleet_patterns(self, pivot: pd.DataFrame, min_parachains: int = 2) -> List[str]:
+        """Summarize which cycles are shared across parachains, every series in one pass."""
         insights = []
 
-        for metric in ['tvl', 'transactions', 'users']:
-            if metric not in df.columns:
-                continue
+        wide = pivot.pivot_table(index='timestamp', columns='parachain_id', values=ANALYZED_METRICS)
+        wide = wide.loc[:, wide.count() >= 14 * 24]
+        if wide.shape[1] == 0:
+            return insights
 
-            values = df[metric].dropna()
-            if len(values) < 14:  # Need at least 2 weeks
+        pattern = self._detect_patterns(wide)
+        pattern['cycle'] = pattern['period_hours'].map(self._describe_period)
+        for metric, group in pattern.groupby(level=0):
+            cyclic = group[group['significant']]
+            if len(cyclic) < min_parachains:
                 continue
-
-            # Check for weekly patterns
-            weekly_pattern = self._detect_weekly_pattern(values)
-            if weekly_pattern['significant']:
-                day = weekly_pattern['peak_day']
-                insights.append(
-                    f"{metric.upper()} shows a weekly pattern with peak activity typically on {day}s."
-                )
+            cycle = cyclic['cycle'].mode().iloc[0]
+            sharing = cyclic[cyclic['cycle'] == cycle]
+            insights.append(
+                f"{len(sharing)} of {len(group)} parachains show a {cycle} in {metric.upper()}"
+                f"{self._describe_timing(self._typical_timing(sharing), typical=True)}."
+            )
 
         return insights
 
-    def _detect_weekly_pattern(self, values: pd.Series) -> Dict[str, Any]:
-        """Detect weekly patterns in time series data."""
-        try:
-            # This is a simplified pattern detection
-            # In production, you'd use more sophisticated methods
-            return {
-                'significant': np.random.random() > 0.7,  # Simulate pattern detection
-                'peak_day': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][np.random.randint(0, 7)]
-            }
-        except Exception:
-            return {'significant': False, 'peak_day': 'unknown'}
+    def _typical_timing(self, pattern: pd.DataFrame) -> pd.Series:
+        """Most common peak weekday and hour among pattern rows."""
+        modes = pattern[['peak_day', 'peak_hour']].mode()
+        return modes.iloc[0] if len(modes) else pd.Series(dtype=float)
+
+    def _detect_patterns(self, hourly: pd.DataFrame) -> pd.DataFrame:
+        """
+        Detect cycles in every column of an hourly frame in one batch.
+
+        Returns:
+            DataFrame indexed by column with the dominant period and its
+            significance (see detect_periodicity) plus peak hour and weekday
+            where those effects are significant (NaN otherwise)
+        """
+        periods = detect_periodicity(hourly, alpha=PATTERN_ALPHA)
+        peaks = cycle_peaks(hourly)
+        pattern = periods.join(peaks)
+        pattern['peak_hour'] = pattern['peak_hour'].where(pattern['hour_p_value'] < PATTERN_ALPHA)
+        pattern['peak_day'] = pattern['peak_day'].where(pattern['day_p_value'] < PATTERN_ALPHA)
+        return pattern
+
+    def _describe_period(self, hours: float) -> str:
+        """Name a period in hours ('daily cycle', 'weekly cycle', '12-hour cycle', ...)."""
+        if abs(hours - 24) <= 2:
+            return "daily cycle"
+        if abs(hours - 168) <= 12:
+            return "weekly cycle"
+        if hours >= 48:
+            return f"{hours / 24:.1f}-day cycle"
+        return f"{hours:.0f}-hour cycle"
+
+    def _describe_timing(self, row: pd.Series, typical: bool = False) -> str:
+        """Peak weekday and hour of a pattern row as a clause ('' if neither is significant)."""
+        parts = []
+        if pd.notna(row.get('peak_day')):
+            parts.append(f"on {WEEKDAYS[int(round(row['peak_day']))]}s")
+        if pd.notna(row.get('peak_hour')):
+            parts.append(f"around {int(round(row['peak_hour'])):02d}:00")
+        if not parts:
+            return ""
+        return f", {'typically ' if typical else ''}peaking {' '.join(parts)}"
 
     def _analyze_parachain_health(self, df: pd.DataFrame, parachain_id: str) -> List[str]:
         """Analyze overall parachain health."""
         insights = []
 
         try:
-            # Calculate overall health score
-            health_score = 0
-            factors = 0
-
-            # TVL growth
-            if 'tvl' in df.columns:
-                tvl_values = df['tvl'].dropna()
-                if len(tvl_values) > 1:
-                    tvl_growth = (tvl_values.iloc[-1] - tvl_values.iloc[0]) / tvl_values.iloc[0]
-                    if tvl_growth > 0.1:
-                        health_score += 1
-                    factors += 1
-
-            # Transaction stability
-            if 'transactions' in df.columns:
-                txn_values = df['transactions'].dropna()
-                if len(txn_values) > 1:
-                    txn_cv = txn_values.std() / txn_values.mean() if txn_values.mean() > 0 else 1
-                    if txn_cv < 0.5:  # Low volatility
-                        health_score += 1
-                    factors += 1
-
-            # User engagement
-            if 'users' in df.columns:
-                user_values = df['users'].dropna()
-                if len(user_values) > 1:
-                    user_growth = (user_values.iloc[-1] - user_values.iloc[0]) / user_values.iloc[0]
-                    if user_growth > 0.05:
-                        health_score += 1
-                    factors += 1
-
-            if factors > 0:
-                health_pct = (health_score / factors) * 100
+            # Same checks as the fleet leaderboard, on a one-parachain panel
+            panel = pd.concat({str(parachain_id): df}, axis=1).swaplevel(axis=1)
+            health = score_health(panel).iloc[0]
+
+            if health['checks'] > 0:
+                health_pct = health['health']
                 if health_pct >= 70:
                     insights.append(
                         f"Parachain {parachain_id} shows strong overall health with {health_pct:.0f}% "
@@ -345,13 +387,37 @@ class InsightsGenerator:
 
         return summary
 
-    async def _enhance_with_gemini(self, insights: List[str], parachain_id: Optional[str], time_range_days: int) -> List[str]:
-        """Enhance insights using Gemini API (if available)."""
-        if not GEMINI_AVAILABLE or not self.gemini_api_key:
-            return insights
+    async def _data_watermark(self, parachain_id: Optional[str]) -> str:
+        """Latest metric timestamp behind the insights ('' if unknown)."""
+        if not self.data_loader:
+            return ""
+        watermark = await self.data_loader.get_data_watermark([str(parachain_id)] if parachain_id else None)
+        return watermark.isoformat() if watermark else ""
 
-        try:
-            prompt = f"""
+    async def _enhance_with_gemini(
+        self,
+        insights: List[str],
+        parachain_id: Optional[str],
+        time_range_days: int,
+        watermark: str = ""
+    ) -> Tuple[List[str], bool]:
+        """
+        Enhance insights using Gemini API (if available).
+
+        Args:
+            insights: Rule-based insights
+            parachain_id: Parachain the insights are about (None for all)
+            time_range_days: Time range the insights cover
+            watermark: Data watermark; cached responses from other watermarks are not reused
+
+        Returns:
+            Enhanced insights and True, or the given insights and False when
+            Gemini is unavailable, fails or exceeds its time budget
+        """
+        if not GEMINI_AVAILABLE or not self._model:
+            return insights, False
+
+        prompt = f"""
             You are an expert blockchain analyst. Based on the following raw insights about {'a Polkadot parachain' if parachain_id else 'Polkadot parachains'}, provide enhanced, professional insights:
 
             Raw insights:
@@ -366,36 +432,100 @@ class InsightsGenerator:
             Format each insight as a clear, concise statement.
             """
 
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=500,
-                )
-            )
-
-            if not response or not response.text:
-                logging.warning("Gemini API returned empty response")
-                return insights
-
-            enhanced_content = response.text.strip()
-
-            # Split enhanced insights with improved parsing
-            enhanced_insights = []
-            for line in enhanced_content.split('\n'):
-                line = line.strip()
-                if line and len(line) > 20:  # More substantial insights
-                    # Remove common prefixes
-                    for prefix in ['- ', '• ', '* ', '1. ', '2. ', '3. ', '4. ', '5. ']:
-                        if line.startswith(prefix):
-                            line = line[len(prefix):].strip()
-                            break
-                    if line and not any(skip in line.lower() for skip in ['enhanced', 'insight', 'summary', 'analysis']):
-                        enhanced_insights.append(line)
-
-            return enhanced_insights[:5] if enhanced_insights else insights  # Limit to 5 insights
+        try:
+            text = await self._generate_text(prompt, temperature=0.7, max_output_tokens=500, watermark=watermark)
 
+        except asyncio.TimeoutError:
+            self.llm_stats["timeouts"] += 1
+            logging.warning(
+                f"Gemini enhancement exceeded {self.llm_timeout_seconds}s, using rule-based insights"
+            )
+            return insights, False
         except Exception as e:
+            self.llm_stats["errors"] += 1
             logging.error(f"Error enhancing insights with Gemini: {e}")
-            return insights
+            return insights, False
+
+        if not text:
+            logging.warning("Gemini API returned empty response")
+            return insights, False
+
+        # Split enhanced insights with improved parsing
+        enhanced_insights = []
+        for line in text.strip().split('\n'):
+            line = line.strip()
+            if line and len(line) > 20:  # More substantial insights
+                # Remove common prefixes
+                for prefix in ['- ', '• ', '* ', '1. ', '2. ', '3. ', '4. ', '5. ']:
+                    if line.startswith(prefix):
+                        line = line[len(prefix):].strip()
+                        break
+                if line and not any(skip in line.lower() for skip in ['enhanced', 'insight', 'summary', 'analysis']):
+                    enhanced_insights.append(line)
+
+        if not enhanced_insights:
+            return insights, False
+        return enhanced_insights[:5], True  # Limit to 5 insights
+
+    async def _generate_text(
+        self,
+        prompt: str,
+        temperature: float,
+        max_output_tokens: int,
+        watermark: str = ""
+    ) -> str:
+        """
+        Run one Gemini request without blocking the event loop.
+
+        Responses are served from the prompt cache when one is configured.
+        Identical requests share a single call: later callers await the
+        result of the one already in flight. The time budget covers both the
+        wait for a concurrency slot and the request itself.
+
+        Raises:
+            asyncio.TimeoutError: The budget was exceeded
+        """
+        key = prompt_key(
+            GEMINI_MODEL, {"temperature": temperature, "max_output_tokens": max_output_tokens}, prompt
+        )
+
+        if self.prompt_cache:
+            cached = await self.prompt_cache.get(key, watermark)
+            if cached is not None:
+                return cached
+
+        pending = self._llm_inflight.get(key)
+        if pending is not None:
+            self.llm_stats["coalesced"] += 1
+            return await asyncio.wait_for(asyncio.shield(pending), timeout=self.llm_timeout_seconds)
+
+        async def call() -> str:
+            async with self._llm_slots:
+                self.llm_stats["requests"] += 1
+                response = await self._model.generate_content_async(
+                    prompt,
+                    generation_config=genai.types.GenerationConfig(
+                        temperature=temperature,
+                        max_output_tokens=max_output_tokens,
+                    )
+                )
+                text = response.text if response else ""
+            if text and self.prompt_cache:
+                await self.prompt_cache.put(key, watermark, text)
+            return text
+
+        task = asyncio.ensure_future(asyncio.wait_for(call(), timeout=self.llm_timeout_seconds))
+        self._llm_inflight[key] = task
+        task.add_done_callback(lambda _: self._llm_inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def get_llm_status(self) -> Dict[str, Any]:
+        """Get Gemini availability, in-flight requests and call counters."""
+        return {
+            "enabled": self._ready,
+            "model": GEMINI_MODEL if self._ready else None,
+            "in_flight": len(self._llm_inflight),
+            "timeout_seconds": self.llm_timeout_seconds,
+            **{name: self.llm_stats.get(name, 0) for name in ("requests", "coalesced", "timeouts", "errors")},
+            "cache": self.prompt_cache.get_stats() if self.prompt_cache else None
+        }
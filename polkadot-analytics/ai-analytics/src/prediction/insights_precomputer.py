@@ -0,0 +1,239 @@
+"""
+Background precomputation of insights
+Regenerates insights for every parachain and the whole ecosystem on a schedule
+so requests are answered from the latest stored result
+"""
+
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+from ..utils.latency_monitor import LatencyMonitor
+
+# Key of the ecosystem-wide insights (no parachain filter)
+ECOSYSTEM = "__ecosystem__"
+
+
+class InsightsPrecomputer:
+    """Periodically generates and stores insights for all parachains."""
+
+    def __init__(
+        self,
+        insights_generator,
+        data_loader=None,
+        interval_minutes: float = 30,
+        time_range_days: int = 30,
+        max_concurrency: int = 2,
+        store_path: Optional[str] = None,
+        latency_monitor: Optional[LatencyMonitor] = None,
+        include_predictions: bool = True
+    ):
+        """
+        Initialize the precomputer.
+
+        Args:
+            insights_generator: InsightsGenerator used for every parachain
+            data_loader: DataLoader listing the parachains
+            interval_minutes: Time between precomputation cycles
+            time_range_days: Time range precomputed for each parachain
+            max_concurrency: Parachains generated at the same time
+            store_path: JSON file holding the latest results across restarts
+            latency_monitor: Request latency monitor used to pause under load
+            include_predictions: Whether precomputed insights include predictions
+        """
+        self.insights_generator = insights_generator
+        self.data_loader = data_loader
+        self.interval_minutes = interval_minutes
+        self.time_range_days = time_range_days
+        self.max_concurrency = max_concurrency
+        self.store_path = store_path
+        self.latency_monitor = latency_monitor
+        self.include_predictions = include_predictions
+
+        self._results: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_cycle: Optional[Dict[str, Any]] = None
+        self._paused = False
+
+    def start(self):
+        """Load stored results and start the precomputation loop."""
+        self.restore()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logging.info(
+                f"Insights precomputation started (every {self.interval_minutes}m, "
+                f"{self.time_range_days} day range)"
+            )
+
+    async def stop(self):
+        """Stop the precomputation loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logging.info("Insights precomputation stopped")
+
+    def get(
+        self,
+        parachain_id: Optional[str],
+        time_range_days: int,
+        include_predictions: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Latest stored insights.
+
+        Args:
+            parachain_id: Parachain ID (None for ecosystem-wide insights)
+            time_range_days: Time range of the insights
+            include_predictions: Whether the insights should include predictions
+
+        Returns:
+            Stored result with its age, or None if none is stored for these settings
+        """
+        if include_predictions != self.include_predictions:
+            return None
+        result = self._results.get(self._key(parachain_id, time_range_days))
+        if result is None:
+            return None
+        age = (datetime.now() - datetime.fromisoformat(result["timestamp"])).total_seconds()
+        return {**result, "age_seconds": age}
+
+    async def refresh(
+        self,
+        parachain_id: Optional[str],
+        time_range_days: int,
+        include_predictions: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate insights now and store them unless generation failed.
+
+        Results generated with other settings than the precomputed ones
+        are returned without being stored.
+        """
+        if include_predictions is None:
+            include_predictions = self.include_predictions
+        result = await self.insights_generator.generate(
+            parachain_id=parachain_id,
+            time_range_days=time_range_days,
+            include_predictions=include_predictions
+        )
+        if "error" not in result and include_predictions == self.include_predictions:
+            self._results[self._key(parachain_id, time_range_days)] = result
+        return result
+
+    def _key(self, parachain_id: Optional[str], time_range_days: int) -> Tuple[str, int]:
+        return (str(parachain_id) if parachain_id else ECOSYSTEM, int(time_range_days))
+
+    async def _run(self):
+        """Precomputation loop: one cycle, then wait for the next interval."""
+        while True:
+            try:
+                await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Insights precomputation cycle failed: {e}")
+
+            await asyncio.sleep(self.interval_minutes * 60)
+
+    async def run_cycle(self) -> Dict[str, Any]:
+        """Generate insights for the ecosystem and every parachain."""
+        started = datetime.now()
+        parachains: List[Optional[str]] = [None]
+        if self.data_loader:
+            parachains += sorted(str(p) for p in await self.data_loader.get_all_parachains())
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        failed = []
+
+        async def generate(parachain_id: Optional[str]):
+            async with semaphore:
+                await self._wait_for_headroom()
+                result = await self.refresh(parachain_id, self.time_range_days)
+                if "error" in result:
+                    failed.append(parachain_id or ECOSYSTEM)
+
+        await asyncio.gather(*(generate(p) for p in parachains))
+        self.checkpoint()
+
+        self._last_cycle = {
+            "started_at": started.isoformat(),
+            "duration_seconds": (datetime.now() - started).total_seconds(),
+            "targets": len(parachains),
+            "failed": failed
+        }
+        logging.info(
+            f"Precomputed insights for {len(parachains) - len(failed)}/{len(parachains)} targets "
+            f"in {self._last_cycle['duration_seconds']:.1f}s"
+        )
+        return self._last_cycle
+
+    async def _wait_for_headroom(self, poll_seconds: float = 5.0):
+        """Block while request latency is close to the SLO."""
+        while self.latency_monitor and self.latency_monitor.at_risk():
+            if not self._paused:
+                logging.warning("Request latency SLO at risk, pausing insights precomputation")
+                self._paused = True
+            await asyncio.sleep(poll_seconds)
+        self._paused = False
+
+    def checkpoint(self):
+        """Atomically write the stored results to disk."""
+        if not self.store_path:
+            return
+
+        try:
+            directory = os.path.dirname(self.store_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            entries = [
+                {"parachain": parachain, "time_range_days": days, "result": result}
+                for (parachain, days), result in self._results.items()
+            ]
+            tmp_path = f"{self.store_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f, default=str)
+            os.replace(tmp_path, self.store_path)
+
+        except Exception as e:
+            logging.error(f"Error storing precomputed insights: {e}")
+
+    def restore(self) -> bool:
+        """
+        Load stored results from disk.
+
+        Returns:
+            True if results were loaded
+        """
+        if not self.store_path or not os.path.exists(self.store_path):
+            return False
+
+        try:
+            with open(self.store_path) as f:
+                entries = json.load(f)
+            for entry in entries:
+                self._results[(entry["parachain"], int(entry["time_range_days"]))] = entry["result"]
+            logging.info(f"Restored {len(entries)} precomputed insights")
+            return True
+
+        except Exception as e:
+            logging.error(f"Error restoring precomputed insights: {e}")
+            return False
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get precomputation status."""
+        oldest = min((r["timestamp"] for r in self._results.values()), default=None)
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "paused": self._paused,
+            "stored": len(self._results),
+            "oldest_result": oldest,
+            "last_cycle": self._last_cycle
+        }
@@ -0,0 +1,155 @@
+"""
+Content-addressed cache for LLM responses
+Keeps recent responses in an in-memory LRU backed by a SQLite file with TTL
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Any, Tuple
+
+
+def prompt_key(model: str, generation_config: Dict[str, Any], prompt: str) -> str:
+    """Hash of everything that determines an LLM response."""
+    config = "|".join(f"{k}={generation_config[k]}" for k in sorted(generation_config))
+    return hashlib.sha256(f"{model}\x00{config}\x00{prompt}".encode()).hexdigest()
+
+
+class PromptCache:
+    """
+    Two-tier cache of LLM responses keyed by prompt hash.
+
+    Each entry records the data watermark (latest metric timestamp) it was
+    generated from; a lookup with a different watermark treats the entry as
+    stale and drops it, so responses never outlive the data behind them.
+    Entries also expire after `ttl_seconds`. The SQLite tier survives
+    restarts and is shared by workers on the same host.
+    """
+
+    def __init__(self, path: str, max_entries: int = 512, ttl_seconds: float = 86400):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file for the persistent tier
+            max_entries: Entries kept in the in-memory tier
+            ttl_seconds: Entry lifetime in both tiers
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        self.stats = Counter()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _init_db(self):
+        """Create the table and drop expired entries."""
+        try:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS prompt_cache (
+                        key TEXT PRIMARY KEY,
+                        watermark TEXT NOT NULL,
+                        response TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("DELETE FROM prompt_cache WHERE expires_at < ?", (time.time(),))
+        except Exception as e:
+            logging.error(f"Error initializing prompt cache at {self.path}: {e}")
+
+    async def get(self, key: str, watermark: str) -> Optional[str]:
+        """
+        Look up a response.
+
+        Args:
+            key: prompt_key of the request
+            watermark: Current data watermark
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            cached_watermark, response, expires_at = entry
+            if cached_watermark == watermark and expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return response
+            del self._memory[key]
+
+        try:
+            row = await asyncio.to_thread(self._read, key)
+        except Exception as e:
+            logging.error(f"Error reading prompt cache: {e}")
+            row = None
+
+        if row is not None:
+            cached_watermark, response, expires_at = row
+            if cached_watermark == watermark and expires_at > now:
+                self._remember(key, row)
+                self.stats["disk_hits"] += 1
+                return response
+            self.stats["stale" if cached_watermark != watermark else "expired"] += 1
+            await asyncio.to_thread(self._delete, key)
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, watermark: str, response: str):
+        """Store a response in both tiers."""
+        entry = (watermark, response, time.time() + self.ttl_seconds)
+        self._remember(key, entry)
+        try:
+            await asyncio.to_thread(self._write, key, entry)
+            self.stats["writes"] += 1
+        except Exception as e:
+            logging.error(f"Error writing prompt cache: {e}")
+
+    def _remember(self, key: str, entry: Tuple[str, str, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[Tuple[str, str, float]]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT watermark, response, expires_at FROM prompt_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _write(self, key: str, entry: Tuple[str, str, float]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO prompt_cache (key, watermark, response, expires_at) VALUES (?, ?, ?, ?)",
+                (key, *entry)
+            )
+
+    def _delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM prompt_cache WHERE key = ?", (key,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rates per tier and entry counts."""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            "memory_entries": len(self._memory),
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_hit_rate": self.stats["memory_hits"] / lookups if lookups else 0.0,
+            "disk_hit_rate": self.stats["disk_hits"] / lookups if lookups else 0.0,
+            **{name: self.stats.get(name, 0) for name in ("misses", "stale", "expired", "writes")}
+        }
@@ -0,0 +1,234 @@
+"""
+Monte Carlo scenario simulation for parachain metrics
+Turns point forecasts into distributions with a block bootstrap of residuals
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Sequence
+
+import numpy as np
+
+# Request limits enforced by the API
+MAX_PATHS = 50_000
+MAX_HORIZON_DAYS = 365
+MAX_PARACHAINS = 100
+
+# Simulation cost assumed before the first series is measured; measured cost
+# is 80-100ns per path-day on large runs
+DEFAULT_NS_PER_CELL = 250.0
+
+
+class ScenarioSimulator:
+    """Simulates future metric paths on top of TimeSeriesForecaster point forecasts."""
+
+    def __init__(
+        self,
+        forecaster=None,
+        data_loader=None,
+        lookback_days: int = 180,
+        block_size: int = 5,
+        min_paths: int = 200,
+        max_cells: int = 5_000_000
+    ):
+        """
+        Initialize the simulator.
+
+        Args:
+            forecaster: TimeSeriesForecaster providing the central path
+            data_loader: DataLoader providing metric history
+            lookback_days: History used to estimate residuals
+            block_size: Length of bootstrapped residual blocks (days)
+            min_paths: Lower bound on paths when shrinking to fit the latency budget
+            max_cells: Upper bound on paths x horizon per series; the path arrays
+                take about 32 bytes per cell at peak
+        """
+        self.forecaster = forecaster
+        self.data_loader = data_loader
+        self.lookback_days = lookback_days
+        self.block_size = block_size
+        self.min_paths = min_paths
+        self.max_cells = max_cells
+
+    async def simulate(
+        self,
+        parachain_ids: Sequence[str],
+        metric: str = "tvl",
+        horizon_days: int = 14,
+        n_paths: int = 5000,
+        drop_threshold: float = 0.3,
+        quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95),
+        latency_budget_ms: float = 500.0,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Simulate metric paths for many parachains in one call.
+
+        Args:
+            parachain_ids: Parachains to simulate
+            metric: Metric to simulate
+            horizon_days: Simulation horizon in days
+            n_paths: Requested number of paths per parachain
+            drop_threshold: Relative drop to report probabilities for (0.3 = 30%)
+            quantiles: Quantiles reported per horizon step
+            latency_budget_ms: Total time budget; path counts shrink to fit it
+                (and to `max_cells`)
+            seed: Optional random seed
+
+        Returns:
+            Per-parachain quantile bands and drop probabilities
+        """
+        started = time.perf_counter()
+        rng = np.random.default_rng(seed)
+
+        histories = await asyncio.gather(
+            *(self._get_history(parachain_id, metric) for parachain_id in parachain_ids)
+        )
+
+        results = {}
+        # Conservative until the first series is measured, so it is budgeted too
+        ns_per_cell = DEFAULT_NS_PER_CELL
+        budget_limited = False
+
+        for i, (parachain_id, history) in enumerate(zip(parachain_ids, histories)):
+            try:
+                if history.size < self.block_size + 2:
+                    results[parachain_id] = {"error": "Insufficient history for simulation"}
+                    continue
+
+                forecast = None
+                if self.forecaster:
+                    forecast = await self.forecaster.forecast_path(parachain_id, metric, horizon_days)
+
+                # Fit the remaining series into what is left of the budget
+                remaining_ms = latency_budget_ms - (time.perf_counter() - started) * 1000
+                share_ms = remaining_ms / (len(parachain_ids) - i)
+                affordable = min(
+                    int(share_ms * 1e6 / (ns_per_cell * horizon_days)),
+                    self.max_cells // horizon_days
+                )
+                paths = n_paths
+                if affordable < n_paths:
+                    paths = max(min(self.min_paths, self.max_cells // horizon_days), affordable)
+                    budget_limited = True
+
+                # Timed without the forecast, whose model load may hit the disk
+                cell_start = time.perf_counter_ns()
+                simulated = self.simulate_paths(history, horizon_days, paths, rng, forecast)
+                results[parachain_id] = self.summarize(simulated, history[-1], drop_threshold, quantiles)
+                results[parachain_id]["forecast_used"] = forecast is not None
+
+                ns_per_cell = (time.perf_counter_ns() - cell_start) / (paths * horizon_days)
+
+            except Exception as e:
+                logging.error(f"Error simulating {parachain_id} {metric}: {e}")
+                results[parachain_id] = {"error": str(e)}
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return {
+            "results": results,
+            "metric": metric,
+            "horizon_days": horizon_days,
+            "drop_threshold": drop_threshold,
+            "quantiles": list(quantiles),
+            "requested_paths": n_paths,
+            "budget_limited": budget_limited,
+            "elapsed_ms": elapsed_ms,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def simulate_paths(
+        self,
+        history: np.ndarray,
+        horizon: int,
+        n_paths: int,
+        rng: np.random.Generator,
+        forecast: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Generate a paths x horizon array with a block bootstrap of log-return residuals.
+
+        Args:
+            history: Daily history of the metric (positive values)
+            horizon: Number of steps to simulate
+            n_paths: Number of paths
+            rng: Random generator
+            forecast: Optional point forecast used as the central path
+
+        Returns:
+            Simulated values with shape (n_paths, horizon)
+        """
+        log_values = np.log(np.maximum(history, 1e-9))
+        returns = np.diff(log_values)
+        residuals = returns - returns.mean()
+        last = log_values[-1]
+
+        # Central path: the model forecast if available, otherwise the historical drift
+        if forecast is not None and len(forecast) >= horizon:
+            center = np.log(np.maximum(np.asarray(forecast[:horizon], dtype=float), 1e-9)) - last
+        else:
+            center = returns.mean() * np.arange(1, horizon + 1)
+
+        block = min(self.block_size, residuals.size)
+        n_blocks = -(-horizon // block)
+        starts = rng.integers(0, residuals.size - block + 1, size=(n_paths, n_blocks))
+        idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, n_blocks * block)[:, :horizon]
+
+        shocks = np.cumsum(residuals[idx], axis=1)
+        return np.exp(last + center + shocks)
+
+    def summarize(
+        self,
+        paths: np.ndarray,
+        last_value: float,
+        drop_threshold: float,
+        quantiles: Sequence[float]
+    ) -> Dict[str, Any]:
+        """
+        Reduce simulated paths to quantile bands and exceedance probabilities.
+
+        Args:
+            paths: Simulated values with shape (n_paths, horizon)
+            last_value: Last observed value
+            drop_threshold: Relative drop to report probabilities for
+            quantiles: Quantiles reported per horizon step
+
+        Returns:
+            Summary statistics
+        """
+        floor = last_value * (1 - drop_threshold)
+        bands = np.quantile(paths, quantiles, axis=0)
+        terminal = paths[:, -1]
+
+        return {
+            "last_value": float(last_value),
+            "paths": int(paths.shape[0]),
+            "quantiles": {str(q): band.tolist() for q, band in zip(quantiles, bands)},
+            "prob_drop_at_horizon": float(np.mean(terminal <= floor)),
+            "prob_drop_within_horizon": float(np.mean(paths.min(axis=1) <= floor)),
+            "expected_terminal_value": float(terminal.mean()),
+            "terminal_value_5pct": float(np.quantile(terminal, 0.05))
+        }
+
+    async def _get_history(self, parachain_id: str, metric: str) -> np.ndarray:
+        """Fetch daily history for a series as an array."""
+        if not self.data_loader:
+            return np.array([])
+
+        try:
+            df = await self.data_loader.get_parachain_data(
+                parachain_id=parachain_id,
+                metric=metric,
+                start_date=datetime.now() - timedelta(days=self.lookback_days)
+            )
+            if df.empty or 'value' not in df.columns:
+                return np.array([])
+
+            daily = df['value'].resample('D').last().dropna()
+            return daily.to_numpy(dtype=float)
+
+        except Exception as e:
+            logging.error(f"Error fetching history for {parachain_id} {metric}: {e}")
+            return np.array([])
@@ -4,6 +4,7 @@ Monitors system health and service status
 """
 
 import os
+import time
 import asyncio
 import logging
 from datetime import datetime, timedelta
@@ -15,11 +16,21 @@ import json
 class HealthChecker:
     """Monitors the health of AI Analytics services."""
 
-    def __init__(self):
-        """Initialize the health checker."""
+    def __init__(self, insights_generator=None, gemini_check_ttl_seconds: float = 300.0):
+        """
+        Initialize the health checker.
+
+        Args:
+            insights_generator: Running InsightsGenerator whose Gemini state is reported
+            gemini_check_ttl_seconds: How long a standalone Gemini check is reused
+        """
         self.start_time = datetime.now()
         self.checks_performed = 0
         self.last_check = None
+        self.insights_generator = insights_generator
+        self.gemini_check_ttl_seconds = gemini_check_ttl_seconds
+        self._gemini_checked_at: Optional[float] = None
+        self._gemini_ok = False
 
     def get_status(self) -> Dict[str, Any]:
         """
@@ -119,7 +130,10 @@ class HealthChecker:
         """Check if ML models are available."""
         try:
             if os.path.exists(model_dir):
-                model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl')]
+                model_files = [
+                    f for _, _, files in os.walk(model_dir)
+                    for f in files if f.endswith(('.pkl', '.joblib'))
+                ]
                 if model_files:
                     return {"status": "healthy", "model_count": len(model_files)}
                 else:
@@ -130,24 +144,26 @@ class HealthChecker:
             return {"status": "error", "error": str(e)}
 
     def _check_gemini(self) -> bool:
-        """Check if Gemini API is configured."""
-        try:
-            # Check if google-generativeai package is available and API key is set
-            import google.generativeai as genai
-            api_key = os.getenv('GEMINI_API_KEY')
-            if api_key:
-                try:
-                    genai.configure(api_key=api_key)
-                    # Test the configuration by creating a model instance
-                    model = genai.GenerativeModel('gemini-2.5-flash')
-                    return True
-                except Exception:
-                    return False
-            return False
-        except ImportError:
-            return False
-        except Exception:
-            return False
+        """
+        Check if Gemini API is configured.
+
+        Uses the insights generator's state when one is attached (the SDK
+        was configured once at startup); otherwise the package and key check
+        is cached for `gemini_check_ttl_seconds`.
+        """
+        if self.insights_generator is not None:
+            return self.insights_generator.is_ready()
+
+        now = time.monotonic()
+        if self._gemini_checked_at is None or now - self._gemini_checked_at > self.gemini_check_ttl_seconds:
+            try:
+                import google.generativeai  # noqa: F401
+                self._gemini_ok = bool(os.getenv('GEMINI_API_KEY'))
+            except ImportError:
+                self._gemini_ok = False
+            self._gemini_checked_at = now
+
+        return self._gemini_ok
 
     async def perform_deep_check(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,124 @@
+"""
+HTTP response caching for AI Analytics
+Derives ETags from model versions and data watermarks, answers conditional
+requests with 304 and keeps recently rendered bodies for other clients
+"""
+
+import time
+import hashlib
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Any, Tuple
+
+from fastapi import Request, Response
+
+from .serialization import FastJSONResponse
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over everything that determines a response."""
+    digest = hashlib.sha256("\x00".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class ResponseCache:
+    """
+    Conditional GET support plus a bounded cache of rendered responses.
+
+    Handlers build an ETag from their inputs, the model version and the
+    data watermark before doing any work. A client that already holds that
+    version gets `304 Not Modified`; another client asking for the same
+    version gets the stored body. Either way nothing is recomputed or
+    reserialized. Watermarks are memoized briefly so polling does not
+    query the database on every request.
+    """
+
+    def __init__(self, data_loader=None, max_entries: int = 256, watermark_ttl_seconds: float = 5.0):
+        """
+        Initialize the cache.
+
+        Args:
+            data_loader: DataLoader providing data watermarks
+            max_entries: Rendered responses kept
+            watermark_ttl_seconds: How long a looked-up watermark is reused
+        """
+        self.data_loader = data_loader
+        self.max_entries = max_entries
+        self.watermark_ttl_seconds = watermark_ttl_seconds
+        self._bodies: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._watermarks: Dict[Optional[str], Tuple[str, float]] = {}
+        self.stats = Counter()
+
+    async def watermark(self, parachain_id: Optional[str] = None) -> str:
+        """Latest metric timestamp of a parachain (or of all data), '' if unknown."""
+        now = time.monotonic()
+        cached = self._watermarks.get(parachain_id)
+        if cached and cached[1] > now:
+            return cached[0]
+
+        latest = None
+        if self.data_loader:
+            latest = await self.data_loader.get_data_watermark([str(parachain_id)] if parachain_id else None)
+        value = latest.isoformat() if latest else ""
+        self._watermarks[parachain_id] = (value, now + self.watermark_ttl_seconds)
+        return value
+
+    def lookup(self, request: Request, etag: str, cache_control: str) -> Optional[Response]:
+        """
+        Answer a request without computing it, if possible.
+
+        Returns:
+            304 when the client holds the current version, the stored body
+            when another client fetched it, or None on a miss
+        """
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        stored = self._bodies.get(etag)
+        if stored is not None:
+            self._bodies.move_to_end(etag)
+            self.stats["hits"] += 1
+            body, media_type = stored
+            return Response(content=body, media_type=media_type, headers=headers)
+
+        self.stats["misses"] += 1
+        return None
+
+    def store(self, etag: str, payload: Any, cache_control: str) -> Response:
+        """
+        Keep a response body under its ETag and return the response.
+
+        Payloads that are not already a Response are rendered as JSON.
+        ETags of negotiated responses must include the media type.
+        """
+        response = payload if isinstance(payload, Response) else FastJSONResponse(content=payload)
+        self._bodies[etag] = (bytes(response.body), response.media_type)
+        self._bodies.move_to_end(etag)
+        while len(self._bodies) > self.max_entries:
+            self._bodies.popitem(last=False)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control
+        response.headers["Vary"] = "Accept"
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get 304, body hit and miss counts."""
+        lookups = sum(self.stats[name] for name in ("not_modified", "hits", "misses"))
+        return {
+            "entries": len(self._bodies),
+            "lookups": lookups,
+            "hit_rate": (self.stats["not_modified"] + self.stats["hits"]) / lookups if lookups else 0.0,
+            **{name: self.stats.get(name, 0) for name in ("not_modified", "hits", "misses")}
+        }
@@ -0,0 +1,62 @@
+"""
+Request latency monitoring for AI Analytics
+Tracks recent request latencies against a service level objective
+"""
+
+import time
+from collections import deque
+from typing import Dict, Any
+
+import numpy as np
+
+
+class LatencyMonitor:
+    """Keeps a rolling window of request latencies and checks them against an SLO."""
+
+    def __init__(self, slo_ms: float = 500.0, window_size: int = 1000, headroom: float = 0.8):
+        """
+        Initialize the latency monitor.
+
+        Args:
+            slo_ms: p95 latency objective in milliseconds
+            window_size: Number of recent requests kept
+            headroom: Fraction of the SLO at which it is considered at risk
+        """
+        self.slo_ms = slo_ms
+        self.headroom = headroom
+        self._samples = deque(maxlen=window_size)
+
+    def record(self, duration_ms: float):
+        """Record the duration of one request."""
+        self._samples.append((time.monotonic(), duration_ms))
+
+    def percentile(self, q: float = 95.0, max_age_seconds: float = 60.0) -> float:
+        """
+        Get a latency percentile over recent requests.
+
+        Args:
+            q: Percentile to compute (0-100)
+            max_age_seconds: Only consider requests newer than this
+
+        Returns:
+            Latency percentile in milliseconds (0 if no recent requests)
+        """
+        cutoff = time.monotonic() - max_age_seconds
+        recent = [duration for ts, duration in self._samples if ts >= cutoff]
+        if not recent:
+            return 0.0
+        return float(np.percentile(recent, q))
+
+    def at_risk(self) -> bool:
+        """Check whether recent p95 latency is close to breaching the SLO."""
+        return self.percentile(95.0) > self.slo_ms * self.headroom
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get a summary of recent latencies."""
+        return {
+            "slo_ms": self.slo_ms,
+            "p50_ms": self.percentile(50.0),
+            "p95_ms": self.percentile(95.0),
+            "at_risk": self.at_risk(),
+            "samples": len(self._samples)
+        }
@@ -0,0 +1,158 @@
+"""
+Response serialization for AI Analytics
+orjson-backed JSON responses and columnar encodings (JSON, msgpack, Arrow IPC)
+built directly from NumPy arrays
+"""
+
+import io
+import json
+from datetime import date, datetime
+from typing import Dict, Optional, Any
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+COLUMNAR_JSON = "application/vnd.columnar+json"
+MSGPACK = "application/msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Columnar media type -> whether its encoder is installed
+COLUMNAR_FORMATS = {
+    COLUMNAR_JSON: True,
+    MSGPACK: MSGPACK_AVAILABLE,
+    "application/x-msgpack": MSGPACK_AVAILABLE,
+    ARROW_STREAM: ARROW_AVAILABLE
+}
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if ORJSON_AVAILABLE else 0
+
+
+def _default(obj: Any) -> Any:
+    """Fallback conversions for objects orjson (or json) does not handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, np.ndarray):
+        return _plain(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _plain(column: np.ndarray) -> list:
+    """A column as a Python list, timestamps as ISO strings."""
+    if np.issubdtype(column.dtype, np.datetime64):
+        return np.datetime_as_string(column).tolist()
+    return column.tolist()
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes; NumPy arrays and datetimes need no conversion."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (stdlib json when orjson is not installed)."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            content = content.model_dump()
+        return dumps(content)
+
+
+def negotiate_columnar(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick the columnar media type requested in an Accept header.
+
+    Media types are considered in the order listed. Plain JSON (or any
+    wildcard) before a columnar type selects the row format.
+
+    Args:
+        accept: Accept header value
+
+    Returns:
+        Columnar media type, or None for the row format
+
+    Raises:
+        ValueError: Only columnar formats whose encoder is not installed were requested
+    """
+    unavailable = []
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in COLUMNAR_FORMATS:
+            if COLUMNAR_FORMATS[media_type]:
+                return media_type
+            unavailable.append(media_type)
+        elif media_type in ("application/json", "application/*", "*/*"):
+            return None
+
+    if unavailable:
+        raise ValueError(f"Unsupported response format: {', '.join(unavailable)}")
+    return None
+
+
+def columnar_response(
+    media_type: str,
+    meta: Dict[str, Any],
+    columns: Dict[str, np.ndarray],
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Encode equal-length columns plus scalar metadata.
+
+    JSON and msgpack bodies are one object with the metadata fields and
+    one array per column. Arrow IPC bodies are a single record batch
+    stream; the metadata travels as JSON in the schema metadata.
+
+    Args:
+        media_type: One of the COLUMNAR_FORMATS media types
+        meta: Scalar response fields
+        columns: Arrays keyed by column name
+        headers: Extra response headers
+
+    Returns:
+        Response with the encoded body
+    """
+    if media_type == COLUMNAR_JSON:
+        body = dumps({**meta, **columns})
+    elif media_type in (MSGPACK, "application/x-msgpack"):
+        body = msgpack.packb(
+            {**meta, **{name: _plain(np.asarray(col)) for name, col in columns.items()}},
+            default=_default
+        )
+    elif media_type == ARROW_STREAM:
+        table = pa.table(
+            {name: pa.array(np.asarray(col)) for name, col in columns.items()},
+            metadata={"meta": dumps(meta)}
+        )
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue()
+    else:
+        raise ValueError(f"Unsupported response format: {media_type}")
+
+    return Response(content=body, media_type=media_type, headers=headers)